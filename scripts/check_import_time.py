@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Import-Time Budget Check
+
+Imports each CLI entry point of src/ in a fresh interpreter under
+`python -X importtime` and checks that:
+  - its cumulative import time stays within budget (best of --repeat runs)
+  - none of the heavy optional dependencies (provider SDKs, datasets,
+    matplotlib, scipy) is imported; those load on the code path that uses them
+
+Exits non-zero on a regression, so it can run in CI.
+
+Usage:
+    python scripts/check_import_time.py
+    python scripts/check_import_time.py --repeat 5 --top 10
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Cumulative import time budget per entry point module, in milliseconds
+IMPORT_BUDGETS_MS = {
+    "config": 50,
+    "evaluate": 600,
+    "rescore": 600,
+    "analyze_results": 500,
+    "sample_index": 500,
+}
+
+# Modules that must not be imported just by importing an entry point
+HEAVY_MODULES = ["openai", "anthropic", "datasets", "matplotlib", "seaborn", "scipy"]
+
+
+def import_times(module: str):
+    """
+    Import module in a fresh interpreter under -X importtime.
+
+    Returns a list of (self_us, cumulative_us, depth, name), one per
+    imported module, in the order the interpreter reports them.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def check_module(module: str, budget_ms: float, repeat: int, top: int) -> bool:
+    """Measure one entry point and print its report; False if it is over budget."""
+    best_ms, best_rows = None, None
+    for _ in range(repeat):
+        rows = import_times(module)
+        total_ms = next(cum for _, cum, _, name in rows if name == module) / 1000
+        if best_ms is None or total_ms < best_ms:
+            best_ms, best_rows = total_ms, rows
+
+    heavy = sorted({
+        name for _, _, _, name in best_rows if name.split(".")[0] in HEAVY_MODULES
+    })
+    ok = best_ms <= budget_ms and not heavy
+
+    status = "ok" if ok else "FAIL"
+    print(f"{module:20s} {best_ms:7.1f} ms  (budget {budget_ms:.0f} ms)  {status}")
+    if heavy:
+        print(f"  imports heavy modules: {', '.join(heavy)}")
+    if top:
+        # The slowest direct imports of the entry point
+        children = sorted(
+            (row for row in best_rows if row[2] == 1), key=lambda row: -row[1]
+        )[:top]
+        for _, cumulative_us, _, name in children:
+            print(f"    {cumulative_us / 1000:7.1f} ms  {name}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check CLI import times against a budget")
+    parser.add_argument(
+        "modules", nargs="*", default=list(IMPORT_BUDGETS_MS),
+        help="Entry point modules to check (default: all budgeted)"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module; the best counts")
+    parser.add_argument("--top", type=int, default=0, help="Show the N slowest direct imports")
+    parser.add_argument(
+        "--scale", type=float, default=1.0,
+        help="Multiply every budget (for slower machines)"
+    )
+    args = parser.parse_args()
+
+    failed = [
+        module for module in args.modules
+        if not check_module(
+            module, IMPORT_BUDGETS_MS.get(module, 1000) * args.scale, args.repeat, args.top
+        )
+    ]
+    if failed:
+        print(f"\nOver budget: {', '.join(failed)}")
+        sys.exit(1)
+    print("\nAll imports within budget")
+
+
+if __name__ == "__main__":
+    main()
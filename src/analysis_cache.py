@@ -0,0 +1,110 @@
+"""Dependency tracking for the analysis: input fingerprints, cached aggregates, output digests."""
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+
+def file_fingerprint(path: str) -> List[int]:
+    """Cheap change marker for an input file: [size, mtime in ns]."""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def code_version(paths: List[str]) -> str:
+    """Digest of the analysis source files; any edit invalidates every cached entry."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def data_digest(data: Any) -> str:
+    """Digest of the JSON-serializable data an output is rendered from."""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class AnalysisCache:
+    """
+    Build state of one analysis directory, persisted as a JSON file.
+
+    Inputs (results files) are fingerprinted by size and mtime, and the
+    aggregate computed from each is cached until its file changes. Outputs
+    (figures, reports) record a digest of the exact data they were rendered
+    from and are only rebuilt when that data changes or the file is gone.
+    Entries from another code version are discarded. With enabled=False,
+    nothing cached is reused (but the new state is still saved).
+    """
+
+    def __init__(self, path: str, version: str, enabled: bool = True):
+        self.path = path
+        self.version = version
+        self.inputs: Dict[str, Dict] = {}
+        self.outputs: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+        if enabled and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    state = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                state = {}
+            if state.get("version") == version:
+                self.inputs = state.get("inputs", {})
+                self.outputs = state.get("outputs", {})
+
+        self._seen: set = set()
+
+    def aggregate(self, path: str, build: Callable[[str], Optional[Dict]]) -> Optional[Dict]:
+        """The cached aggregate of an input file, rebuilt with build(path) if the file changed."""
+        self._seen.add(path)
+        fingerprint = file_fingerprint(path)
+        entry = self.inputs.get(path)
+        if entry is not None and entry["fingerprint"] == fingerprint:
+            self.hits += 1
+            return entry["aggregate"]
+
+        self.misses += 1
+        aggregate = build(path)
+        self.inputs[path] = {"fingerprint": fingerprint, "aggregate": aggregate}
+        return aggregate
+
+    def stale(self, name: str, output_path: str, data: Any) -> Optional[str]:
+        """
+        Whether an output must be rebuilt for data.
+
+        Returns the digest to record with mark_built() once it is rebuilt,
+        or None if the output is up to date.
+        """
+        digest = data_digest(data)
+        if self.outputs.get(name) == digest and os.path.exists(output_path):
+            return None
+        return digest
+
+    def mark_built(self, name: str, digest: str):
+        self.outputs[name] = digest
+
+    def build(self, name: str, output_path: str, data: Any, render: Callable[[], None]) -> bool:
+        """
+        Render an output unless it is up to date with data.
+
+        Returns True if render() ran.
+        """
+        digest = self.stale(name, output_path, data)
+        if digest is None:
+            return False
+        render()
+        self.mark_built(name, digest)
+        return True
+
+    def save(self):
+        """Persist the state, dropping inputs that were not seen in this run."""
+        self.inputs = {path: entry for path, entry in self.inputs.items() if path in self._seen}
+        state = {"version": self.version, "inputs": self.inputs, "outputs": self.outputs}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -1,54 +1,132 @@
 """Analyze and visualize multilingual LLM evaluation results."""
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
-
-# Configure plotting
-plt.style.use('seaborn-v0_8-whitegrid')
-sns.set_palette("husl")
+from analysis_cache import AnalysisCache, code_version
+from config import NLI_LABELS
+from language_registry import language_family, language_name
+from metrics import (
+    CellCodes, compare_cells, english_gap_pairs, translate_test_pairs, pair_table
+)
+from results_store import read_results_table
 
 # Directories
 RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "results")
 FIGURES_DIR = os.path.join(RESULTS_DIR, "figures")
-os.makedirs(FIGURES_DIR, exist_ok=True)
-
-# Language metadata
-LANGUAGE_FAMILIES = {
-    "en": "Indo-European (Germanic)",
-    "de": "Indo-European (Germanic)",
-    "fr": "Indo-European (Romance)",
-    "es": "Indo-European (Romance)",
-    "ru": "Indo-European (Slavic)",
-    "hi": "Indo-European (Indo-Aryan)",
-    "ar": "Afro-Asiatic (Semitic)",
-    "zh": "Sino-Tibetan",
-    "sw": "Niger-Congo (Bantu)",
-    "tr": "Turkic"
-}
-
-LANGUAGE_NAMES = {
-    "en": "English", "de": "German", "fr": "French", "es": "Spanish",
-    "zh": "Chinese", "ar": "Arabic", "sw": "Swahili", "hi": "Hindi",
-    "ru": "Russian", "tr": "Turkish"
-}
+
+# Build state of the incremental analysis (input fingerprints, aggregates, output digests)
+ANALYSIS_CACHE_PATH = os.path.join(RESULTS_DIR, ".analysis_cache.json")
+
+# Sources whose edits invalidate the cached aggregates and outputs
+ANALYSIS_CODE = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    for name in ("analyze_results.py", "analysis_cache.py", "metrics.py", "language_registry.py")
+]
+
+# Modes whose per-language accuracies are kept in the cached aggregates
+ANALYSIS_MODES = ["direct", "translate_test"]
+
+# Figures label each bar or heatmap cell with its value up to this many languages
+MAX_ANNOTATED_LANGUAGES = 20
+
+
+def results_paths():
+    """
+    Results file of each model run in RESULTS_DIR, by file stem.
+
+    A model's columnar results_*.arrow file is preferred over its
+    results_*.json export when both exist. Re-scored copies
+    (results_*.rescored.*, written by older versions of rescore.py) are
+    skipped, since they would replace the model's results.
+    """
+    paths = {}
+    for filename in sorted(os.listdir(RESULTS_DIR)):
+        stem, ext = os.path.splitext(filename)
+        if stem.endswith(".rescored"):
+            continue
+        if filename.startswith("results_") and ext in (".json", ".arrow"):
+            if ext == ".arrow" or stem not in paths:
+                paths[stem] = os.path.join(RESULTS_DIR, filename)
+    return paths
+
+
+def read_results_file(filepath):
+    """Load one results file (results_*.arrow memory-mapped, or results_*.json)."""
+    if filepath.endswith(".arrow"):
+        return read_results_table(filepath)
+    with open(filepath) as f:
+        return json.load(f)
 
 
 def load_results():
     """Load all results files."""
     results = {}
-    for filename in os.listdir(RESULTS_DIR):
-        if filename.startswith("results_") and filename.endswith(".json"):
-            filepath = os.path.join(RESULTS_DIR, filename)
-            with open(filepath) as f:
-                data = json.load(f)
-                model = data.get("model", filename.replace("results_", "").replace(".json", ""))
-                results[model] = data
+    for stem, filepath in results_paths().items():
+        data = read_results_file(filepath)
+        if "direct" not in data:
+            continue  # SIB-200-only or packed run; the analysis covers native-prompt XNLI
+        model = data.get("model", stem.replace("results_", ""))
+        results[model] = data
     return results
 
 
+def summarize_results_file(filepath):
+    """
+    The cached aggregate of one results file.
+
+    Holds the model name, its per-language scalar metrics (accuracy,
+    macro-F1, ...) for each analyzed mode without the per-sample lists, and
+    the model's paired comparisons from compute_uncertainty (which only
+    pairs cells within a model). None for SIB-200-only and packed runs.
+    """
+    data = read_results_file(filepath)
+    if "direct" not in data:
+        return None
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    model = data.get("model", stem.replace("results_", ""))
+
+    summary = {"model": model}
+    for mode in ANALYSIS_MODES:
+        if mode in data:
+            summary[mode] = {
+                lang: {k: v for k, v in lang_data.items() if isinstance(v, (int, float, str))}
+                for lang, lang_data in data[mode].items()
+            }
+
+    uncertainty = compute_uncertainty({model: data})
+    if uncertainty is not None:
+        summary["uncertainty"] = {name: table.get(model) for name, table in uncertainty.items()}
+    return summary
+
+
+def load_summaries(cache):
+    """
+    Per-model results summaries and paired comparisons, via the analysis cache.
+
+    Only results files that changed since the last run are read; the others
+    come from their cached aggregates. Returns (results, uncertainty) in the
+    layouts of load_results and compute_uncertainty (uncertainty is None if
+    no model has per-sample predictions).
+    """
+    results = {}
+    uncertainty = {"gap": {}, "translate_test": {}}
+    for filepath in results_paths().values():
+        summary = cache.aggregate(filepath, summarize_results_file)
+        if summary is None:
+            continue
+        model = summary["model"]
+        results[model] = {mode: summary[mode] for mode in ANALYSIS_MODES if mode in summary}
+        for name, table in summary.get("uncertainty", {}).items():
+            if table:
+                uncertainty[name][model] = table
+
+    if not any(uncertainty.values()):
+        uncertainty = None
+    return results, uncertainty
+
+
 def compute_performance_gaps(results):
     """Calculate performance gaps between English and other languages."""
     gaps = {}
@@ -77,15 +155,62 @@ def compute_translate_test_effect(results):
     return effects
 
 
-def plot_accuracy_comparison(results):
-    """Create bar chart comparing accuracy across languages."""
-    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+@lru_cache(maxsize=None)
+def _pyplot():
+    """
+    (matplotlib.pyplot, seaborn), imported and configured on first use.
+
+    They take seconds to import, so runs that draw no figure never load
+    them. Figures are only saved to files, possibly from worker processes,
+    so the non-interactive Agg backend is used.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.style.use('seaborn-v0_8-whitegrid')
+    sns.set_palette("husl")
+    return plt, sns
 
+
+def _figure_path(path, filename):
+    if path is None:
+        os.makedirs(FIGURES_DIR, exist_ok=True)
+        path = os.path.join(FIGURES_DIR, filename)
+    return path
+
+
+def _saved(path):
+    print(f"Saved: {os.path.relpath(path, FIGURES_DIR)}")
+
+
+def result_languages(results, mode="direct"):
+    """Languages with mode results in any model, in the order they were evaluated."""
+    languages = {}
+    for data in results.values():
+        languages.update(dict.fromkeys(data.get(mode, {})))
+    return list(languages)
+
+
+def _figure_width(n_languages, minimum, per_language=0.35):
+    """Figure width that keeps per-language bars and labels legible."""
+    return max(minimum, n_languages * per_language)
+
+
+def plot_accuracy_comparison(results, path=None):
+    """Create bar chart comparing accuracy across languages (one panel per model)."""
+    plt, _ = _pyplot()
     models = list(results.keys())
-    languages = ["en", "de", "fr", "es", "zh", "ar", "sw", "hi", "ru", "tr"]
+    languages = result_languages(results)
+    panel_width = _figure_width(len(languages), 7, per_language=0.5)
+
+    fig, axes = plt.subplots(
+        1, len(models), figsize=(panel_width * len(models), 6), squeeze=False
+    )
 
     for idx, model in enumerate(models):
-        ax = axes[idx]
+        ax = axes[0][idx]
         data = results[model]
 
         direct_accs = [data["direct"].get(lang, {}).get("accuracy", 0) * 100 for lang in languages]
@@ -105,24 +230,27 @@ def plot_accuracy_comparison(results):
         ax.set_ylabel('Accuracy (%)')
         ax.set_title(f'{model.replace("-", " ").title()}')
         ax.set_xticks(x)
-        ax.set_xticklabels([LANGUAGE_NAMES.get(l, l) for l in languages], rotation=45, ha='right')
+        ax.set_xticklabels([language_name(l) for l in languages], rotation=45, ha='right')
         ax.legend()
         ax.set_ylim(60, 100)
         ax.axhline(y=data["direct"].get("en", {}).get("accuracy", 0) * 100,
                    color='gray', linestyle='--', alpha=0.5, label='English baseline')
 
     plt.tight_layout()
-    plt.savefig(os.path.join(FIGURES_DIR, "accuracy_comparison.png"), dpi=150, bbox_inches='tight')
+    path = _figure_path(path, "accuracy_comparison.png")
+    plt.savefig(path, dpi=150, bbox_inches='tight')
     plt.close()
-    print("Saved: accuracy_comparison.png")
+    _saved(path)
 
 
-def plot_performance_gap_heatmap(results):
-    """Create heatmap showing performance gaps."""
-    gaps = compute_performance_gaps(results)
+def plot_performance_gap_heatmap(results, gaps=None, path=None):
+    """Create heatmap showing performance gaps (compute_performance_gaps, if not given)."""
+    plt, sns = _pyplot()
+    if gaps is None:
+        gaps = compute_performance_gaps(results)
 
     models = list(gaps.keys())
-    languages = ["de", "fr", "es", "zh", "ar", "sw", "hi", "ru", "tr"]
+    languages = [lang for lang in result_languages(results) if lang != "en"]
 
     gap_matrix = []
     for model in models:
@@ -131,9 +259,9 @@ def plot_performance_gap_heatmap(results):
 
     gap_matrix = np.array(gap_matrix)
 
-    fig, ax = plt.subplots(figsize=(10, 4))
-    sns.heatmap(gap_matrix, annot=True, fmt='.1f', cmap='RdYlGn_r',
-                xticklabels=[LANGUAGE_NAMES.get(l, l) for l in languages],
+    fig, ax = plt.subplots(figsize=(_figure_width(len(languages), 10), max(4, 0.4 * len(models))))
+    sns.heatmap(gap_matrix, annot=len(languages) <= MAX_ANNOTATED_LANGUAGES, fmt='.1f',
+                cmap='RdYlGn_r', xticklabels=[language_name(l) for l in languages],
                 yticklabels=models, ax=ax, center=0,
                 cbar_kws={'label': 'Performance Gap (% points)'})
     ax.set_title('Performance Gap: English - Target Language (Direct Evaluation)')
@@ -141,19 +269,23 @@ def plot_performance_gap_heatmap(results):
     ax.set_ylabel('Model')
 
     plt.tight_layout()
-    plt.savefig(os.path.join(FIGURES_DIR, "performance_gap_heatmap.png"), dpi=150, bbox_inches='tight')
+    path = _figure_path(path, "performance_gap_heatmap.png")
+    plt.savefig(path, dpi=150, bbox_inches='tight')
     plt.close()
-    print("Saved: performance_gap_heatmap.png")
+    _saved(path)
 
 
-def plot_translate_test_effect(results):
-    """Create chart showing translate-test effect."""
-    effects = compute_translate_test_effect(results)
+def plot_translate_test_effect(results, effects=None, path=None):
+    """Create chart showing translate-test effect (compute_translate_test_effect, if not given)."""
+    plt, _ = _pyplot()
+    if effects is None:
+        effects = compute_translate_test_effect(results)
 
     models = list(effects.keys())
-    languages = ["de", "fr", "es", "zh", "ar", "sw", "hi", "ru", "tr"]
+    languages = result_languages(results, "translate_test")
 
-    fig, ax = plt.subplots(figsize=(12, 6))
+    width = _figure_width(len(languages), 12, per_language=0.2 * len(models))
+    fig, ax = plt.subplots(figsize=(width, 6))
 
     x = np.arange(len(languages))
     width = 0.35
@@ -164,6 +296,8 @@ def plot_translate_test_effect(results):
         bars = ax.bar(x + offset, model_effects, width, label=model)
 
         # Add value labels
+        if len(languages) > MAX_ANNOTATED_LANGUAGES:
+            continue
         for i, v in enumerate(model_effects):
             ax.text(i + offset, v + 0.5 if v > 0 else v - 1.5, f'{v:.1f}',
                    ha='center', va='bottom' if v > 0 else 'top', fontsize=8)
@@ -172,29 +306,30 @@ def plot_translate_test_effect(results):
     ax.set_ylabel('Accuracy Change (% points)')
     ax.set_title('Effect of Translate-Test Approach (Translate-Test − Direct)')
     ax.set_xticks(x)
-    ax.set_xticklabels([LANGUAGE_NAMES.get(l, l) for l in languages], rotation=45, ha='right')
+    ax.set_xticklabels([language_name(l) for l in languages], rotation=45, ha='right')
     ax.legend()
     ax.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
 
     plt.tight_layout()
-    plt.savefig(os.path.join(FIGURES_DIR, "translate_test_effect.png"), dpi=150, bbox_inches='tight')
+    path = _figure_path(path, "translate_test_effect.png")
+    plt.savefig(path, dpi=150, bbox_inches='tight')
     plt.close()
-    print("Saved: translate_test_effect.png")
+    _saved(path)
 
 
-def plot_language_family_analysis(results):
-    """Analyze performance by language family."""
-    # Group languages by family
+def plot_language_family_analysis(results, path=None):
+    """Analyze performance by language family (one panel per model)."""
+    plt, _ = _pyplot()
+    # Group languages by top-level family ("Indo-European (Slavic)" -> "Indo-European")
     family_groups = {}
-    for lang, family in LANGUAGE_FAMILIES.items():
-        if family not in family_groups:
-            family_groups[family] = []
-        family_groups[family].append(lang)
+    for lang in result_languages(results):
+        family = (language_family(lang) or "Other").split(" (")[0]
+        family_groups.setdefault(family, []).append(lang)
 
-    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+    fig, axes = plt.subplots(1, len(results), figsize=(7 * len(results), 6), squeeze=False)
 
     for idx, (model, data) in enumerate(results.items()):
-        ax = axes[idx]
+        ax = axes[0][idx]
 
         families = []
         avg_accs = []
@@ -206,11 +341,11 @@ def plot_language_family_analysis(results):
                 if lang in data["direct"]:
                     accs.append(data["direct"][lang]["accuracy"] * 100)
             if accs:
-                families.append(family.split(" (")[0])  # Shorten name
+                families.append(family)
                 avg_accs.append(np.mean(accs))
                 std_accs.append(np.std(accs) if len(accs) > 1 else 0)
 
-        colors = plt.cm.tab10(np.linspace(0, 1, len(families)))
+        colors = plt.cm.tab20(np.linspace(0, 1, len(families)))
         bars = ax.barh(families, avg_accs, xerr=std_accs, capsize=3, color=colors)
 
         ax.set_xlabel('Accuracy (%)')
@@ -223,14 +358,16 @@ def plot_language_family_analysis(results):
                    va='center', fontsize=9)
 
     plt.tight_layout()
-    plt.savefig(os.path.join(FIGURES_DIR, "language_family_analysis.png"), dpi=150, bbox_inches='tight')
+    path = _figure_path(path, "language_family_analysis.png")
+    plt.savefig(path, dpi=150, bbox_inches='tight')
     plt.close()
-    print("Saved: language_family_analysis.png")
+    _saved(path)
 
 
-def plot_model_comparison_radar(results):
+def plot_model_comparison_radar(results, path=None):
     """Create radar chart comparing models across languages."""
-    languages = ["en", "de", "fr", "es", "zh", "ar", "sw", "hi", "ru", "tr"]
+    plt, _ = _pyplot()
+    languages = result_languages(results)
     n_langs = len(languages)
 
     # Create angles for radar chart
@@ -244,28 +381,76 @@ def plot_model_comparison_radar(results):
         values = [data["direct"].get(lang, {}).get("accuracy", 0) * 100 for lang in languages]
         values += values[:1]  # Complete the loop
 
-        ax.plot(angles, values, 'o-', linewidth=2, label=model, color=colors[idx])
-        ax.fill(angles, values, alpha=0.1, color=colors[idx])
+        line, = ax.plot(angles, values, 'o-', linewidth=2, label=model,
+                        color=colors[idx] if idx < len(colors) else None)
+        ax.fill(angles, values, alpha=0.1, color=line.get_color())
 
     ax.set_xticks(angles[:-1])
-    ax.set_xticklabels([LANGUAGE_NAMES.get(l, l) for l in languages])
+    ax.set_xticklabels(
+        [language_name(l) for l in languages],
+        fontsize=None if n_langs <= MAX_ANNOTATED_LANGUAGES else 6
+    )
     ax.set_ylim(60, 100)
     ax.set_title('Model Performance Comparison Across Languages', y=1.08)
     ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.0))
 
     plt.tight_layout()
-    plt.savefig(os.path.join(FIGURES_DIR, "model_comparison_radar.png"), dpi=150, bbox_inches='tight')
+    path = _figure_path(path, "model_comparison_radar.png")
+    plt.savefig(path, dpi=150, bbox_inches='tight')
     plt.close()
-    print("Saved: model_comparison_radar.png")
-
-
-def compute_statistics(results):
-    """Compute statistical analysis of results."""
+    _saved(path)
+
+
+def compute_uncertainty(results):
+    """
+    Paired bootstrap 95% CIs and McNemar tests from per-sample predictions.
+
+    Returns {"gap": ..., "translate_test": ...}, each model -> language ->
+    {delta, low, high, p, ...} for English-vs-X gaps (direct) and
+    translate-test effects. Only results with stored predictions (the
+    columnar results_*.arrow files) take part; None if there are none.
+    """
+    cells = CellCodes.from_results(results, ["direct", "translate_test"], NLI_LABELS)
+    if not cells.keys:
+        return None
+
+    uncertainty = {}
+    for name, pairs in [
+        ("gap", english_gap_pairs(cells)),
+        ("translate_test", translate_test_pairs(cells)),
+    ]:
+        uncertainty[name] = pair_table(pairs, compare_cells(cells, pairs))
+    return uncertainty
+
+
+def _format_comparisons(title, comparisons):
+    """Report lines for one model's per-language paired comparisons."""
+    lines = [f"\n{title} (95% bootstrap CI, McNemar p):"]
+    for lang, c in comparisons.items():
+        if np.isnan(c["low"]):
+            continue  # Cells hold different samples; not comparable
+        lines.append(
+            f"  {language_name(lang):10s}: {c['delta']*100:+.1f}% "
+            f"[{c['low']*100:+.1f}, {c['high']*100:+.1f}], p={c['p']:.3g}"
+        )
+    return lines
+
+
+def compute_statistics(results, uncertainty=None):
+    """
+    Compute statistical analysis of results.
+
+    uncertainty is compute_uncertainty's output, computed from results if
+    not given.
+    """
     stats_report = []
     stats_report.append("=" * 60)
     stats_report.append("STATISTICAL ANALYSIS")
     stats_report.append("=" * 60)
 
+    if uncertainty is None:
+        uncertainty = compute_uncertainty(results)
+
     # Extract accuracies
     for model, data in results.items():
         stats_report.append(f"\n{model}")
@@ -277,6 +462,9 @@ def compute_statistics(results):
         stats_report.append(f"  Std:  {np.std(direct_accs)*100:.2f}%")
         stats_report.append(f"  Min:  {np.min(direct_accs)*100:.2f}%")
         stats_report.append(f"  Max:  {np.max(direct_accs)*100:.2f}%")
+        f1s = [v["macro_f1"] for v in data["direct"].values() if "macro_f1" in v]
+        if f1s:
+            stats_report.append(f"  Macro-F1 (mean): {np.mean(f1s)*100:.2f}%")
 
         # Non-English languages
         non_en_accs = [v["accuracy"] for k, v in data["direct"].items() if k != "en"]
@@ -298,6 +486,16 @@ def compute_statistics(results):
             stats_report.append(f"  Mean improvement: {np.mean(improvements)*100:.2f}%")
             stats_report.append(f"  Languages improved: {sum(1 for i in improvements if i > 0)}/{len(improvements)}")
 
+        if uncertainty is not None:
+            if model in uncertainty["gap"]:
+                stats_report.extend(_format_comparisons(
+                    "English - X gap", uncertainty["gap"][model]
+                ))
+            if model in uncertainty["translate_test"]:
+                stats_report.extend(_format_comparisons(
+                    "Translate-test - direct", uncertainty["translate_test"][model]
+                ))
+
     # Cross-model comparison
     models = list(results.keys())
     if len(models) == 2:
@@ -310,14 +508,14 @@ def compute_statistics(results):
             acc2 = results[models[1]]["direct"][lang]["accuracy"]
             diff = (acc2 - acc1) * 100
             winner = models[1] if diff > 0 else models[0]
-            stats_report.append(f"{LANGUAGE_NAMES.get(lang, lang):10s}: {models[0]}={acc1*100:.1f}%, {models[1]}={acc2*100:.1f}% (Δ={diff:+.1f}%, {winner})")
+            stats_report.append(f"{language_name(lang):10s}: {models[0]}={acc1*100:.1f}%, {models[1]}={acc2*100:.1f}% (Δ={diff:+.1f}%, {winner})")
 
     return "\n".join(stats_report)
 
 
 def generate_summary_table(results):
     """Generate markdown summary table."""
-    languages = ["en", "de", "fr", "es", "zh", "ar", "sw", "hi", "ru", "tr"]
+    languages = result_languages(results)
 
     table = []
     table.append("## Results Summary\n")
@@ -330,7 +528,7 @@ def generate_summary_table(results):
     table.append(separator)
 
     for lang in languages:
-        row = f"| {LANGUAGE_NAMES.get(lang, lang)} |"
+        row = f"| {language_name(lang)} |"
         for model, data in results.items():
             acc = data["direct"].get(lang, {}).get("accuracy", 0) * 100
             row += f" {acc:.1f}% |"
@@ -352,7 +550,7 @@ def generate_summary_table(results):
     for lang in languages:
         if lang == "en":
             continue
-        row = f"| {LANGUAGE_NAMES.get(lang, lang)} |"
+        row = f"| {language_name(lang)} |"
         for model, data in results.items():
             direct = data["direct"].get(lang, {}).get("accuracy", 0)
             translate = data["translate_test"].get(lang, {}).get("accuracy", 0)
@@ -364,43 +562,191 @@ def generate_summary_table(results):
     return "\n".join(table)
 
 
-def main():
-    """Run full analysis."""
+# Figures with the result modes whose accuracies they plot, and the shared
+# aggregate (computed once by figure_tasks) each one takes
+FIGURES = [
+    ("accuracy_comparison.png", plot_accuracy_comparison, ["direct", "translate_test"], None),
+    ("performance_gap_heatmap.png", plot_performance_gap_heatmap, ["direct"], "gaps"),
+    ("translate_test_effect.png", plot_translate_test_effect, ["direct", "translate_test"], "effects"),
+    ("language_family_analysis.png", plot_language_family_analysis, ["direct"], None),
+    ("model_comparison_radar.png", plot_model_comparison_radar, ["direct"], None),
+]
+
+# Subdirectory of FIGURES_DIR for the per-model figures of --per-model
+PER_MODEL_DIR = "by_model"
+
+
+def accuracy_view(results, modes):
+    """The per-language accuracies of results in the given modes: what a figure depends on."""
+    return {
+        model: {
+            mode: {lang: lang_data.get("accuracy") for lang, lang_data in data.get(mode, {}).items()}
+            for mode in modes
+        }
+        for model, data in results.items()
+    }
+
+
+def figure_tasks(results, cache, per_model=False):
+    """
+    The figures that are out of date, as (name, digest, plot, kwargs) render tasks.
+
+    The gap and translate-test aggregates are computed once here and passed
+    to the plots. With per_model, every figure is also drawn for each model
+    alone, under FIGURES_DIR/by_model/<model>/.
+    """
+    aggregates = {
+        "gaps": compute_performance_gaps(results),
+        "effects": compute_translate_test_effect(results),
+    }
+
+    subsets = [("", results)]
+    if per_model:
+        subsets += [
+            (os.path.join(PER_MODEL_DIR, model.replace("/", "_")), {model: data})
+            for model, data in results.items()
+        ]
+
+    tasks = []
+    for subdir, subset in subsets:
+        for filename, plot, modes, aggregate in FIGURES:
+            name = os.path.join(subdir, filename)
+            path = os.path.join(FIGURES_DIR, name)
+            digest = cache.stale(name, path, accuracy_view(subset, modes))
+            if digest is None:
+                continue
+            kwargs = {"results": subset, "path": path}
+            if aggregate is not None:
+                kwargs[aggregate] = {
+                    model: values for model, values in aggregates[aggregate].items()
+                    if model in subset
+                }
+            tasks.append((name, digest, plot, kwargs))
+    return tasks
+
+
+def _render_figure(plot, kwargs):
+    os.makedirs(os.path.dirname(kwargs["path"]), exist_ok=True)
+    plot(**kwargs)
+
+
+def render_figures(tasks, workers=None):
+    """
+    Render figure_tasks output, in a process pool when there is more than one.
+
+    Each figure is drawn with the Agg backend in its own worker, so the
+    savefig calls run on all cores. Returns the (name, digest) of the
+    figures rendered; failures are reported and skipped.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if tasks:
+        _pyplot()  # Import matplotlib once, before forking, rather than in every worker
+
+    rendered = []
+
+    def collect(name, digest, result):
+        try:
+            result()
+        except Exception as e:
+            print(f"Could not render {name}: {e}")
+            return
+        rendered.append((name, digest))
+
+    if workers <= 1:
+        for name, digest, plot, kwargs in tasks:
+            collect(name, digest, lambda: _render_figure(plot, kwargs))
+        return rendered
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_render_figure, plot, kwargs): (name, digest)
+            for name, digest, plot, kwargs in tasks
+        }
+        for future in as_completed(futures):
+            collect(*futures[future], future.result)
+    return rendered
+
+
+def _write_text(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def main(argv=None):
+    """
+    Run full analysis, incrementally.
+
+    Results files unchanged since the last run are not re-read, and figures
+    and reports whose underlying numbers are unchanged are not re-rendered
+    (see analysis_cache). --force rebuilds everything. Out-of-date figures
+    are rendered in parallel worker processes.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analyze and visualize evaluation results")
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Ignore the analysis cache and rebuild all aggregates and outputs"
+    )
+    parser.add_argument(
+        "--no-figures", action="store_true",
+        help="Only write statistics.txt and summary_table.md (matplotlib is not loaded)"
+    )
+    parser.add_argument(
+        "--per-model", action="store_true",
+        help=f"Also draw every figure for each model alone (under figures/{PER_MODEL_DIR}/)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Processes rendering figures in parallel (default: CPU count; 1 renders in-process)"
+    )
+    args = parser.parse_args(argv)
+
     print("Loading results...")
-    results = load_results()
+    cache = AnalysisCache(ANALYSIS_CACHE_PATH, code_version(ANALYSIS_CODE), enabled=not args.force)
+    results, uncertainty = load_summaries(cache)
 
     if not results:
         print("No results found!")
+        cache.save()
         return
 
-    print(f"Found {len(results)} models: {list(results.keys())}")
+    print(f"Found {len(results)} models: {list(results.keys())} "
+          f"({cache.misses} results files read, {cache.hits} cached)")
 
     # Generate visualizations
-    print("\nGenerating visualizations...")
-    plot_accuracy_comparison(results)
-    plot_performance_gap_heatmap(results)
-    plot_translate_test_effect(results)
-    plot_language_family_analysis(results)
-    plot_model_comparison_radar(results)
+    if not args.no_figures:
+        print("\nGenerating visualizations...")
+        tasks = figure_tasks(results, cache, per_model=args.per_model)
+        for name, digest in render_figures(tasks, args.workers):
+            cache.mark_built(name, digest)
+        n_figures = len(FIGURES) * (1 + (len(results) if args.per_model else 0))
+        if len(tasks) < n_figures:
+            print(f"{n_figures - len(tasks)} figures up to date")
 
     # Compute statistics
     print("\nComputing statistics...")
-    stats_report = compute_statistics(results)
+    stats_report = compute_statistics(results, uncertainty)
     print(stats_report)
 
     # Save statistics
     stats_path = os.path.join(RESULTS_DIR, "statistics.txt")
-    with open(stats_path, "w") as f:
-        f.write(stats_report)
-    print(f"\nSaved: {stats_path}")
+    if cache.build("statistics.txt", stats_path, stats_report,
+                   lambda: _write_text(stats_path, stats_report)):
+        print(f"\nSaved: {stats_path}")
+    else:
+        print(f"\nUp to date: {stats_path}")
 
     # Generate summary table
     summary = generate_summary_table(results)
     summary_path = os.path.join(RESULTS_DIR, "summary_table.md")
-    with open(summary_path, "w") as f:
-        f.write(summary)
-    print(f"Saved: {summary_path}")
+    if cache.build("summary_table.md", summary_path, summary,
+                   lambda: _write_text(summary_path, summary)):
+        print(f"Saved: {summary_path}")
+    else:
+        print(f"Up to date: {summary_path}")
 
+    cache.save()
     print("\nAnalysis complete!")
 
 
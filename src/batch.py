@@ -0,0 +1,200 @@
+"""Offline batch-API execution for OpenAI-compatible providers."""
+import json
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from config import (
+    BATCH_DIR, BATCH_POLL_INTERVAL, BATCH_MAX_RESUBMITS, API_TEMPERATURE
+)
+from engine import Request, ResultCallback, request_params
+
+# Providers whose API exposes the /v1/batches endpoint
+BATCH_PROVIDERS = ["openai"]
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = ["completed", "failed", "expired", "cancelled"]
+
+
+def write_batch_file(
+    client,
+    requests: List[Request],
+    positions: List[int],
+    path: str
+):
+    """Serialize the requests at `positions` into a batch JSONL input file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in positions:
+            prompt, system_prompt, max_tokens = request_params(requests[i])
+            row = {
+                "custom_id": f"req-{i}",
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": client.chat_request_body(
+                    prompt, system_prompt, API_TEMPERATURE, max_tokens
+                )
+            }
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def parse_batch_output(text: str) -> Tuple[Dict[int, str], Set[int]]:
+    """
+    Parse a batch output (or error) file.
+
+    Returns (responses, failed): responses maps request position -> text for
+    successful rows, failed holds positions of rows that errored.
+    """
+    responses = {}
+    failed = set()
+
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        position = int(row["custom_id"].split("-", 1)[1])
+        response = row.get("response") or {}
+
+        if row.get("error") or response.get("status_code") != 200:
+            failed.add(position)
+            continue
+
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+            responses[position] = content.strip()
+        except (KeyError, IndexError, TypeError, AttributeError):
+            failed.add(position)
+
+    return responses, failed
+
+
+class BatchRunner:
+    """
+    Runs planned requests through the provider's asynchronous batch API.
+
+    Requests are written to a JSONL file, submitted, and polled until the
+    batch finishes. Rows that failed or were never processed are resubmitted
+    in a new batch, up to max_resubmits times. Responses already in the
+    client's cache are not submitted, and new responses are added to it.
+    """
+
+    def __init__(
+        self,
+        client,
+        work_dir: str = BATCH_DIR,
+        poll_interval: float = BATCH_POLL_INTERVAL,
+        max_resubmits: int = BATCH_MAX_RESUBMITS,
+        completion_window: str = "24h"
+    ):
+        if client.provider not in BATCH_PROVIDERS:
+            raise ValueError(f"Batch mode is not supported for provider: {client.provider}")
+
+        self.client = client
+        self.work_dir = work_dir
+        self.poll_interval = poll_interval
+        self.max_resubmits = max_resubmits
+        self.completion_window = completion_window
+
+    def _cache_key(self, request: Request) -> str:
+        prompt, system_prompt, max_tokens = request_params(request)
+        return self.client.cache.make_key(
+            self.client.provider, self.client.model_id, system_prompt, prompt,
+            API_TEMPERATURE, max_tokens
+        )
+
+    def _submit(self, path: str) -> str:
+        """Upload an input file and create a batch; returns the batch id."""
+        api = self.client.client
+        with open(path, "rb") as f:
+            input_file = api.files.create(file=f, purpose="batch")
+        batch = api.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window
+        )
+        return batch.id
+
+    def _wait(self, batch_id: str):
+        """Poll a batch until it reaches a terminal status."""
+        api = self.client.client
+        while True:
+            batch = api.batches.retrieve(batch_id)
+            counts = batch.request_counts
+            if counts is not None:
+                print(f"    Batch {batch_id}: {batch.status} "
+                      f"({counts.completed}/{counts.total} done, {counts.failed} failed)")
+            if batch.status in TERMINAL_STATUSES:
+                return batch
+            time.sleep(self.poll_interval)
+
+    def _collect(self, batch) -> Tuple[Dict[int, str], Set[int]]:
+        """Download and parse a finished batch's output and error files."""
+        api = self.client.client
+        responses, failed = {}, set()
+        for file_id in [batch.output_file_id, batch.error_file_id]:
+            if file_id:
+                rows, errors = parse_batch_output(api.files.content(file_id).text)
+                responses.update(rows)
+                failed.update(errors)
+        return responses, failed
+
+    def run(
+        self,
+        requests: List[Request],
+        desc: Optional[str] = None,
+        on_result: Optional[ResultCallback] = None
+    ) -> List[Optional[str]]:
+        """
+        Execute requests via the batch API, returning responses in request order.
+
+        Requests that still fail after all resubmissions yield None.
+        """
+        responses: List[Optional[str]] = [None] * len(requests)
+        cache = self.client.cache
+
+        pending = []
+        for i, request in enumerate(requests):
+            cached = cache.get(self._cache_key(request)) if cache is not None else None
+            if cached is not None:
+                responses[i] = cached
+                if on_result is not None:
+                    on_result(i, cached, {"cached": True, "latency": 0.0})
+            else:
+                pending.append(i)
+
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        label = (desc or "batch").strip()
+        for attempt in range(self.max_resubmits + 1):
+            if not pending:
+                break
+
+            path = os.path.join(
+                self.work_dir,
+                f"{self.client.model_id.replace('/', '_')}_{stamp}_{attempt}.jsonl"
+            )
+            write_batch_file(self.client, requests, pending, path)
+            print(f"  {label}: submitting {len(pending)} requests ({path})")
+
+            start = time.perf_counter()
+            batch = self._wait(self._submit(path))
+            rows, _ = self._collect(batch)
+            elapsed = time.perf_counter() - start
+
+            for i, text in rows.items():
+                responses[i] = text
+                if cache is not None:
+                    cache.put(self._cache_key(requests[i]), text)
+                if on_result is not None:
+                    on_result(i, text, {"latency": elapsed, "retries": attempt})
+
+            # Anything without a successful row (errored, expired, or missing) is retried
+            pending = [i for i in pending if i not in rows]
+            if pending and attempt < self.max_resubmits:
+                print(f"  {label}: {len(pending)} requests failed, resubmitting")
+
+        if pending:
+            print(f"  {label}: {len(pending)} requests failed after {self.max_resubmits} resubmissions")
+            if on_result is not None:
+                for i in pending:
+                    on_result(i, None, {"failed": True, "latency": 0.0})
+
+        return responses
@@ -0,0 +1,113 @@
+"""Persistent, content-addressed cache for LLM responses."""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from config import CACHE_DIR, CACHE_MAX_ENTRIES
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache with LRU eviction.
+
+    Entries are keyed by a hash of everything that determines the model output,
+    so identical requests across reruns are answered from disk. The cache is
+    safe to share between threads and between models.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_entries: int = CACHE_MAX_ENTRIES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "responses.sqlite")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+        )
+        self._size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model_id: str,
+        system_prompt: Optional[str],
+        prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """Hash the request parameters into a cache key."""
+        payload = json.dumps(
+            [provider, model_id, system_prompt, prompt, temperature, max_tokens],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            return row[0]
+
+    def put(self, key: str, response: str):
+        """Store a response, evicting least recently used entries over the cap."""
+        with self._lock:
+            now = time.time()
+            updated = self._conn.execute(
+                "UPDATE responses SET response = ?, last_access = ? WHERE key = ?",
+                (response, now, key)
+            ).rowcount
+            if updated:
+                return
+
+            self._conn.execute(
+                "INSERT INTO responses (key, response, last_access) VALUES (?, ?, ?)",
+                (key, response, now)
+            )
+            self._size += 1
+
+            excess = self._size - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                    (excess,)
+                )
+                self._size -= excess
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and current size."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0,
+            "entries": self._size,
+            "max_entries": self.max_entries
+        }
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -1,12 +1,8 @@
 """Configuration for multilingual LLM evaluation experiments."""
 import os
-import random
-import numpy as np
 
-# Random seed for reproducibility
+# Random seed for reproducibility (sampling and bootstrap resampling are seeded from it)
 SEED = 42
-random.seed(SEED)
-np.random.seed(SEED)
 
 # API Keys
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -14,9 +10,27 @@ ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 
 # Models to evaluate
+# rate_limits are client-side budgets shared by all models of a provider
+# endpoint (models on the same endpoint must use the same limits); adjust them
+# to the account tier. Omit the key to disable limiting.
 MODELS = {
-    "gpt-4.1": {"provider": "openai", "model_id": "gpt-4.1"},
-    "claude-sonnet-4.5": {"provider": "openrouter", "model_id": "anthropic/claude-sonnet-4"},
+    "gpt-4.1": {
+        "provider": "openai", "model_id": "gpt-4.1",
+        "rate_limits": {
+            "requests_per_minute": 500, "tokens_per_minute": 30_000,
+            "initial_concurrency": 4, "max_concurrency": 32,
+        },
+        # USD per million tokens, for cost estimates
+        "pricing": {"input": 2.00, "cached_input": 0.50, "output": 8.00},
+    },
+    "claude-sonnet-4.5": {
+        "provider": "openrouter", "model_id": "anthropic/claude-sonnet-4",
+        "rate_limits": {
+            "requests_per_minute": 200, "tokens_per_minute": 40_000,
+            "initial_concurrency": 4, "max_concurrency": 16,
+        },
+        "pricing": {"input": 3.00, "cached_input": 0.30, "output": 15.00},
+    },
 }
 
 # Dataset paths
@@ -24,10 +38,19 @@ DATASET_PATHS = {
     "xnli": "/data/hypogenicai/workspaces/llm-linguistic-eval-bb29-claude/datasets/xnli",
     "sib200": "/data/hypogenicai/workspaces/llm-linguistic-eval-bb29-claude/datasets/sib200",
 }
+INDEX_DIR = "/data/hypogenicai/workspaces/llm-linguistic-eval-bb29-claude/datasets/index"
+# Languages found in the dataset directories (see language_registry.py)
+LANGUAGE_REGISTRY_PATH = os.path.join(INDEX_DIR, "languages.json")
 
 # Output directories
 RESULTS_DIR = "/data/hypogenicai/workspaces/llm-linguistic-eval-bb29-claude/results"
 FIGURES_DIR = "/data/hypogenicai/workspaces/llm-linguistic-eval-bb29-claude/figures"
+CACHE_DIR = "/data/hypogenicai/workspaces/llm-linguistic-eval-bb29-claude/cache"
+JOURNAL_DIR = os.path.join(RESULTS_DIR, "journals")
+BATCH_DIR = os.path.join(RESULTS_DIR, "batches")
+# Results files written per model: "json" (results_*.json) and/or "arrow"
+# (results_*.arrow, int8 label codes with a JSON header; see results_store.py)
+RESULTS_FORMATS = ["json", "arrow"]
 
 # Languages in XNLI
 XNLI_LANGUAGES = [
@@ -35,34 +58,9 @@ XNLI_LANGUAGES = [
     "ar", "zh", "vi", "th", "tr", "sw"
 ]
 
-# Language families for analysis
-LANGUAGE_FAMILIES = {
-    "Indo-European/Germanic": ["en", "de"],
-    "Indo-European/Romance": ["fr", "es"],
-    "Indo-European/Slavic": ["bg", "ru"],
-    "Indo-European/Greek": ["el"],
-    "Indo-European/Indo-Iranian": ["hi", "ur"],
-    "Afro-Asiatic": ["ar"],
-    "Sino-Tibetan": ["zh"],
-    "Austroasiatic": ["vi"],
-    "Tai-Kadai": ["th"],
-    "Turkic": ["tr"],
-    "Niger-Congo": ["sw"],
-}
-
-# Reverse lookup: language -> family
-LANGUAGE_TO_FAMILY = {}
-for family, langs in LANGUAGE_FAMILIES.items():
-    for lang in langs:
-        LANGUAGE_TO_FAMILY[lang] = family
-
-# Language full names
-LANGUAGE_NAMES = {
-    "en": "English", "de": "German", "fr": "French", "es": "Spanish",
-    "bg": "Bulgarian", "ru": "Russian", "el": "Greek", "hi": "Hindi",
-    "ur": "Urdu", "ar": "Arabic", "zh": "Chinese", "vi": "Vietnamese",
-    "th": "Thai", "tr": "Turkish", "sw": "Swahili"
-}
+# SIB-200 languages evaluated by default (short codes; see language_registry).
+# Every language on disk (200+) is evaluated only on request, with --languages all
+SIB200_DEFAULT_LANGUAGES = ["en", "de", "fr", "es", "ar", "zh", "ja", "ko"]
 
 # NLI labels
 NLI_LABELS = ["entailment", "neutral", "contradiction"]
@@ -80,4 +78,21 @@ SAMPLE_SIZE_SIB200 = 100  # 100 samples per language
 # API settings
 API_TEMPERATURE = 0.0  # Deterministic outputs
 API_MAX_TOKENS = 50  # Short response for classification
-API_TIMEOUT = 30  # seconds
+PACK_MAX_TOKENS_PER_PAIR = 20  # Answer budget per pair in packed NLI prompts
+API_PROMPT_CACHING = True  # Mark system prompts and template prefixes as cacheable
+
+# HTTP transport: one keep-alive connection pool per base_url, shared by all models
+API_CONNECT_TIMEOUT = 10  # seconds to open a connection (incl. TLS handshake)
+API_READ_TIMEOUT = 30  # seconds to wait for response data
+API_HTTP2 = True  # used when the optional h2 package is installed
+API_KEEPALIVE_EXPIRY = 120  # seconds an idle pooled connection stays open
+
+# Execution settings
+DEFAULT_CONCURRENCY = 1  # Requests in flight per model (1 = sequential)
+
+# Batch API settings
+BATCH_POLL_INTERVAL = 30  # seconds between batch status checks
+BATCH_MAX_RESUBMITS = 2  # resubmissions of failed rows
+
+# Response cache settings
+CACHE_MAX_ENTRIES = 500_000  # LRU eviction beyond this many cached responses
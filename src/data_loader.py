@@ -1,110 +1,285 @@
 """Data loading utilities for multilingual LLM evaluation."""
-import random
-from datasets import load_from_disk
-from typing import Dict, List, Tuple, Optional
-from config import (
-    DATASET_PATHS, XNLI_LANGUAGES, SAMPLE_SIZE_XNLI, SAMPLE_SIZE_SIB200,
-    NLI_LABELS, SIB200_CATEGORIES, SEED
-)
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import Dict, Iterator, List, Tuple, Optional
+from config import SAMPLE_SIZE_XNLI, SAMPLE_SIZE_SIB200, NLI_LABELS, SIB200_DEFAULT_LANGUAGES
+from language_registry import load_registry
+from sample_index import read_sample_index
+from sampler import IndexSets, label_codes
 
-random.seed(SEED)
+
+def available_languages(dataset: str, split: str = "test") -> List[str]:
+    """Languages with dataset's split on disk, per the language registry, in registry order."""
+    return load_registry().languages(dataset, split)
+
+
+# Language selection meaning every language of the dataset on disk
+ALL_LANGUAGES = "all"
+
+
+def select_languages(dataset: str, languages: Optional[List[str]], split: str = "test") -> List[str]:
+    """
+    The languages to evaluate for a dataset.
+
+    None selects the default: every XNLI language, or the configured
+    SIB200_DEFAULT_LANGUAGES. ["all"] (--languages all) selects every
+    language on disk, which for SIB-200 is 200+ languages; any other list
+    is returned as given.
+    """
+    if languages is None and dataset == "sib200":
+        return list(SIB200_DEFAULT_LANGUAGES)
+    if languages is None or list(languages) == [ALL_LANGUAGES]:
+        return available_languages(dataset, split)
+    return list(languages)
+
+
+def read_split(files: List[str]) -> pa.Table:
+    """
+    Memory-map a saved dataset split (its Arrow stream data files) as a table.
+
+    Opening is zero-copy and does not import datasets, so it costs the same
+    for a 100-row language as for a large one.
+    """
+    tables = [pa.ipc.open_stream(pa.memory_map(path, "r")).read_all() for path in files]
+    return tables[0] if len(tables) == 1 else pa.concat_tables(tables)
 
 
 def load_xnli_samples(
     languages: Optional[List[str]] = None,
     n_samples: int = SAMPLE_SIZE_XNLI,
-    split: str = "test"
+    split: str = "test",
+    use_index: bool = True,
+    stratify: bool = True
 ) -> Dict[str, List[Dict]]:
     """
     Load XNLI samples for specified languages.
 
     Returns a dict mapping language code to list of samples.
     Each sample is a dict with keys: 'premise', 'hypothesis', 'label', 'label_name'
+
+    All languages share the same sampled rows, balanced across labels
+    unless stratify=False (see sampler.py). If a sample index was prepared
+    with sample_index.py (and the dataset is unchanged since), it is
+    memory-mapped instead of deserializing the dataset, and each language's
+    samples are a read-only view into it (sample_index.SampleRows).
     """
-    if languages is None:
-        languages = XNLI_LANGUAGES
+    languages = select_languages("xnli", languages, split)
+
+    if use_index:
+        indexed = read_sample_index("xnli", split, n_samples, languages, stratify=stratify)
+        if indexed is not None:
+            return indexed
+
+    data, indices = _sample_xnli(n_samples, split, stratify)
+    return _extract_xnli_samples(data, indices, languages)
+
+
+def iter_xnli_rows(
+    languages: Optional[List[str]] = None,
+    n_samples: int = SAMPLE_SIZE_XNLI,
+    split: str = "test",
+    chunk_size: int = 256,
+    use_index: bool = True,
+    stratify: bool = True
+) -> Iterator[Tuple[int, Dict[str, Dict]]]:
+    """
+    Stream XNLI samples one parallel row at a time.
+
+    Yields (index, {lang: sample}) in sampling order, with samples shaped as
+    in load_xnli_samples. Rows are extracted chunk_size at a time, so memory
+    stays bounded regardless of n_samples.
+    """
+    languages = select_languages("xnli", languages, split)
+
+    if use_index:
+        indexed = read_sample_index("xnli", split, n_samples, languages, stratify=stratify)
+        if indexed is not None:
+            yield from group_by_index(indexed)
+            return
+
+    data, indices = _sample_xnli(n_samples, split, stratify)
+    for start in range(0, len(indices), chunk_size):
+        chunk = _extract_xnli_samples(data, indices[start:start + chunk_size], languages)
+        yield from group_by_index(chunk)
+
+
+def group_by_index(samples_by_lang: Dict[str, List[Dict]]) -> Iterator[Tuple[int, Dict[str, Dict]]]:
+    """Regroup per-language sample lists into parallel rows, in first-seen order."""
+    rows: Dict[int, Dict[str, Dict]] = {}
+    for lang, samples in samples_by_lang.items():
+        for sample in samples:
+            rows.setdefault(sample["index"], {})[lang] = sample
+    yield from rows.items()
 
-    dataset = load_from_disk(DATASET_PATHS["xnli"])
-    data = dataset[split]
 
-    # Sample indices
-    n_total = len(data)
-    indices = random.sample(range(n_total), min(n_samples, n_total))
+def _sample_xnli(n_samples: int, split: str, stratify: bool = True):
+    """Open the XNLI split and get the sampled row indices, shared by all languages."""
+    registry = load_registry()
+    # Every XNLI row holds every language, so all languages share the data files
+    languages = registry.languages("xnli", split)
+    if not languages:
+        raise FileNotFoundError(f"No XNLI {split} split on disk")
+    data = read_split(registry.data_files("xnli", languages[0], split))
+
+    index_sets = IndexSets("xnli", split, n_samples, stratify)
+    indices = index_sets.get(None, data.num_rows, lambda: label_codes(data.column("label")))
+    index_sets.save()
+    return data, indices
+
+
+def _extract_xnli_samples(data, indices: List[int], languages: List[str]) -> Dict[str, List[Dict]]:
+    """Build per-language samples for the given rows, reading columns rather than rows."""
+    # Fetch all sampled rows in a single Arrow take and work column-wise
+    table = data.take(indices)
+    premises = table.column("premise").combine_chunks()
+    hypotheses = table.column("hypothesis").combine_chunks()
+    label_idxs = table.column("label").to_pylist()
+    label_names = [NLI_LABELS[label_idx] for label_idx in label_idxs]
+
+    hyp_languages = hypotheses.field("language")
+    hyp_translations = hypotheses.field("translation")
+    hyp_offsets = hyp_translations.offsets.to_numpy()[:-1]
+    hyp_positions = _hypothesis_positions(hyp_languages, languages)
 
     samples_by_lang = {lang: [] for lang in languages}
 
-    for idx in indices:
-        item = data[idx]
-        label_idx = item["label"]
-        label_name = NLI_LABELS[label_idx]
-
-        # Get hypothesis for each language
-        hypothesis_langs = item["hypothesis"]["language"]
-        hypothesis_translations = item["hypothesis"]["translation"]
-
-        for lang in languages:
-            if lang in item["premise"] and lang in hypothesis_langs:
-                h_idx = hypothesis_langs.index(lang)
-                sample = {
-                    "premise": item["premise"][lang],
-                    "hypothesis": hypothesis_translations[h_idx],
-                    "label": label_idx,
-                    "label_name": label_name,
-                    "index": idx
-                }
-                samples_by_lang[lang].append(sample)
+    for lang in languages:
+        if premises.type.get_field_index(lang) < 0:
+            continue
+
+        # Rows whose hypothesis has a translation in this language
+        positions = hyp_positions[lang]
+        rows = np.flatnonzero(positions >= 0)
+        if len(rows) == 0:
+            continue
+
+        lang_premises = premises.field(lang).take(pa.array(rows)).to_pylist()
+        lang_hypotheses = hyp_translations.values.take(
+            pa.array(hyp_offsets[rows] + positions[rows])
+        ).to_pylist()
+
+        samples_by_lang[lang] = [
+            {
+                "premise": premise,
+                "hypothesis": hypothesis,
+                "label": label_idxs[row],
+                "label_name": label_names[row],
+                "index": indices[row]
+            }
+            for row, premise, hypothesis in zip(rows, lang_premises, lang_hypotheses)
+        ]
 
     return samples_by_lang
 
 
+def _hypothesis_positions(
+    hyp_languages: pa.ListArray,
+    languages: List[str]
+) -> Dict[str, np.ndarray]:
+    """
+    Map language -> per-row position within the hypothesis translation list (-1 if absent).
+
+    XNLI stores the same sorted language list on every row, so the positions
+    are derived once from the first row after checking all rows at once;
+    other layouts fall back to a per-row lookup.
+    """
+    n_rows = len(hyp_languages)
+    if n_rows == 0:
+        return {lang: np.empty(0, dtype=np.int64) for lang in languages}
+
+    first = hyp_languages[0].as_py()
+    lengths = pc.list_value_length(hyp_languages).to_numpy(zero_copy_only=False)
+    start = hyp_languages.offsets[0].as_py()
+    uniform = bool((lengths == len(first)).all()) and hyp_languages.values.slice(
+        start, n_rows * len(first)
+    ).equals(pa.array(first * n_rows, type=hyp_languages.type.value_type))
+
+    if uniform:
+        position_map = {lang: pos for pos, lang in enumerate(first)}
+        return {
+            lang: np.full(n_rows, position_map.get(lang, -1), dtype=np.int64)
+            for lang in languages
+        }
+
+    rows = hyp_languages.to_pylist()
+    return {
+        lang: np.array([row.index(lang) if lang in row else -1 for row in rows], dtype=np.int64)
+        for lang in languages
+    }
+
+
 def load_sib200_samples(
     languages: Optional[List[str]] = None,
     n_samples: int = SAMPLE_SIZE_SIB200,
-    split: str = "test"
+    split: str = "test",
+    use_index: bool = True,
+    max_workers: int = 8,
+    stratify: bool = True
 ) -> Dict[str, List[Dict]]:
     """
     Load SIB-200 samples for specified languages.
 
     Returns a dict mapping language code to list of samples.
     Each sample is a dict with keys: 'text', 'category', 'index_id'
-    """
-    # Map language codes to SIB-200 codes
-    lang_to_sib = {
-        "en": "eng_Latn", "de": "deu_Latn", "fr": "fra_Latn", "es": "spa_Latn",
-        "ar": "arb_Arab", "zh": "zho_Hans", "ja": "jpn_Jpan", "ko": "kor_Hang"
-    }
 
-    if languages is None:
-        languages = list(lang_to_sib.keys())
-
-    samples_by_lang = {}
+    Languages are looked up in the language registry, by short code ("de")
+    or FLORES-200 code ("deu_Latn"); by default SIB200_DEFAULT_LANGUAGES are
+    loaded, and ["all"] loads every language on disk (see select_languages).
+    The languages are read by at most max_workers threads; each language's
+    sample is drawn independently, balanced across categories unless
+    stratify=False (see sampler.py), so it is the same whichever languages
+    are loaded alongside it. If a sample index was prepared with
+    sample_index.py, it is memory-mapped instead, as in load_xnli_samples.
+    """
+    registry = load_registry()
+    languages = select_languages("sib200", languages, split)
 
+    on_disk = set(registry.languages("sib200", split))
+    to_load = []
     for lang in languages:
-        sib_code = lang_to_sib.get(lang)
-        if sib_code is None:
+        code = registry.resolve(lang)
+        if code not in on_disk:
+            print(f"No SIB-200 {split} data for {lang}")
             continue
+        to_load.append(code)
+
+    if use_index:
+        indexed = read_sample_index("sib200", split, n_samples, to_load, stratify=stratify)
+        if indexed is not None:
+            return indexed
 
-        try:
-            dataset_path = f"{DATASET_PATHS['sib200']}/{sib_code}"
-            dataset = load_from_disk(dataset_path)
-            data = dataset[split]
-
-            n_total = len(data)
-            indices = random.sample(range(n_total), min(n_samples, n_total))
-
-            samples = []
-            for idx in indices:
-                item = data[idx]
-                samples.append({
-                    "text": item["text"],
-                    "category": item["category"],
-                    "index_id": item["index_id"],
-                    "index": idx
-                })
-
-            samples_by_lang[lang] = samples
-        except Exception as e:
-            print(f"Could not load SIB-200 for {lang}: {e}")
+    index_sets = IndexSets("sib200", split, n_samples, stratify)
+
+    def load(lang):
+        data = read_split(registry.data_files("sib200", lang, split))
+        indices = index_sets.get(lang, data.num_rows, lambda: label_codes(data.column("category")))
+        table = data.take(indices)
+        return [
+            {
+                "text": text,
+                "category": category,
+                "index_id": index_id,
+                "index": idx
+            }
+            for text, category, index_id, idx in zip(
+                table.column("text").to_pylist(),
+                table.column("category").to_pylist(),
+                table.column("index_id").to_pylist(),
+                indices
+            )
+        ]
+
+    samples_by_lang = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, max(len(to_load), 1))) as pool:
+        futures = [(lang, pool.submit(load, lang)) for lang in to_load]
+        for lang, future in futures:
+            try:
+                samples_by_lang[lang] = future.result()
+            except Exception as e:
+                print(f"Could not load SIB-200 for {lang}: {e}")
+    index_sets.save()
 
     return samples_by_lang
 
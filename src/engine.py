@@ -0,0 +1,305 @@
+"""Request execution engine for LLM evaluation runs."""
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from tqdm import tqdm
+from config import API_MAX_TOKENS
+from transport import event_loop
+
+# A request is a (prompt, system_prompt) pair, optionally followed by a
+# max_tokens override for requests that need longer answers
+Request = Union[Tuple[str, Optional[str]], Tuple[str, Optional[str], int]]
+
+# Called as on_result(position, response, stats) when a request finishes; stats
+# always has "latency" and, for LLMClient calls, the fields of complete_with_stats
+ResultCallback = Callable[[int, Optional[str], Dict[str, Any]], None]
+
+
+def _safe_complete(client, request: Request) -> Tuple[Optional[str], Dict[str, Any]]:
+    """Complete a single request, returning (response, stats); response is None on failure."""
+    prompt, system_prompt, max_tokens = request_params(request)
+    start = time.perf_counter()
+    stats: Dict[str, Any] = {}
+    try:
+        if hasattr(client, "complete_with_stats"):
+            response, stats = client.complete_with_stats(
+                prompt, system_prompt=system_prompt, max_tokens=max_tokens
+            )
+        else:
+            response = client.complete(prompt, system_prompt=system_prompt, max_tokens=max_tokens)
+    except Exception as e:
+        print(f"      Error: {e}")
+        response = None
+        stats = {"failed": True}
+    stats["latency"] = time.perf_counter() - start
+    return response, stats
+
+
+def request_params(request: Request) -> Tuple[str, Optional[str], int]:
+    """Unpack a request into (prompt, system_prompt, max_tokens)."""
+    prompt, system_prompt = request[0], request[1]
+    max_tokens = request[2] if len(request) > 2 else API_MAX_TOKENS
+    return prompt, system_prompt, max_tokens
+
+
+async def _safe_acomplete(client, request: Request) -> Tuple[Optional[str], Dict[str, Any]]:
+    """Async variant of _safe_complete for clients with acomplete_with_stats()."""
+    prompt, system_prompt, max_tokens = request_params(request)
+    start = time.perf_counter()
+    try:
+        response, stats = await client.acomplete_with_stats(
+            prompt, system_prompt=system_prompt, max_tokens=max_tokens
+        )
+    except Exception as e:
+        print(f"      Error: {e}")
+        response = None
+        stats = {"failed": True}
+    stats["latency"] = time.perf_counter() - start
+    return response, stats
+
+
+class _AsyncPool:
+    """
+    ThreadPoolExecutor stand-in that runs requests as coroutines.
+
+    Submitted calls are scheduled on the shared event loop and return
+    concurrent futures, with at most `concurrency` running at once, so
+    thousands of requests can be in flight without one thread each.
+    """
+
+    def __init__(self, concurrency: int):
+        self.loop = event_loop()
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def _bounded(self, fn, args):
+        async with self.semaphore:
+            return await fn(*args)
+
+    def submit(self, fn, *args) -> Future:
+        return asyncio.run_coroutine_threadsafe(self._bounded(fn, args), self.loop)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _is_async(client) -> bool:
+    return hasattr(client, "acomplete_with_stats")
+
+
+def _executor(client, concurrency: int):
+    """(pool, completion function) for a client: coroutines for async clients, else threads."""
+    if _is_async(client):
+        return _AsyncPool(concurrency), _safe_acomplete
+    return ThreadPoolExecutor(max_workers=concurrency), _safe_complete
+
+
+def complete_many(
+    client,
+    requests: List[Request],
+    concurrency: int = 1,
+    desc: Optional[str] = None,
+    on_result: Optional[ResultCallback] = None,
+    postfix: Optional[Callable[[], Dict[str, str]]] = None
+) -> List[Optional[str]]:
+    """
+    Run a list of requests against the client.
+
+    With concurrency > 1 the requests are spread over a bounded thread pool;
+    requests of an async client always run as coroutines on the shared
+    event loop instead.
+    Responses are always returned in the same order as the requests, so the
+    result is identical to the sequential path. Failed requests yield None.
+    on_result is invoked as each request finishes (from worker threads when
+    running concurrently). postfix, if given, supplies live stats for the
+    progress bar after each result.
+    """
+    responses: List[Optional[str]] = [None] * len(requests)
+
+    def finish(progress, i: int, response: Optional[str], stats: Dict[str, Any]):
+        responses[i] = response
+        if on_result is not None:
+            on_result(i, response, stats)
+        if postfix is not None:
+            progress.set_postfix(postfix(), refresh=False)
+
+    if concurrency <= 1 and not _is_async(client):
+        progress = tqdm(requests, desc=desc, leave=False)
+        for i, request in enumerate(progress):
+            finish(progress, i, *_safe_complete(client, request))
+        return responses
+
+    pool, complete_fn = _executor(client, concurrency)
+    with pool:
+        futures = {
+            pool.submit(complete_fn, client, request): i
+            for i, request in enumerate(requests)
+        }
+        progress = tqdm(as_completed(futures), total=len(futures), desc=desc, leave=False)
+        for future in progress:
+            finish(progress, futures[future], *future.result())
+
+    return responses
+
+
+def complete_stream(
+    client,
+    items: Iterable[Tuple[Request, Any]],
+    concurrency: int = 1,
+    max_in_flight: Optional[int] = None
+) -> Iterator[Tuple[Any, Optional[str], Dict[str, Any]]]:
+    """
+    Stream (request, payload) items through the client.
+
+    Yields (payload, response, stats) in input order. At most max_in_flight
+    requests (default 4x concurrency) are submitted ahead of the consumer, so
+    the input iterable is only pulled as fast as responses are consumed.
+    """
+    if concurrency <= 1 and not _is_async(client):
+        for request, payload in items:
+            response, stats = _safe_complete(client, request)
+            yield payload, response, stats
+        return
+
+    max_in_flight = max_in_flight or 4 * concurrency
+    pool, complete_fn = _executor(client, concurrency)
+    with pool:
+        window = deque()
+        for request, payload in items:
+            window.append((pool.submit(complete_fn, client, request), payload))
+            if len(window) >= max_in_flight:
+                future, done_payload = window.popleft()
+                yield (done_payload, *future.result())
+
+        while window:
+            future, done_payload = window.popleft()
+            yield (done_payload, *future.result())
+
+
+class RequestPlan:
+    """
+    Collects requests from every evaluation mode before anything is sent.
+
+    Identical (prompt, system_prompt) pairs are stored once, so a request
+    shared by several languages or modes (e.g. the English translate-test
+    prompts) is sent to the model a single time and its response is fanned
+    back out to every (mode, language) that needs it.
+    """
+
+    def __init__(self):
+        self.requests: List[Request] = []
+        self.responses: List[Optional[str]] = []
+        self._slots: Dict[Request, int] = {}
+        self._owners: List[List[Tuple[str, str, Optional[int]]]] = []
+        self._consumers: Dict[Tuple[str, str], List[int]] = {}
+
+    def add(self, mode: str, lang: str, request: Request, index: Optional[int] = None) -> int:
+        """Register a request for (mode, lang) and return its slot."""
+        slot = self._slots.get(request)
+        if slot is None:
+            slot = len(self.requests)
+            self._slots[request] = slot
+            self.requests.append(request)
+            self._owners.append([])
+        self._owners[slot].append((mode, lang, index))
+        self._consumers.setdefault((mode, lang), []).append(slot)
+        return slot
+
+    def languages(self, mode: str) -> List[str]:
+        """Languages with at least one request in the given mode, in insertion order."""
+        return [lang for (m, lang) in self._consumers if m == mode]
+
+    @property
+    def n_planned(self) -> int:
+        """Total number of requests before deduplication."""
+        return sum(len(slots) for slots in self._consumers.values())
+
+    @property
+    def n_unique(self) -> int:
+        """Number of distinct requests that will actually be sent."""
+        return len(self.requests)
+
+    def execute(
+        self,
+        client,
+        concurrency: int = 1,
+        desc: Optional[str] = None,
+        journal=None,
+        batch_runner=None,
+        telemetry=None
+    ):
+        """
+        Send every unique request once.
+
+        If a journal is given, requests whose samples were already journaled
+        are answered from it, and every newly completed sample is appended
+        to it as soon as its response arrives. If a batch_runner is given, the
+        pending requests go through the provider's batch API instead of
+        synchronous calls. If a telemetry collector is given, each call's
+        stats are recorded against the first (mode, language) that planned it.
+        """
+        self.responses = [None] * len(self.requests)
+
+        request_keys = []
+        if journal is not None:
+            request_keys = [journal.request_key(request) for request in self.requests]
+
+        pending = []
+        for slot, owners in enumerate(self._owners):
+            if journal is not None:
+                for mode, lang, index in owners:
+                    response = journal.lookup(mode, lang, index, request_keys[slot])
+                    if response is not None:
+                        self.responses[slot] = response
+                        break
+            if self.responses[slot] is None:
+                pending.append(slot)
+
+        if journal is not None and len(pending) < len(self.requests):
+            print(f"  Resumed {len(self.requests) - len(pending)}/{len(self.requests)} "
+                  f"requests from journal")
+
+        def on_result(position: int, response: Optional[str], stats: Dict[str, Any]):
+            slot = pending[position]
+            self.responses[slot] = response
+            if telemetry is not None:
+                mode, lang, _ = self._owners[slot][0]
+                telemetry.record(mode, lang, stats)
+            if journal is not None and response is not None:
+                for mode, lang, index in self._owners[slot]:
+                    journal.record(
+                        mode, lang, index, request_keys[slot], response, stats["latency"]
+                    )
+
+        pending_requests = [self.requests[slot] for slot in pending]
+        if batch_runner is not None:
+            batch_runner.run(pending_requests, desc=desc, on_result=on_result)
+        else:
+            complete_many(
+                client,
+                pending_requests,
+                concurrency=concurrency,
+                desc=desc,
+                on_result=on_result,
+                postfix=telemetry.live_postfix if telemetry is not None else None
+            )
+
+        # Journal fan-out for samples whose request was answered by a sibling's entry
+        if journal is not None:
+            pending_slots = set(pending)
+            for slot, owners in enumerate(self._owners):
+                if slot in pending_slots or self.responses[slot] is None:
+                    continue
+                for mode, lang, index in owners:
+                    if journal.lookup(mode, lang, index, request_keys[slot]) is None:
+                        journal.record(
+                            mode, lang, index, request_keys[slot], self.responses[slot], 0.0
+                        )
+
+    def responses_for(self, mode: str, lang: str) -> List[Optional[str]]:
+        """Responses for (mode, lang), in the order the requests were added."""
+        return [self.responses[slot] for slot in self._consumers.get((mode, lang), [])]
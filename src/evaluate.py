@@ -3,165 +3,549 @@ import json
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-from tqdm import tqdm
+from typing import Callable, Dict, List, Optional, Tuple
 import numpy as np
 
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import (
-    MODELS, XNLI_LANGUAGES, RESULTS_DIR, SEED,
-    SAMPLE_SIZE_XNLI, NLI_LABELS, LANGUAGE_NAMES
+    MODELS, RESULTS_DIR, SEED,
+    SAMPLE_SIZE_XNLI, NLI_LABELS, SIB200_CATEGORIES,
+    DEFAULT_CONCURRENCY, CACHE_DIR,
+    JOURNAL_DIR, BATCH_POLL_INTERVAL, PACK_MAX_TOKENS_PER_PAIR, RESULTS_FORMATS
 )
-from data_loader import load_xnli_samples
-from llm_api import create_client
+from batch import BatchRunner
+from cache import ResponseCache
+from data_loader import (
+    select_languages, load_xnli_samples, load_sib200_samples, iter_xnli_rows, group_by_index
+)
+from engine import RequestPlan
+from journal import ResultJournal
+from language_registry import language_name
+from pipeline import run_streaming_nli
+from response_store import RESPONSE_FIELDS, RESPONSE_MODES, responses_path, write_responses
+from metrics import CellCodes, cell_metrics
+from results_store import CODED_MODES, encode_labels, results_table_path, write_results_table
+from llm_api import create_client, reserve_connections
+from telemetry import Telemetry, write_prometheus
 from prompts import (
-    format_nli_prompt, format_translation_prompt,
-    parse_nli_response, NLI_SYSTEM_PROMPT
+    format_nli_prompt, format_packed_nli_prompt, format_translation_prompt, format_topic_prompt,
+    parse_nli_response, parse_packed_nli_response, parse_topic_response,
+    NLI_MATCHER, TOPIC_MATCHER, NLI_SYSTEM_PROMPT, NLI_PACKED_SYSTEM_PROMPT, TOPIC_SYSTEM_PROMPT
 )
 
+TASKS = ["xnli", "sib200", "all"]
 
-def evaluate_nli_direct(
-    client,
+# Column label for topic predictions outside SIB200_CATEGORIES
+TOPIC_OTHER = "other"
+
+# Response parser per evaluation mode
+PARSERS = {
+    "direct": parse_nli_response,
+    "translate_test": parse_nli_response,
+    "topic": parse_topic_response,
+    "direct_packed": parse_packed_nli_response,
+    "translate_test_packed": parse_packed_nli_response,
+}
+
+NLI_MODES = ["direct", "translate_test"]
+
+# Result mode of each NLI mode when packed. Packed prompts carry English
+# instructions for every language, so their results are kept apart from the
+# native-language prompts of "direct"
+PACKED_MODES = {mode: f"{mode}_packed" for mode in NLI_MODES}
+
+# Label vocabulary per mode, for the int8 codes of the columnar results file
+RESULT_VOCABULARIES = {
+    "direct": NLI_LABELS,
+    "translate_test": NLI_LABELS,
+    "topic": SIB200_CATEGORIES + [TOPIC_OTHER],
+    "direct_packed": NLI_LABELS,
+    "translate_test_packed": NLI_LABELS,
+}
+
+
+def plan_nli_direct(
+    plan: RequestPlan,
     samples: Dict[str, List[Dict]],
-    languages: List[str],
-    model_name: str
-) -> Dict[str, Dict]:
+    languages: List[str]
+) -> Dict[str, List[str]]:
     """
-    Evaluate NLI task directly in each language.
+    Add direct-evaluation requests (native language prompts) to the plan.
 
-    Returns dict mapping language -> {accuracy, predictions, labels}
+    Returns dict mapping language -> gold labels, aligned with the planned requests.
     """
-    results = {}
+    labels_by_lang = {}
 
     for lang in languages:
         if lang not in samples or not samples[lang]:
             print(f"  Skipping {lang}: no samples")
             continue
 
-        lang_samples = samples[lang]
-        predictions = []
-        labels = []
-
-        print(f"  Evaluating {lang} ({LANGUAGE_NAMES.get(lang, lang)})...")
-
-        for sample in tqdm(lang_samples, desc=f"    {lang}", leave=False):
+        labels_by_lang[lang] = []
+        for sample in samples[lang]:
             prompt = format_nli_prompt(
                 sample["premise"],
                 sample["hypothesis"],
                 language=lang
             )
+            plan.add(
+                "direct", lang, (prompt, NLI_SYSTEM_PROMPT["multilingual"]),
+                index=sample["index"]
+            )
+            labels_by_lang[lang].append(sample["label_name"])
 
-            try:
-                response = client.complete(
-                    prompt,
-                    system_prompt=NLI_SYSTEM_PROMPT["multilingual"]
+    return labels_by_lang
+
+
+def plan_nli_translate_test(
+    plan: RequestPlan,
+    samples: Dict[str, List[Dict]],
+    english_samples: Dict[str, List[Dict]],
+    languages: List[str]
+) -> Dict[str, List[str]]:
+    """
+    Add translate-test requests to the plan.
+
+    For each non-English sample, the parallel English premise/hypothesis is
+    used as its ground truth translation. Every language therefore plans the
+    same English prompts, which the plan deduplicates.
+    """
+    labels_by_lang = {}
+
+    # Get English sample indices for lookup
+    en_by_idx = {s["index"]: s for s in english_samples.get("en", [])}
+
+    for lang in languages:
+        if lang == "en" or lang not in samples:
+            continue
+
+        labels_by_lang[lang] = []
+        for sample in samples[lang]:
+            idx = sample["index"]
+            if idx in en_by_idx:
+                en_sample = en_by_idx[idx]
+                prompt = format_nli_prompt(
+                    en_sample["premise"],
+                    en_sample["hypothesis"],
+                    language="en"
                 )
-                pred = parse_nli_response(response)
-            except Exception as e:
-                print(f"      Error: {e}")
-                pred = "neutral"  # Default on error
+                plan.add(
+                    "translate_test", lang, (prompt, NLI_SYSTEM_PROMPT["en"]),
+                    index=idx
+                )
+                labels_by_lang[lang].append(sample["label_name"])
 
-            predictions.append(pred)
-            labels.append(sample["label_name"])
+    return labels_by_lang
 
-        # Calculate accuracy
-        correct = sum(1 for p, l in zip(predictions, labels) if p == l)
-        accuracy = correct / len(labels) if labels else 0
+
+def score_nli(
+    plan: RequestPlan,
+    mode: str,
+    labels_by_lang: Dict[str, List[str]],
+    verbose: bool = True
+) -> Dict[str, Dict]:
+    """
+    Parse the executed plan's responses for one mode and compute accuracy.
+
+    Returns dict mapping language -> {accuracy, predictions, labels, unparseable, responses}
+    """
+    responses_by_lang = {lang: plan.responses_for(mode, lang) for lang in labels_by_lang}
+    return score_nli_responses(mode, responses_by_lang, labels_by_lang, verbose)
+
+
+def score_nli_responses(
+    mode: str,
+    responses_by_lang: Dict[str, List[Optional[str]]],
+    labels_by_lang: Dict[str, List[str]],
+    verbose: bool = True
+) -> Dict[str, Dict]:
+    """
+    Parse raw NLI responses for one mode and compute accuracy.
+
+    Missing or unparseable responses are scored as "neutral" and counted.
+    The raw responses are kept in the results for save_results to store.
+    """
+    predictions_by_lang = {}
+    unparseable_by_lang = {}
+    for lang in labels_by_lang:
+        predictions_by_lang[lang], unparseable = NLI_MATCHER.parse_many(
+            responses_by_lang[lang], default="neutral"
+        )
+        unparseable_by_lang[lang] = int(unparseable.sum())
+
+    results = _nli_results(mode, predictions_by_lang, labels_by_lang, verbose, unparseable_by_lang)
+    for lang in results:
+        results[lang]["responses"] = responses_by_lang[lang]
+    return results
+
+
+def _nli_results(
+    mode: str,
+    predictions_by_lang: Dict[str, List[str]],
+    labels_by_lang: Dict[str, List[str]],
+    verbose: bool = True,
+    unparseable_by_lang: Optional[Dict[str, int]] = None
+) -> Dict[str, Dict]:
+    """Per-language NLI results from aligned predictions and gold labels."""
+    results = {}
+    metrics = _language_metrics(predictions_by_lang, labels_by_lang, NLI_LABELS)
+
+    for lang, labels in labels_by_lang.items():
+        correct = metrics[lang]["correct"]
+        accuracy = metrics[lang]["accuracy"]
 
         results[lang] = {
             "accuracy": accuracy,
             "n_samples": len(labels),
-            "predictions": predictions,
+            "predictions": predictions_by_lang[lang],
             "labels": labels,
-            "correct": correct
+            "correct": correct,
+            "macro_f1": metrics[lang]["macro_f1"]
         }
+        if unparseable_by_lang is not None:
+            results[lang]["unparseable"] = unparseable_by_lang[lang]
+        if mode in ("translate_test", PACKED_MODES["translate_test"]):
+            results[lang]["method"] = "translate_test"
 
-        print(f"    {lang}: {accuracy:.2%} ({correct}/{len(labels)})")
+        if verbose:
+            print(f"    {lang} ({language_name(lang)}): "
+                  f"{accuracy:.2%} ({correct}/{len(labels)})"
+                  + _unparseable_note(results[lang]))
 
     return results
 
 
-def evaluate_nli_translate_test(
-    client,
+def _language_metrics(
+    predictions_by_lang: Dict[str, List[str]],
+    labels_by_lang: Dict[str, List[str]],
+    vocab: List[str]
+) -> Dict[str, Dict]:
+    """Accuracy, macro-F1 and confusion of every language at once (see metrics.cell_metrics)."""
+    langs = list(labels_by_lang)
+    cells = CellCodes.from_arrays(
+        [("", "", lang) for lang in langs],
+        [encode_labels(labels_by_lang[lang], vocab) for lang in langs],
+        [encode_labels(predictions_by_lang[lang], vocab) for lang in langs],
+        len(vocab)
+    )
+    metrics = cell_metrics(cells)
+    return {
+        lang: {
+            "correct": int(metrics["correct"][i]),
+            "accuracy": float(metrics["accuracy"][i]),
+            "macro_f1": round(float(metrics["macro_f1"][i]), 4),
+            "confusion": metrics["confusion"][i]
+        }
+        for i, lang in enumerate(langs)
+    }
+
+
+def _unparseable_note(result: Dict) -> str:
+    """Suffix for a per-language score line when some responses could not be parsed."""
+    n = result.get("unparseable", 0)
+    return f", {n} unparseable" if n else ""
+
+
+def plan_nli_packed(
+    plan: RequestPlan,
+    mode: str,
     samples: Dict[str, List[Dict]],
-    english_samples: Dict[str, List[Dict]],
     languages: List[str],
-    model_name: str
-) -> Dict[str, Dict]:
+    pack_size: int
+) -> Dict[str, List[List[Dict]]]:
     """
-    Evaluate NLI using translate-to-English approach.
+    Add packed NLI requests for one mode, pack_size samples per request.
 
-    For each non-English sample, translate to English first, then evaluate.
-    Uses the parallel English samples as ground truth translations.
+    Direct packs use each language's own pairs; translate-test packs use
+    the parallel English pairs, so packs of languages whose sample lists
+    line up are identical and deduplicated by the plan. Requests are
+    planned under the packed mode (PACKED_MODES).
+
+    Returns dict mapping language -> packs, each a list of the language's
+    samples in request order.
     """
-    results = {}
+    packs_by_lang = {}
+    en_by_idx = {s["index"]: s for s in samples.get("en", [])}
+
+    for lang in languages:
+        if mode == "direct":
+            lang_samples = samples.get(lang, [])
+        elif lang != "en":
+            lang_samples = [s for s in samples.get(lang, []) if s["index"] in en_by_idx]
+        else:
+            continue
+        if not lang_samples:
+            continue
+
+        packs_by_lang[lang] = []
+        for start in range(0, len(lang_samples), pack_size):
+            pack = lang_samples[start:start + pack_size]
+            sources = pack if mode == "direct" else [en_by_idx[s["index"]] for s in pack]
+            prompt = format_packed_nli_prompt([(s["premise"], s["hypothesis"]) for s in sources])
+            request = (prompt, NLI_PACKED_SYSTEM_PROMPT, PACK_MAX_TOKENS_PER_PAIR * len(pack))
+            plan.add(PACKED_MODES[mode], lang, request, index=pack[0]["index"])
+            packs_by_lang[lang].append(pack)
+
+    return packs_by_lang
+
+
+def unpack_nli(
+    plan: RequestPlan,
+    mode: str,
+    packs_by_lang: Dict[str, List[List[Dict]]]
+) -> Dict[str, List[Optional[str]]]:
+    """
+    Parse the executed packed requests of one mode into per-sample labels.
+
+    Returns dict mapping language -> labels aligned with its packed samples,
+    None where the packed answer was missing or unparseable.
+    """
+    predictions_by_lang = {}
+    for lang, packs in packs_by_lang.items():
+        predictions_by_lang[lang] = []
+        for pack, response in zip(packs, plan.responses_for(PACKED_MODES[mode], lang)):
+            if response is None:
+                predictions_by_lang[lang].extend([None] * len(pack))
+            else:
+                predictions_by_lang[lang].extend(parse_packed_nli_response(response, len(pack)))
+    return predictions_by_lang
 
-    # Get English sample indices for lookup
-    en_by_idx = {s["index"]: s for s in english_samples.get("en", [])}
+
+def packed_predictions(
+    responses: List[Optional[str]],
+    pack_slots: List[int],
+    fallback_responses: List[Optional[str]]
+) -> Tuple[List[str], int]:
+    """
+    Per-sample NLI labels from packed responses.
+
+    Each sample takes the answer for its pair number (pack_slots) in its
+    packed response; samples whose answer is missing or unparseable take
+    the label of their single-sample fallback response. Returns
+    (predictions, number of samples that needed the fallback).
+    """
+    parsed = {}
+    predictions = []
+    n_unparsed = 0
+    for response, slot, fallback in zip(responses, pack_slots, fallback_responses):
+        label = None
+        if response is not None:
+            answers = parsed.get(response)
+            if answers is None:
+                answers = parsed[response] = parse_packed_nli_response(response)
+            label = answers[slot - 1] if slot <= len(answers) else None
+        if label is None:
+            n_unparsed += 1
+            label = parse_nli_response(fallback) if fallback is not None else "neutral"  # Default on error
+        predictions.append(label)
+    return predictions, n_unparsed
+
+
+def score_packed_responses(
+    mode: str,
+    columns_by_lang: Dict[str, Dict[str, List]],
+    verbose: bool = True
+) -> Tuple[Dict[str, Dict], int]:
+    """
+    Score one NLI mode from packed responses.
+
+    columns_by_lang maps language -> {"labels", "responses", "pack_slots",
+    "fallback_responses"}, one entry per sample. Returns (per-language
+    results, number of samples whose packed answer was unparsed); the
+    columns are kept in the results for save_results to store.
+    """
+    predictions_by_lang = {}
+    n_unparsed = 0
+    for lang, columns in columns_by_lang.items():
+        predictions_by_lang[lang], lang_unparsed = packed_predictions(
+            columns["responses"], columns["pack_slots"], columns["fallback_responses"]
+        )
+        n_unparsed += lang_unparsed
+
+    labels_by_lang = {lang: columns["labels"] for lang, columns in columns_by_lang.items()}
+    results = _nli_results(mode, predictions_by_lang, labels_by_lang, verbose)
+    for lang, columns in columns_by_lang.items():
+        for field in RESPONSE_FIELDS:
+            results[lang][field] = columns[field]
+    return results, n_unparsed
+
+
+def plan_topic(
+    plan: RequestPlan,
+    samples: Dict[str, List[Dict]],
+    languages: List[str]
+) -> Dict[str, List[str]]:
+    """
+    Add SIB-200 topic classification requests to the plan.
+
+    Returns dict mapping language -> gold categories, aligned with the planned requests.
+    """
+    labels_by_lang = {}
 
     for lang in languages:
-        if lang == "en" or lang not in samples:
+        if lang not in samples or not samples[lang]:
             continue
 
-        lang_samples = samples[lang]
-        predictions = []
-        labels = []
+        labels_by_lang[lang] = []
+        for sample in samples[lang]:
+            prompt = format_topic_prompt(sample["text"], language=lang)
+            plan.add("topic", lang, (prompt, TOPIC_SYSTEM_PROMPT), index=sample["index"])
+            labels_by_lang[lang].append(sample["category"])
 
-        print(f"  Translate-test {lang}...")
+    return labels_by_lang
 
-        for sample in tqdm(lang_samples, desc=f"    {lang}", leave=False):
-            # Use the parallel English translation (already available in dataset)
-            idx = sample["index"]
-            if idx in en_by_idx:
-                en_sample = en_by_idx[idx]
-                prompt = format_nli_prompt(
-                    en_sample["premise"],
-                    en_sample["hypothesis"],
-                    language="en"
-                )
 
-                try:
-                    response = client.complete(
-                        prompt,
-                        system_prompt=NLI_SYSTEM_PROMPT["en"]
-                    )
-                    pred = parse_nli_response(response)
-                except Exception as e:
-                    print(f"      Error: {e}")
-                    pred = "neutral"
+def score_topic(
+    plan: RequestPlan,
+    labels_by_lang: Dict[str, List[str]]
+) -> Dict[str, Dict]:
+    """
+    Parse topic responses and compute per-language accuracy and confusion.
 
-                predictions.append(pred)
-                labels.append(sample["label_name"])
+    See score_topic_responses.
+    """
+    responses_by_lang = {lang: plan.responses_for("topic", lang) for lang in labels_by_lang}
+    return score_topic_responses(responses_by_lang, labels_by_lang)
 
-        # Calculate accuracy
-        correct = sum(1 for p, l in zip(predictions, labels) if p == l)
-        accuracy = correct / len(labels) if labels else 0
+
+def score_topic_responses(
+    responses_by_lang: Dict[str, List[Optional[str]]],
+    labels_by_lang: Dict[str, List[str]],
+    verbose: bool = True
+) -> Dict[str, Dict]:
+    """
+    Parse raw topic responses and compute per-language accuracy and confusion.
+
+    The confusion matrix has one row per gold category and one column per
+    predicted category in SIB200_CATEGORIES order, plus a final TOPIC_OTHER
+    column for responses that matched no category. Those responses are
+    predicted as TOPIC_OTHER and counted as unparseable.
+    """
+    results = {}
+    predictions_by_lang = {}
+    unparseable_by_lang = {}
+    for lang in labels_by_lang:
+        predictions_by_lang[lang], unparseable_by_lang[lang] = TOPIC_MATCHER.parse_many(
+            responses_by_lang[lang], default=TOPIC_OTHER
+        )
+    metrics = _language_metrics(
+        predictions_by_lang, labels_by_lang, RESULT_VOCABULARIES["topic"]
+    )
+
+    for lang, labels in labels_by_lang.items():
+        correct = metrics[lang]["correct"]
+        accuracy = metrics[lang]["accuracy"]
 
         results[lang] = {
             "accuracy": accuracy,
             "n_samples": len(labels),
-            "predictions": predictions,
+            "predictions": predictions_by_lang[lang],
             "labels": labels,
             "correct": correct,
-            "method": "translate_test"
+            "macro_f1": metrics[lang]["macro_f1"],
+            "unparseable": int(unparseable_by_lang[lang].sum()),
+            # Gold rows are categories only; TOPIC_OTHER is a prediction column, and
+            # topic predictions are never outside the vocabulary (no unknown column)
+            "confusion": metrics[lang]["confusion"][
+                :len(SIB200_CATEGORIES), :len(RESULT_VOCABULARIES["topic"])
+            ].tolist(),
+            "responses": responses_by_lang[lang]
         }
 
-        print(f"    {lang}: {accuracy:.2%} ({correct}/{len(labels)})")
+        if verbose:
+            print(f"    {lang} ({language_name(lang)}): "
+                  f"{accuracy:.2%} ({correct}/{len(labels)})" + _unparseable_note(results[lang]))
 
     return results
 
 
+def evaluate_nli_direct(
+    client,
+    samples: Dict[str, List[Dict]],
+    languages: List[str],
+    model_name: str,
+    concurrency: int = 1
+) -> Dict[str, Dict]:
+    """
+    Evaluate NLI task directly in each language.
+
+    Returns dict mapping language -> {accuracy, predictions, labels}
+    """
+    plan = RequestPlan()
+    labels_by_lang = plan_nli_direct(plan, samples, languages)
+    plan.execute(client, concurrency=concurrency, desc="    direct")
+    return score_nli(plan, "direct", labels_by_lang)
+
+
+def evaluate_nli_translate_test(
+    client,
+    samples: Dict[str, List[Dict]],
+    english_samples: Dict[str, List[Dict]],
+    languages: List[str],
+    model_name: str,
+    concurrency: int = 1
+) -> Dict[str, Dict]:
+    """
+    Evaluate NLI using translate-to-English approach.
+
+    For each non-English sample, translate to English first, then evaluate.
+    Uses the parallel English samples as ground truth translations.
+    """
+    plan = RequestPlan()
+    labels_by_lang = plan_nli_translate_test(plan, samples, english_samples, languages)
+    plan.execute(client, concurrency=concurrency, desc="    translate")
+    return score_nli(plan, "translate_test", labels_by_lang)
+
+
 def run_experiment(
     model_name: str,
     languages: Optional[List[str]] = None,
-    n_samples: int = SAMPLE_SIZE_XNLI
+    n_samples: int = SAMPLE_SIZE_XNLI,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: Optional[ResponseCache] = None,
+    journal_dir: Optional[str] = JOURNAL_DIR,
+    resume: bool = False,
+    batch: bool = False,
+    batch_poll_interval: float = BATCH_POLL_INTERVAL,
+    stream: bool = False,
+    use_async: bool = False,
+    pack_size: int = 1,
+    pack_compare: bool = False,
+    task: str = "xnli",
+    samples: Optional[Dict[str, Dict[str, List[Dict]]]] = None,
+    telemetry: Optional[Telemetry] = None
 ) -> Dict:
-    """Run full evaluation experiment for a model."""
-    if languages is None:
-        languages = XNLI_LANGUAGES
+    """
+    Run full evaluation experiment for a model.
+
+    task selects XNLI (direct + translate-test), SIB-200 topic classification,
+    or both; all requests share one plan, so they run through the same
+    concurrent, cached and journaled path.
+
+    Completed samples are streamed to a per-model JSONL journal in journal_dir.
+    With resume=True, the journal is replayed and only missing requests are sent.
+    With batch=True, requests are submitted through the provider's batch API.
+    With stream=True, XNLI samples are streamed through a bounded pipeline and
+    scored incrementally; per-sample predictions are then only in the journal.
+    With use_async=True, requests run as coroutines on the SDKs' async clients
+    instead of one worker thread per in-flight request.
+    With pack_size > 1, XNLI pairs are sent pack_size per request and scored
+    under the packed modes; with pack_compare, accuracy deltas against one
+    pair per request are reported.
+
+    samples, as returned by load_shared_samples, lets several models share
+    one loaded copy of the data; otherwise each task's samples are loaded here.
+
+    Per-call latency, retries, tokens and cost are collected in telemetry
+    (a new collector if None) and reported under "telemetry" in the results.
+    """
+    run_xnli = task in ["xnli", "all"]
+    run_topic = task in ["sib200", "all"]
+    xnli_languages = select_languages("xnli", languages)
 
     print(f"\n{'='*60}")
     print(f"Evaluating: {model_name}")
@@ -169,66 +553,401 @@ def run_experiment(
 
     # Create client
     try:
-        client = create_client(model_name, MODELS)
+        client = create_client(
+            model_name, MODELS, cache=cache, concurrency=concurrency, asynchronous=use_async
+        )
     except Exception as e:
         print(f"Error creating client: {e}")
         return {}
 
-    # Load data
-    print("\nLoading XNLI samples...")
-    samples = load_xnli_samples(languages=languages, n_samples=n_samples)
+    batch_runner = None
+    if batch:
+        try:
+            batch_runner = BatchRunner(client, poll_interval=batch_poll_interval)
+        except ValueError as e:
+            print(f"Error: {e}")
+            client.close()
+            return {}
 
-    # Report sample counts
-    for lang in languages:
-        n = len(samples.get(lang, []))
-        print(f"  {lang}: {n} samples")
+    journal = None
+    if journal_dir:
+        journal_path = os.path.join(journal_dir, f"journal_{model_name.replace('.', '_')}.jsonl")
+        journal = ResultJournal(
+            journal_path, model_name, PARSERS, resume=resume,
+            provider=client.provider, model_id=client.model_id
+        )
 
-    # Direct evaluation
-    print("\n--- Direct Evaluation (native language prompts) ---")
-    direct_results = evaluate_nli_direct(client, samples, languages, model_name)
+    if samples is None:
+        # Streaming XNLI pulls its own rows; everything else is loaded up front
+        samples = {}
+        if run_xnli and not stream:
+            samples.update(load_shared_samples("xnli", languages, n_samples))
+        if run_topic:
+            samples.update(load_shared_samples("sib200", languages, n_samples))
 
-    # Translate-test evaluation
-    print("\n--- Translate-Test Evaluation ---")
-    translate_results = evaluate_nli_translate_test(
-        client, samples, samples, languages, model_name
-    )
+    if telemetry is None:
+        telemetry = Telemetry(model_name)
+
+    mode_results = {}
+    try:
+        if stream and run_xnli:
+            print("\nStreaming XNLI samples...")
+            if "xnli" in samples:
+                rows = group_by_index(samples["xnli"])
+            else:
+                rows = iter_xnli_rows(languages=xnli_languages, n_samples=n_samples)
+            mode_results.update(run_streaming_nli(
+                client, rows, xnli_languages, concurrency=concurrency, journal=journal,
+                telemetry=telemetry
+            ))
+            run_xnli = False
+
+        if run_xnli or run_topic:
+            mode_results.update(_run_planned(
+                client, samples, xnli_languages if run_xnli else None, run_topic,
+                concurrency, journal, batch_runner, telemetry, pack_size, pack_compare
+            ))
+    finally:
+        if journal is not None:
+            journal.close()
+        client.close()
 
     # Compile results
     results = {
         "model": model_name,
         "timestamp": datetime.now().isoformat(),
-        "n_samples_per_lang": n_samples,
-        "languages": languages,
-        "direct": direct_results,
-        "translate_test": translate_results
+        "task": task,
+        "n_samples_per_lang": n_samples
     }
+    if task in ["xnli", "all"]:
+        results["languages"] = xnli_languages
+    results.update(mode_results)
+    if "topic" in mode_results:
+        results["topic_languages"] = list(mode_results["topic"].keys())
+        results["topic_confusion_labels"] = SIB200_CATEGORIES + [TOPIC_OTHER]
+    results["telemetry"] = telemetry.summary()
+
+    print(f"\n{telemetry.format_summary()}")
+
+    return results
+
+
+def _run_planned(
+    client,
+    samples: Dict[str, Dict[str, List[Dict]]],
+    xnli_languages: Optional[List[str]],
+    run_topic: bool,
+    concurrency: int,
+    journal: Optional[ResultJournal],
+    batch_runner: Optional[BatchRunner],
+    telemetry: Optional[Telemetry] = None,
+    pack_size: int = 1,
+    pack_compare: bool = False
+) -> Dict[str, Dict]:
+    """
+    Plan every requested mode over the loaded samples, execute the plan and score it.
+
+    xnli_languages=None skips XNLI. With pack_size > 1, XNLI pairs are sent
+    pack_size per request (see _score_packed). Returns dict mapping
+    mode -> per-language results, plus "packing" stats when packing.
+    """
+    def execute(plan: RequestPlan, desc: str):
+        plan.execute(
+            client, concurrency=concurrency, desc=desc,
+            journal=journal, batch_runner=batch_runner, telemetry=telemetry
+        )
+
+    plan = RequestPlan()
+    planned = {}
+    packed = {}
+
+    if xnli_languages is not None:
+        # Plan both modes together so shared prompts are sent only once
+        xnli_samples = samples["xnli"]
+        if pack_size > 1:
+            for mode in NLI_MODES:
+                packed[mode] = plan_nli_packed(plan, mode, xnli_samples, xnli_languages, pack_size)
+        else:
+            planned["direct"] = plan_nli_direct(plan, xnli_samples, xnli_languages)
+            planned["translate_test"] = plan_nli_translate_test(
+                plan, xnli_samples, xnli_samples, xnli_languages
+            )
+
+    if run_topic:
+        topic_samples = samples["sib200"]
+        planned["topic"] = plan_topic(plan, topic_samples, list(topic_samples.keys()))
+
+    print(f"\nPlanned {plan.n_planned} requests, {plan.n_unique} unique after deduplication")
+    execute(plan, "  requests")
+
+    results = {}
+    if packed:
+        results.update(_score_packed(
+            plan, packed, xnli_samples, xnli_languages, pack_size, pack_compare, execute
+        ))
+
+    if "direct" in planned:
+        print("\n--- Direct Evaluation (native language prompts) ---")
+        results["direct"] = score_nli(plan, "direct", planned["direct"])
+
+        print("\n--- Translate-Test Evaluation ---")
+        results["translate_test"] = score_nli(plan, "translate_test", planned["translate_test"])
+
+    if "topic" in planned:
+        print("\n--- SIB-200 Topic Classification ---")
+        results["topic"] = score_topic(plan, planned["topic"])
 
     return results
 
 
-def save_results(results: Dict, filename: str):
-    """Save results to JSON file."""
+def _score_packed(
+    plan: RequestPlan,
+    packed: Dict[str, Dict[str, List[List[Dict]]]],
+    samples: Dict[str, List[Dict]],
+    languages: List[str],
+    pack_size: int,
+    pack_compare: bool,
+    execute: Callable[[RequestPlan, str], None]
+) -> Dict[str, Dict]:
+    """
+    Score executed packed NLI requests.
+
+    Results are stored under the packed modes (PACKED_MODES), not under
+    "direct" and "translate_test": packed prompts are in English for every
+    language. With pack_compare, the same samples are also sent one pair per
+    request with the packed prompt, and per-language accuracy deltas
+    (K pairs - 1 pair) are reported under "packing", so they measure the
+    effect of K alone.
+    """
+    results, packing = _score_packs(plan, packed, samples, execute, pack_size)
+    packing = {"pack_size": pack_size, **packing}
+
+    if pack_compare:
+        single = RequestPlan()
+        single_packs = {
+            mode: plan_nli_packed(single, mode, samples, languages, 1) for mode in NLI_MODES
+        }
+        print(f"\nComparing against {single.n_unique} single-pair packed requests")
+        execute(single, "  single-pair")
+        single_results, _ = _score_packs(single, single_packs, samples, execute, 1, verbose=False)
+
+        packing["single_pair_accuracy"] = {}
+        packing["accuracy_delta"] = {}
+        print(f"\n--- K={pack_size} - K=1 accuracy (packed prompt) ---")
+        for mode in PACKED_MODES.values():
+            packing["single_pair_accuracy"][mode] = {
+                lang: round(r["accuracy"], 4) for lang, r in single_results[mode].items()
+            }
+            packing["accuracy_delta"][mode] = {
+                lang: round(results[mode][lang]["accuracy"] - r["accuracy"], 4)
+                for lang, r in single_results[mode].items() if lang in results[mode]
+            }
+            deltas = packing["accuracy_delta"][mode]
+            print(f"  {mode}: " + ", ".join(f"{lang} {d:+.1%}" for lang, d in deltas.items()))
+
+    results["packing"] = packing
+    return results
+
+
+def _score_packs(
+    plan: RequestPlan,
+    packed: Dict[str, Dict[str, List[List[Dict]]]],
+    samples: Dict[str, List[Dict]],
+    execute: Callable[[RequestPlan, str], None],
+    pack_size: int,
+    verbose: bool = True
+) -> Tuple[Dict[str, Dict], Dict]:
+    """
+    Per-mode results of executed packs (plan_nli_packed), keyed by packed mode.
+
+    Samples whose packed answer could not be parsed are re-requested with
+    the regular single-sample prompt, i.e. the same request an unpacked run
+    sends (and caches). Returns (results, {"fallback_requests", "unparsed"}).
+    """
+    predictions = {mode: unpack_nli(plan, mode, packs) for mode, packs in packed.items()}
+    flat_samples = {
+        mode: {lang: [s for pack in packs for s in pack] for lang, packs in packs_by_lang.items()}
+        for mode, packs_by_lang in packed.items()
+    }
+
+    # Fall back to single-sample requests for unparsed answers
+    unresolved = {
+        mode: {
+            lang: [s for s, pred in zip(flat_samples[mode][lang], predictions[mode][lang])
+                   if pred is None]
+            for lang in flat_samples[mode]
+        }
+        for mode in packed
+    }
+    fallback = RequestPlan()
+    fallback_langs = {
+        mode: [lang for lang, missing in unresolved[mode].items() if missing] for mode in packed
+    }
+    plan_nli_direct(fallback, unresolved["direct"], fallback_langs["direct"])
+    plan_nli_translate_test(
+        fallback, unresolved["translate_test"], samples, fallback_langs["translate_test"]
+    )
+    if fallback.n_unique:
+        print(f"\nRe-requesting {fallback.n_planned} unparsed packed answers one by one "
+              f"({fallback.n_unique} requests)")
+        execute(fallback, "  fallback")
+
+    packing = {"fallback_requests": fallback.n_unique, "unparsed": {}}
+    results = {}
+    for mode in NLI_MODES:
+        packed_mode = PACKED_MODES[mode]
+        # One entry per sample: its packed response, pair number and fallback response
+        columns_by_lang = {}
+        for lang, packs in packed[mode].items():
+            columns = columns_by_lang[lang] = {"labels": [], "responses": [], "pack_slots": []}
+            for pack, response in zip(packs, plan.responses_for(packed_mode, lang)):
+                columns["labels"].extend(s["label_name"] for s in pack)
+                columns["responses"].extend([response] * len(pack))
+                columns["pack_slots"].extend(range(1, len(pack) + 1))
+            fallback_responses = iter(fallback.responses_for(mode, lang))
+            columns["fallback_responses"] = [
+                next(fallback_responses) if pred is None else None
+                for pred in predictions[mode][lang]
+            ]
+
+        if verbose:
+            heading = "Direct Evaluation" if mode == "direct" else "Translate-Test Evaluation"
+            print(f"\n--- {heading} (packed, {pack_size} pairs per request) ---")
+        results[packed_mode], n_unparsed = score_packed_responses(
+            packed_mode, columns_by_lang, verbose
+        )
+        n_samples = sum(len(columns["labels"]) for columns in columns_by_lang.values())
+        packing["unparsed"][packed_mode] = unparsed_stats(n_samples, n_unparsed)
+
+    return results, packing
+
+
+def unparsed_stats(n_samples: int, n_unparsed: int) -> Dict:
+    """Share of packed answers that could not be parsed, as reported under "packing"."""
+    return {
+        "samples": n_samples,
+        "unparsed": n_unparsed,
+        "rate": round(n_unparsed / n_samples, 4) if n_samples else 0
+    }
+
+
+def model_concurrency(model_name: str) -> int:
+    """
+    Default requests in flight for a model: the ceiling of its rate limiter.
+
+    The limiter's adaptive controller keeps the actual in-flight count
+    between initial_concurrency and this ceiling; models without
+    rate_limits run at DEFAULT_CONCURRENCY.
+    """
+    rate_limits = MODELS[model_name].get("rate_limits") or {}
+    return rate_limits.get("max_concurrency", DEFAULT_CONCURRENCY)
+
+
+def load_shared_samples(
+    task: str,
+    languages: Optional[List[str]],
+    n_samples: int
+) -> Dict[str, Dict[str, List[Dict]]]:
+    """
+    Load the samples for a task once, to be shared by every model.
+
+    Returns {"xnli": samples_by_lang, "sib200": samples_by_lang} with the
+    entries the task needs.
+    """
+    samples = {}
+
+    if task in ["xnli", "all"]:
+        xnli_languages = select_languages("xnli", languages)
+        print("\nLoading XNLI samples...")
+        samples["xnli"] = load_xnli_samples(languages=xnli_languages, n_samples=n_samples)
+
+        # Report sample counts
+        for lang in xnli_languages:
+            n = len(samples["xnli"].get(lang, []))
+            print(f"  {lang}: {n} samples")
+
+    if task in ["sib200", "all"]:
+        print("\nLoading SIB-200 samples...")
+        samples["sib200"] = load_sib200_samples(languages=languages, n_samples=n_samples)
+        for lang, lang_samples in samples["sib200"].items():
+            print(f"  {lang}: {len(lang_samples)} samples")
+
+    return samples
+
+
+def save_results(
+    results: Dict,
+    filename: str,
+    save_responses: bool = True,
+    formats: Optional[List[str]] = None
+):
+    """
+    Save results to JSON file and/or the columnar results file.
+
+    formats (default RESULTS_FORMATS) selects "json", a results JSON without
+    per-sample predictions or raw responses, and "arrow", <name>.arrow with
+    per-sample gold labels and predictions as int8 codes (results_store.py).
+    With save_responses, the raw responses are written next to them as
+    <name>.responses.parquet, from which rescore.py rebuilds the results.
+    """
+    formats = RESULTS_FORMATS if formats is None else formats
     os.makedirs(RESULTS_DIR, exist_ok=True)
     filepath = os.path.join(RESULTS_DIR, filename)
 
     # Convert results to serializable format
     serializable = {}
     for key, value in results.items():
-        if key in ["direct", "translate_test"]:
+        if key in RESPONSE_MODES:
             serializable[key] = {}
             for lang, lang_results in value.items():
                 serializable[key][lang] = {
                     k: v for k, v in lang_results.items()
-                    if k != "predictions"  # Don't save all predictions
+                    if k != "predictions" and k not in RESPONSE_FIELDS  # Don't save per-sample lists
                 }
                 serializable[key][lang]["accuracy"] = round(lang_results["accuracy"], 4)
         else:
             serializable[key] = value
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(serializable, f, indent=2, ensure_ascii=False)
+    if "json" in formats:
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(serializable, f, indent=2, ensure_ascii=False)
+        print(f"\nResults saved to: {filepath}")
+
+    if "arrow" in formats:
+        # Per-sample labels move to the int8 columns; summaries stay in the header
+        header = {
+            key: {
+                lang: {k: v for k, v in lang_results.items() if k != "labels"}
+                if "predictions" in results[key][lang] else lang_results
+                for lang, lang_results in value.items()
+            } if key in CODED_MODES else value
+            for key, value in serializable.items()
+        }
+        table_path = results_table_path(filepath)
+        write_results_table(results, header, RESULT_VOCABULARIES, table_path)
+        print(f"Columnar results saved to: {table_path}")
+
+    # Modes stored row by row are rebuilt from the rows; the rest stay in the header
+    stored = [
+        key for key in RESPONSE_MODES
+        if results.get(key) and all("responses" in r for r in results[key].values())
+    ]
+    if save_responses and stored:
+        header = {key: value for key, value in serializable.items() if key not in stored}
+        path = responses_path(filepath)
+        n_rows = write_responses(results, header, path)
+        print(f"Raw responses ({n_rows} samples) saved to: {path}")
+
 
-    print(f"\nResults saved to: {filepath}")
+def without_responses(results: Dict) -> Dict:
+    """Copy of a model's results without the raw per-sample response lists."""
+    return {
+        key: {
+            lang: {k: v for k, v in lang_results.items() if k not in RESPONSE_FIELDS}
+            for lang, lang_results in value.items()
+        } if key in RESPONSE_MODES else value
+        for key, value in results.items()
+    }
 
 
 def main():
@@ -240,9 +959,14 @@ def main():
         "--model", type=str, default=None,
         help="Model to evaluate (default: all)"
     )
+    parser.add_argument(
+        "--task", type=str, default="xnli", choices=TASKS,
+        help="Evaluation task: XNLI, SIB-200 topic classification, or both"
+    )
     parser.add_argument(
         "--languages", type=str, nargs="+", default=None,
-        help="Languages to evaluate (default: all XNLI languages)"
+        help="Languages to evaluate, or \"all\" for every language on disk (200+ for "
+             "SIB-200; default: all XNLI languages and SIB200_DEFAULT_LANGUAGES)"
     )
     parser.add_argument(
         "--n-samples", type=int, default=SAMPLE_SIZE_XNLI,
@@ -252,38 +976,162 @@ def main():
         "--output", type=str, default=None,
         help="Output filename (default: auto-generated)"
     )
+    parser.add_argument(
+        "--concurrency", type=int, default=None,
+        help="API requests in flight per model (default: the model's max_concurrency "
+             "in its MODELS rate_limits, else sequential)"
+    )
+    parser.add_argument(
+        "--max-parallel-models", type=int, default=None,
+        help="Models evaluated at the same time (default: all selected models)"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Disable the on-disk response cache"
+    )
+    parser.add_argument(
+        "--cache-dir", type=str, default=CACHE_DIR,
+        help="Directory for the on-disk response cache"
+    )
+    parser.add_argument(
+        "--journal-dir", type=str, default=JOURNAL_DIR,
+        help="Directory for per-model JSONL journals of completed samples"
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Replay existing journals and only request missing samples"
+    )
+    parser.add_argument(
+        "--batch", action="store_true",
+        help="Submit requests through the provider's batch API (OpenAI only)"
+    )
+    parser.add_argument(
+        "--batch-poll-interval", type=float, default=BATCH_POLL_INTERVAL,
+        help="Seconds between batch status checks"
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Stream samples through the pipeline with incremental scoring"
+    )
+    parser.add_argument(
+        "--async", dest="use_async", action="store_true",
+        help="Run requests on the SDKs' async clients (suits very high --concurrency)"
+    )
+    parser.add_argument(
+        "--pack", type=int, default=1, metavar="K",
+        help="Send K XNLI pairs per request with JSON-lines answers (default: 1, unpacked)"
+    )
+    parser.add_argument(
+        "--pack-compare", action="store_true",
+        help="With --pack, also send the packed prompt one pair per request and report "
+             "accuracy deltas"
+    )
+    parser.add_argument(
+        "--results-format", type=str, nargs="+", default=RESULTS_FORMATS,
+        choices=["json", "arrow"],
+        help="Results files to write per model (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--metrics-file", type=str, default=None,
+        help="Also export request telemetry in Prometheus text format to this file"
+    )
 
     args = parser.parse_args()
+    if args.stream and args.batch:
+        parser.error("--stream and --batch cannot be combined")
+    if args.use_async and args.batch:
+        parser.error("--async and --batch cannot be combined")
+    if args.pack > 1 and args.stream:
+        parser.error("--pack and --stream cannot be combined")
 
     # Determine which models to evaluate
     models_to_eval = [args.model] if args.model else list(MODELS.keys())
+    for model_name in [m for m in models_to_eval if m not in MODELS]:
+        print(f"Unknown model: {model_name}")
+    models_to_eval = [m for m in models_to_eval if m in MODELS]
+    if not models_to_eval:
+        return {}
 
-    all_results = {}
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
 
+    # Load samples once; every model evaluates the same shared copy. Streamed
+    # XNLI rows are pulled by each model in bounded chunks, so they are not preloaded
+    shared_task = args.task
+    if args.stream:
+        shared_task = {"xnli": None, "all": "sib200"}.get(args.task, args.task)
+    samples = load_shared_samples(shared_task, args.languages, args.n_samples) if shared_task else {}
+
+    telemetries = {m: Telemetry(m) for m in models_to_eval}
+    concurrencies = {m: args.concurrency or model_concurrency(m) for m in models_to_eval}
+
+    # Models sharing an endpoint share its connection pool, sized here for all of them
     for model_name in models_to_eval:
-        if model_name not in MODELS:
-            print(f"Unknown model: {model_name}")
-            continue
+        reserve_connections(model_name, MODELS, concurrencies[model_name], args.use_async)
 
-        results = run_experiment(
+    # Models have independent quotas, so they run side by side, each with
+    # its own concurrency budget
+    def evaluate_model(model_name: str) -> Dict:
+        return run_experiment(
             model_name,
             languages=args.languages,
-            n_samples=args.n_samples
+            n_samples=args.n_samples,
+            concurrency=concurrencies[model_name],
+            cache=cache,
+            journal_dir=args.journal_dir,
+            resume=args.resume,
+            batch=args.batch,
+            batch_poll_interval=args.batch_poll_interval,
+            stream=args.stream,
+            use_async=args.use_async,
+            pack_size=args.pack,
+            pack_compare=args.pack_compare,
+            task=args.task,
+            samples=samples,
+            telemetry=telemetries[model_name]
         )
 
-        if results:
+    all_results = {}
+    max_parallel = args.max_parallel_models or len(models_to_eval)
+
+    with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+        futures = {pool.submit(evaluate_model, m): m for m in models_to_eval}
+
+        for future in as_completed(futures):
+            model_name = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"\nEvaluation of {model_name} failed: {e}")
+                continue
+            if not results:
+                continue
+
             all_results[model_name] = results
 
             # Save individual model results
             output_file = args.output or f"results_{model_name.replace('.', '_')}.json"
-            save_results(results, output_file)
-
-    # Save combined results
-    if len(all_results) > 1:
-        combined_file = "results_combined.json"
-        with open(os.path.join(RESULTS_DIR, combined_file), "w") as f:
-            json.dump(all_results, f, indent=2)
-        print(f"\nCombined results saved to: {combined_file}")
+            if args.output and len(models_to_eval) > 1:
+                output_file = f"{model_name.replace('.', '_')}_{args.output}"
+            save_results(results, output_file, formats=args.results_format)
+
+            # Rewrite combined results as each model finishes
+            if len(models_to_eval) > 1:
+                combined_file = "results_combined.json"
+                with open(os.path.join(RESULTS_DIR, combined_file), "w") as f:
+                    json.dump(
+                        {m: without_responses(r) for m, r in all_results.items()}, f, indent=2
+                    )
+                print(f"Combined results ({len(all_results)}/{len(models_to_eval)} models) "
+                      f"saved to: {combined_file}")
+
+            if args.metrics_file:
+                write_prometheus(list(telemetries.values()), args.metrics_file)
+
+    if cache is not None:
+        stats = cache.stats()
+        print(f"\nResponse cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.1%} hit rate, {stats['entries']} entries)")
+        cache.close()
 
     return all_results
 
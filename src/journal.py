@@ -0,0 +1,113 @@
+"""Append-only JSONL journal of completed evaluation samples."""
+import json
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+from cache import ResponseCache
+from config import API_TEMPERATURE
+from engine import Request, request_params
+
+# A journal entry is identified by (mode, lang, index, request key)
+SampleKey = Tuple[str, str, int, str]
+
+
+class ResultJournal:
+    """
+    Streams every completed sample to an append-only JSONL file.
+
+    Each line records the model, mode, language, sample index, request key
+    (see request_key), raw response, parsed label (from the mode's parser)
+    and request latency. When opened with resume=True, the existing journal
+    is replayed so completed samples are not requested again; a sample's
+    record is only reused for the exact request it answered, so changing a
+    prompt, system prompt or token budget between runs re-requests it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        model: str,
+        parsers: Dict[str, Callable[[str], str]],
+        resume: bool = False,
+        provider: str = "",
+        model_id: str = ""
+    ):
+        self.path = path
+        self.model = model
+        self.parsers = parsers
+        self.provider = provider
+        self.model_id = model_id
+        self.completed: Dict[SampleKey, Dict] = {}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        if resume and os.path.exists(path):
+            self._replay()
+            self._file = open(path, "a", encoding="utf-8", buffering=1)
+            # A crash can leave a partial last line; start a fresh one
+            if os.path.getsize(path) > 0 and not self._ends_with_newline():
+                self._file.write("\n")
+        else:
+            self._file = open(path, "w", encoding="utf-8", buffering=1)
+
+        self._lock = threading.Lock()
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _replay(self):
+        """Load completed samples for this model from the existing journal."""
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Truncated line from an interrupted run
+                if record.get("model") != self.model or "request" not in record:
+                    continue  # Other model, or written before records had request keys
+                key = (record["mode"], record["lang"], record["index"], record["request"])
+                self.completed[key] = record
+
+    def request_key(self, request: Request) -> str:
+        """Hash of a request: the key the response cache stores its answer under."""
+        prompt, system_prompt, max_tokens = request_params(request)
+        return ResponseCache.make_key(
+            self.provider, self.model_id, system_prompt, prompt, API_TEMPERATURE, max_tokens
+        )
+
+    def lookup(self, mode: str, lang: str, index: int, request_key: str) -> Optional[str]:
+        """Return the journaled raw response for a sample's request, if any."""
+        record = self.completed.get((mode, lang, index, request_key))
+        return record["response"] if record else None
+
+    def record(
+        self,
+        mode: str,
+        lang: str,
+        index: int,
+        request_key: str,
+        response: str,
+        latency: float
+    ):
+        """Append one completed sample to the journal."""
+        record = {
+            "model": self.model,
+            "mode": mode,
+            "lang": lang,
+            "index": index,
+            "request": request_key,
+            "response": response,
+            "label": self.parsers[mode](response),
+            "latency": round(latency, 4)
+        }
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self.completed[(mode, lang, index, request_key)] = record
+
+    def close(self):
+        """Flush and close the journal file."""
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,84 @@
+"""Compiled matching of label words in free-form model responses."""
+import re
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+class LabelMatcher:
+    """
+    Find the label a response names.
+
+    match() scans one response in a single pass of a precompiled regex;
+    parse_many() matches whole batches with vectorized Arrow kernels.
+
+    variants lists (word, label) pairs in priority order. Words are matched
+    as substrings of the lower-cased response; when a response contains
+    several, the earliest-listed variant wins wherever it occurs, which is
+    the behavior of a chain of `in` checks. A response containing no variant
+    is unparseable and yields None rather than a guessed label.
+    """
+
+    def __init__(self, variants: Sequence[Tuple[str, str]]):
+        self.variants = [(word.lower(), label) for word, label in variants]
+        self.labels = [label for _, label in self.variants]
+
+        # Longest words first, so "entailment" is not consumed as "entail".
+        # The alternatives are plain literals (no groups), which lets the
+        # regex engine skip ahead to positions starting with a variant's
+        # first character; the matched word maps back to its priority.
+        self._rank = {}
+        for rank, (word, _) in enumerate(self.variants):
+            self._rank.setdefault(word, rank)
+        self._pattern = re.compile("|".join(
+            re.escape(word) for word in sorted(self._rank, key=len, reverse=True)
+        ))
+
+    def match(self, response: Optional[str]) -> Optional[str]:
+        """The label a single response names, or None if it is unparseable."""
+        if response is None:
+            return None
+        best = len(self.variants)
+        for m in self._pattern.finditer(response.lower()):
+            best = min(best, self._rank[m.group()])
+            if best == 0:
+                break
+        return self.labels[best] if best < len(self.variants) else None
+
+    def parse_many(
+        self,
+        responses: Sequence[Optional[str]],
+        default: Optional[str] = None
+    ) -> Tuple[List[Optional[str]], np.ndarray]:
+        """
+        Match a batch of responses.
+
+        Responses are dictionary-encoded so each distinct text is matched
+        once. Variants are then tested in priority order with Arrow's
+        vectorized substring kernel, each only against the texts no earlier
+        variant matched, which gives the same labels as match(). Returns
+        (labels, unparseable): labels has `default` wherever the response is
+        missing (None) or names no label, and unparseable is a boolean
+        array flagging those positions.
+        """
+        encoded = pa.array(responses, type=pa.large_string()).dictionary_encode()
+        pending = pc.utf8_lower(encoded.dictionary)
+        pending_ids = np.arange(len(pending))
+
+        best = np.full(len(pending), len(self.variants), dtype=np.int64)
+        for rank, (word, _) in enumerate(self.variants):
+            if not len(pending_ids):
+                break
+            hit = pc.match_substring(pending, word).to_numpy(zero_copy_only=False)
+            if hit.any():
+                best[pending_ids[hit]] = rank
+                pending = pending.filter(pa.array(~hit))
+                pending_ids = pending_ids[~hit]
+
+        # Missing responses (null index) share the "no label" rank len(variants)
+        codes = encoded.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+        ranks = np.append(best, len(self.variants))[codes]
+        unparseable = ranks == len(self.variants)
+        choices = np.array(self.labels + [default], dtype=object)
+        return choices[ranks].tolist(), unparseable
@@ -0,0 +1,358 @@
+"""Registry of the evaluation languages on disk, built by scanning the dataset directories."""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from config import DATASET_PATHS, LANGUAGE_REGISTRY_PATH, XNLI_LANGUAGES
+
+# ISO 639-3 code (as in FLORES-200 / SIB-200 directory names) ->
+# (short code used in results, name, family, default script)
+LANGUAGE_INFO = {
+    "eng": ("en", "English", "Indo-European (Germanic)", "Latn"),
+    "deu": ("de", "German", "Indo-European (Germanic)", "Latn"),
+    "nld": ("nl", "Dutch", "Indo-European (Germanic)", "Latn"),
+    "swe": ("sv", "Swedish", "Indo-European (Germanic)", "Latn"),
+    "dan": ("da", "Danish", "Indo-European (Germanic)", "Latn"),
+    "nob": ("nb", "Norwegian Bokmål", "Indo-European (Germanic)", "Latn"),
+    "isl": ("is", "Icelandic", "Indo-European (Germanic)", "Latn"),
+    "afr": ("af", "Afrikaans", "Indo-European (Germanic)", "Latn"),
+    "ltz": ("lb", "Luxembourgish", "Indo-European (Germanic)", "Latn"),
+    "fra": ("fr", "French", "Indo-European (Romance)", "Latn"),
+    "spa": ("es", "Spanish", "Indo-European (Romance)", "Latn"),
+    "por": ("pt", "Portuguese", "Indo-European (Romance)", "Latn"),
+    "ita": ("it", "Italian", "Indo-European (Romance)", "Latn"),
+    "ron": ("ro", "Romanian", "Indo-European (Romance)", "Latn"),
+    "cat": ("ca", "Catalan", "Indo-European (Romance)", "Latn"),
+    "glg": ("gl", "Galician", "Indo-European (Romance)", "Latn"),
+    "rus": ("ru", "Russian", "Indo-European (Slavic)", "Cyrl"),
+    "ukr": ("uk", "Ukrainian", "Indo-European (Slavic)", "Cyrl"),
+    "bel": ("be", "Belarusian", "Indo-European (Slavic)", "Cyrl"),
+    "bul": ("bg", "Bulgarian", "Indo-European (Slavic)", "Cyrl"),
+    "mkd": ("mk", "Macedonian", "Indo-European (Slavic)", "Cyrl"),
+    "srp": ("sr", "Serbian", "Indo-European (Slavic)", "Cyrl"),
+    "hrv": ("hr", "Croatian", "Indo-European (Slavic)", "Latn"),
+    "bos": ("bs", "Bosnian", "Indo-European (Slavic)", "Latn"),
+    "slv": ("sl", "Slovenian", "Indo-European (Slavic)", "Latn"),
+    "slk": ("sk", "Slovak", "Indo-European (Slavic)", "Latn"),
+    "ces": ("cs", "Czech", "Indo-European (Slavic)", "Latn"),
+    "pol": ("pl", "Polish", "Indo-European (Slavic)", "Latn"),
+    "lit": ("lt", "Lithuanian", "Indo-European (Baltic)", "Latn"),
+    "lvs": ("lv", "Latvian", "Indo-European (Baltic)", "Latn"),
+    "ell": ("el", "Greek", "Indo-European (Hellenic)", "Grek"),
+    "hye": ("hy", "Armenian", "Indo-European (Armenian)", "Armn"),
+    "gle": ("ga", "Irish", "Indo-European (Celtic)", "Latn"),
+    "cym": ("cy", "Welsh", "Indo-European (Celtic)", "Latn"),
+    "hin": ("hi", "Hindi", "Indo-European (Indo-Aryan)", "Deva"),
+    "urd": ("ur", "Urdu", "Indo-European (Indo-Aryan)", "Arab"),
+    "ben": ("bn", "Bengali", "Indo-European (Indo-Aryan)", "Beng"),
+    "mar": ("mr", "Marathi", "Indo-European (Indo-Aryan)", "Deva"),
+    "guj": ("gu", "Gujarati", "Indo-European (Indo-Aryan)", "Gujr"),
+    "pan": ("pa", "Punjabi", "Indo-European (Indo-Aryan)", "Guru"),
+    "npi": ("ne", "Nepali", "Indo-European (Indo-Aryan)", "Deva"),
+    "sin": ("si", "Sinhala", "Indo-European (Indo-Aryan)", "Sinh"),
+    "pes": ("fa", "Persian", "Indo-European (Iranian)", "Arab"),
+    "tgk": ("tg", "Tajik", "Indo-European (Iranian)", "Cyrl"),
+    "pbt": ("ps", "Pashto", "Indo-European (Iranian)", "Arab"),
+    "arb": ("ar", "Arabic", "Afro-Asiatic (Semitic)", "Arab"),
+    "heb": ("he", "Hebrew", "Afro-Asiatic (Semitic)", "Hebr"),
+    "mlt": ("mt", "Maltese", "Afro-Asiatic (Semitic)", "Latn"),
+    "amh": ("am", "Amharic", "Afro-Asiatic (Semitic)", "Ethi"),
+    "tir": ("ti", "Tigrinya", "Afro-Asiatic (Semitic)", "Ethi"),
+    "hau": ("ha", "Hausa", "Afro-Asiatic (Chadic)", "Latn"),
+    "som": ("so", "Somali", "Afro-Asiatic (Cushitic)", "Latn"),
+    "gaz": ("om", "Oromo", "Afro-Asiatic (Cushitic)", "Latn"),
+    "zho": ("zh", "Chinese", "Sino-Tibetan", "Hans"),
+    "mya": ("my", "Burmese", "Sino-Tibetan", "Mymr"),
+    "bod": ("bo", "Tibetan", "Sino-Tibetan", "Tibt"),
+    "jpn": ("ja", "Japanese", "Japonic", "Jpan"),
+    "kor": ("ko", "Korean", "Koreanic", "Hang"),
+    "tur": ("tr", "Turkish", "Turkic", "Latn"),
+    "azj": ("az", "Azerbaijani", "Turkic", "Latn"),
+    "kaz": ("kk", "Kazakh", "Turkic", "Cyrl"),
+    "uzn": ("uz", "Uzbek", "Turkic", "Latn"),
+    "kir": ("ky", "Kyrgyz", "Turkic", "Cyrl"),
+    "tat": ("tt", "Tatar", "Turkic", "Cyrl"),
+    "tuk": ("tk", "Turkmen", "Turkic", "Latn"),
+    "uig": ("ug", "Uyghur", "Turkic", "Arab"),
+    "khk": ("mn", "Mongolian", "Mongolic", "Cyrl"),
+    "fin": ("fi", "Finnish", "Uralic", "Latn"),
+    "est": ("et", "Estonian", "Uralic", "Latn"),
+    "hun": ("hu", "Hungarian", "Uralic", "Latn"),
+    "kat": ("ka", "Georgian", "Kartvelian", "Geor"),
+    "eus": ("eu", "Basque", "Language isolate", "Latn"),
+    "vie": ("vi", "Vietnamese", "Austroasiatic", "Latn"),
+    "khm": ("km", "Khmer", "Austroasiatic", "Khmr"),
+    "tha": ("th", "Thai", "Kra-Dai", "Thai"),
+    "lao": ("lo", "Lao", "Kra-Dai", "Laoo"),
+    "ind": ("id", "Indonesian", "Austronesian", "Latn"),
+    "zsm": ("ms", "Malay", "Austronesian", "Latn"),
+    "tgl": ("tl", "Tagalog", "Austronesian", "Latn"),
+    "jav": ("jv", "Javanese", "Austronesian", "Latn"),
+    "sun": ("su", "Sundanese", "Austronesian", "Latn"),
+    "mri": ("mi", "Maori", "Austronesian", "Latn"),
+    "smo": ("sm", "Samoan", "Austronesian", "Latn"),
+    "plt": ("mg", "Malagasy", "Austronesian", "Latn"),
+    "swh": ("sw", "Swahili", "Niger-Congo (Bantu)", "Latn"),
+    "zul": ("zu", "Zulu", "Niger-Congo (Bantu)", "Latn"),
+    "xho": ("xh", "Xhosa", "Niger-Congo (Bantu)", "Latn"),
+    "kin": ("rw", "Kinyarwanda", "Niger-Congo (Bantu)", "Latn"),
+    "lin": ("ln", "Lingala", "Niger-Congo (Bantu)", "Latn"),
+    "sna": ("sn", "Shona", "Niger-Congo (Bantu)", "Latn"),
+    "yor": ("yo", "Yoruba", "Niger-Congo", "Latn"),
+    "ibo": ("ig", "Igbo", "Niger-Congo", "Latn"),
+    "wol": ("wo", "Wolof", "Niger-Congo", "Latn"),
+    "tam": ("ta", "Tamil", "Dravidian", "Taml"),
+    "tel": ("te", "Telugu", "Dravidian", "Telu"),
+    "kan": ("kn", "Kannada", "Dravidian", "Knda"),
+    "mal": ("ml", "Malayalam", "Dravidian", "Mlym"),
+    "hat": ("ht", "Haitian Creole", "Creole", "Latn"),
+    "epo": ("eo", "Esperanto", "Constructed", "Latn"),
+}
+
+# Short code -> ISO 639-3 code
+SHORT_CODES = {info[0]: iso for iso, info in LANGUAGE_INFO.items()}
+
+# Per-language results are keyed by the short code where LANGUAGE_INFO has one
+# (only for the language's default script) and by the FLORES-200 code
+# (e.g. "ace_Arab") otherwise.
+
+
+def language_name(code: str) -> str:
+    """Display name of a language code (short or FLORES-200); the code itself if unknown."""
+    iso = SHORT_CODES.get(code) or code.split("_")[0]
+    info = LANGUAGE_INFO.get(iso)
+    if info is None:
+        return code
+    script = code.split("_")[1] if "_" in code else info[3]
+    return info[1] if script == info[3] else f"{info[1]} ({script})"
+
+
+def language_family(code: str) -> Optional[str]:
+    """Language family of a language code, None if unknown."""
+    info = LANGUAGE_INFO.get(SHORT_CODES.get(code) or code.split("_")[0])
+    return info[2] if info else None
+
+
+def language_script(code: str) -> Optional[str]:
+    """Script of a language code: from a FLORES-200 code, else the language's default."""
+    if "_" in code:
+        return code.split("_")[1]
+    iso = SHORT_CODES.get(code)
+    return LANGUAGE_INFO[iso][3] if iso else None
+
+
+def short_code(flores_code: str) -> str:
+    """Results key of a FLORES-200 code: its short code for the default script, else itself."""
+    iso, _, script = flores_code.partition("_")
+    info = LANGUAGE_INFO.get(iso)
+    if info is not None and script == info[3]:
+        return info[0]
+    return flores_code
+
+
+def _arrow_rows(path: str) -> int:
+    """Row count of a datasets Arrow stream file, from its memory-mapped batch headers."""
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        return sum(batch.num_rows for batch in pa.ipc.open_stream(source))
+
+
+def _scan_saved_dataset(path: str) -> Dict[str, Dict]:
+    """
+    Splits of a datasets save_to_disk directory.
+
+    Returns split -> {"rows", "files"}, the files being the split's Arrow
+    data files relative to path.
+    """
+    with open(os.path.join(path, "dataset_dict.json")) as f:
+        splits = json.load(f)["splits"]
+
+    scanned = {}
+    for split in splits:
+        with open(os.path.join(path, split, "state.json")) as f:
+            files = [os.path.join(split, data["filename"]) for data in json.load(f)["_data_files"]]
+        scanned[split] = {
+            "rows": sum(_arrow_rows(os.path.join(path, file)) for file in files),
+            "files": files,
+        }
+    return scanned
+
+
+def _scan_xnli(root: str) -> Dict[str, Dict]:
+    """XNLI languages (all_languages config: every row holds every language)."""
+    splits = _scan_saved_dataset(root)
+    first_split = next(iter(splits))
+    with open(os.path.join(root, first_split, "dataset_info.json")) as f:
+        languages = json.load(f)["features"]["premise"]["languages"]
+    return {lang: {"splits": splits} for lang in languages}
+
+
+def _scan_sib200(root: str, max_workers: int) -> Dict[str, Dict]:
+    """SIB-200 languages: one save_to_disk directory per FLORES-200 code."""
+    dirs = sorted(
+        entry.name for entry in os.scandir(root)
+        if entry.is_dir() and os.path.exists(os.path.join(entry.path, "dataset_dict.json"))
+    )
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        scanned = list(pool.map(lambda d: _scan_saved_dataset(os.path.join(root, d)), dirs))
+    return {
+        short_code(flores_code): {"dir": flores_code, "splits": splits}
+        for flores_code, splits in zip(dirs, scanned)
+    }
+
+
+def _sources() -> Dict[str, List]:
+    """[path, mtime] of each dataset root; the registry is rebuilt when one changes."""
+    return {
+        dataset: [path, os.stat(path).st_mtime_ns if os.path.isdir(path) else None]
+        for dataset, path in sorted(DATASET_PATHS.items())
+    }
+
+
+def _language_order(code: str) -> Tuple:
+    """Configured XNLI languages first, in config order, then the rest by code."""
+    if code in XNLI_LANGUAGES:
+        return (0, XNLI_LANGUAGES.index(code), code)
+    return (1, 0, code)
+
+
+def scan_languages(max_workers: int = 16) -> Dict:
+    """
+    Scan the dataset directories into a registry.
+
+    Returns {"sources": ..., "languages": code -> {"name", "family",
+    "script", "datasets": dataset -> {"splits": split -> {"rows",
+    "files"}, and for SIB-200 "dir"}}}. Data file paths are relative to
+    the dataset (or SIB-200 language) directory. Datasets that are not on
+    disk are left out.
+    """
+    sources = _sources()
+    by_dataset = {}
+    if sources["xnli"][1] is not None:
+        by_dataset["xnli"] = _scan_xnli(DATASET_PATHS["xnli"])
+    if sources["sib200"][1] is not None:
+        by_dataset["sib200"] = _scan_sib200(DATASET_PATHS["sib200"], max_workers)
+
+    languages: Dict[str, Dict] = {}
+    for dataset, entries in by_dataset.items():
+        for code, entry in entries.items():
+            language = languages.setdefault(code, {
+                "name": language_name(code),
+                "family": language_family(code),
+                "script": language_script(code),
+                "datasets": {},
+            })
+            language["datasets"][dataset] = entry
+
+    return {
+        "sources": sources,
+        "languages": {code: languages[code] for code in sorted(languages, key=_language_order)},
+    }
+
+
+class LanguageRegistry:
+    """Lookups over a scanned registry (see scan_languages)."""
+
+    def __init__(self, registry: Dict):
+        self.registry = registry
+        self.entries: Dict[str, Dict] = registry["languages"]
+        # FLORES-200 codes resolve to their results key too
+        self.aliases = {
+            entry["datasets"]["sib200"]["dir"]: code
+            for code, entry in self.entries.items() if "sib200" in entry["datasets"]
+        }
+
+    def languages(self, dataset: str, split: Optional[str] = None) -> List[str]:
+        """Codes of the languages with dataset (and split, if given) on disk, in registry order."""
+        return [
+            code for code, entry in self.entries.items()
+            if dataset in entry["datasets"]
+            and (split is None or split in entry["datasets"][dataset]["splits"])
+        ]
+
+    def resolve(self, code: str) -> Optional[str]:
+        """The registry code of a short or FLORES-200 code, None if not on disk."""
+        if code in self.entries:
+            return code
+        return self.aliases.get(code)
+
+    def rows(self, dataset: str, code: str, split: str) -> int:
+        return self.entries[code]["datasets"][dataset]["splits"][split]["rows"]
+
+    def data_files(self, dataset: str, code: str, split: str) -> List[str]:
+        """Absolute paths of the Arrow data files of a language's split."""
+        entry = self.entries[code]["datasets"][dataset]
+        root = DATASET_PATHS[dataset]
+        if "dir" in entry:
+            root = os.path.join(root, entry["dir"])
+        return [os.path.join(root, file) for file in entry["splits"][split]["files"]]
+
+
+def load_registry(refresh: bool = False) -> LanguageRegistry:
+    """
+    The language registry, scanned once and cached at LANGUAGE_REGISTRY_PATH.
+
+    The cached scan is reused as long as the dataset roots are unchanged
+    (a language directory added or removed changes its root's mtime), so a
+    run over hundreds of languages reads one small JSON file instead of
+    opening every dataset. refresh=True forces a rescan.
+    """
+    if refresh:
+        _cached_registry.cache_clear()
+    return _cached_registry()
+
+
+@lru_cache(maxsize=None)
+def _cached_registry() -> LanguageRegistry:
+    if os.path.exists(LANGUAGE_REGISTRY_PATH):
+        try:
+            with open(LANGUAGE_REGISTRY_PATH, encoding="utf-8") as f:
+                registry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            registry = None
+        if registry is not None and registry.get("sources") == _sources():
+            return LanguageRegistry(registry)
+
+    registry = scan_languages()
+    os.makedirs(os.path.dirname(LANGUAGE_REGISTRY_PATH), exist_ok=True)
+    tmp_path = LANGUAGE_REGISTRY_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(registry, f, ensure_ascii=False)
+    os.replace(tmp_path, LANGUAGE_REGISTRY_PATH)
+    return LanguageRegistry(registry)
+
+
+def main():
+    """Rebuild the language registry and summarize it."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scan the datasets into the language registry")
+    parser.add_argument(
+        "--dataset", type=str, default=None, choices=list(DATASET_PATHS),
+        help="Only list languages of this dataset"
+    )
+    parser.add_argument("--quiet", action="store_true", help="Only print the totals")
+    args = parser.parse_args()
+
+    registry = load_registry(refresh=True)
+    datasets = [args.dataset] if args.dataset else list(DATASET_PATHS)
+    for dataset in datasets:
+        codes = registry.languages(dataset)
+        print(f"{dataset}: {len(codes)} languages")
+        if args.quiet:
+            continue
+        for code in codes:
+            entry = registry.entries[code]
+            splits = ", ".join(
+                f"{split}={info['rows']}"
+                for split, info in entry["datasets"][dataset]["splits"].items()
+            )
+            print(f"  {code:10s} {entry['name']:24s} {entry['script'] or '':5s} "
+                  f"{entry['family'] or '':28s} {splits}")
+    print(f"Registry: {LANGUAGE_REGISTRY_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,101 @@
 """LLM API wrapper for OpenAI and Anthropic models."""
+import asyncio
+import hashlib
 import os
 import time
-from typing import Optional, Dict, Any
-from openai import OpenAI
-from anthropic import Anthropic
+from typing import Optional, Dict, Any, Tuple
 from config import (
-    API_TEMPERATURE, API_MAX_TOKENS, API_TIMEOUT,
+    API_TEMPERATURE, API_MAX_TOKENS, API_PROMPT_CACHING, DEFAULT_CONCURRENCY,
     OPENAI_API_KEY, ANTHROPIC_API_KEY, OPENROUTER_API_KEY
 )
+from prompts import split_static_prefix
+from rate_limit import (
+    get_rate_limiter, is_rate_limit_error, retry_after_seconds, backoff_delay
+)
+from telemetry import start_request_timing, estimate_cost
+from transport import get_http_client, release_http_client, reserve_http_pool, event_loop
+
+DEFAULT_BASE_URLS = {
+    "openai": "https://api.openai.com/v1",
+    "anthropic": "https://api.anthropic.com",
+    "openrouter": "https://openrouter.ai/api/v1",
+}
+
+
+def _text_block(text: str, cacheable: bool = False) -> Dict[str, Any]:
+    """A text content block, optionally marked as the end of a cacheable prefix."""
+    block = {"type": "text", "text": text}
+    if cacheable:
+        block["cache_control"] = {"type": "ephemeral"}
+    return block
 
 
 class LLMClient:
     """Unified client for OpenAI and Anthropic APIs."""
 
-    def __init__(self, provider: str, model_id: str):
+    # Overridden by AsyncLLMClient to build the SDKs' async clients
+    asynchronous = False
+
+    def __init__(
+        self,
+        provider: str,
+        model_id: str,
+        cache=None,
+        rate_limits: Optional[Dict[str, Any]] = None,
+        base_url: Optional[str] = None,
+        pricing: Optional[Dict[str, float]] = None,
+        pool_size: int = DEFAULT_CONCURRENCY
+    ):
         self.provider = provider
         self.model_id = model_id
+        self.cache = cache
+        self.pricing = pricing
 
-        if provider == "openai":
-            self.client = OpenAI(api_key=OPENAI_API_KEY)
-        elif provider == "anthropic":
-            self.client = Anthropic(api_key=ANTHROPIC_API_KEY)
-        elif provider == "openrouter":
-            self.client = OpenAI(
-                api_key=OPENROUTER_API_KEY,
-                base_url="https://openrouter.ai/api/v1"
-            )
-        else:
+        # Anthropic models (directly or through OpenRouter) need explicit cache
+        # breakpoints; OpenAI caches shared prefixes automatically
+        self.cache_control = API_PROMPT_CACHING and (
+            provider == "anthropic"
+            or (provider == "openrouter" and model_id.startswith("anthropic/"))
+        )
+
+        if provider not in DEFAULT_BASE_URLS:
             raise ValueError(f"Unknown provider: {provider}")
+        base_url = base_url or DEFAULT_BASE_URLS[provider]
+        self.limiter = get_rate_limiter(provider, rate_limits, base_url) if rate_limits else None
+
+        # SDK-level retries are disabled so backoff and 429 handling happen in one place.
+        # The HTTP client is the pooled keep-alive transport shared per base_url,
+        # given back by close(). The SDKs are imported on first use; they are slow to import
+        sdk = transport_sdk(provider)
+        http_client = get_http_client(sdk, base_url, pool_size, self.asynchronous)
+        self._transport = (sdk, base_url, self.asynchronous)
+        try:
+            if provider == "anthropic":
+                from anthropic import Anthropic, AsyncAnthropic
+
+                sdk_client = AsyncAnthropic if self.asynchronous else Anthropic
+                self.client = sdk_client(
+                    api_key=ANTHROPIC_API_KEY, base_url=base_url, max_retries=0,
+                    http_client=http_client
+                )
+            else:
+                from openai import OpenAI, AsyncOpenAI
+
+                sdk_client = AsyncOpenAI if self.asynchronous else OpenAI
+                api_key = OPENAI_API_KEY if provider == "openai" else OPENROUTER_API_KEY
+                self.client = sdk_client(
+                    api_key=api_key, base_url=base_url, max_retries=0,
+                    http_client=http_client
+                )
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """Release this client's share of the pooled HTTP transport; safe to call twice."""
+        if self._transport is not None:
+            release_http_client(*self._transport)
+            self._transport = None
 
     def complete(
         self,
@@ -35,53 +103,405 @@ class LLMClient:
         system_prompt: Optional[str] = None,
         temperature: float = API_TEMPERATURE,
         max_tokens: int = API_MAX_TOKENS,
-        max_retries: int = 3,
+        max_retries: int = 5,
         retry_delay: float = 2.0
     ) -> str:
-        """Generate a completion for the given prompt."""
+        """Generate a completion for the given prompt, consulting the response cache first."""
+        response, _ = self.complete_with_stats(
+            prompt, system_prompt, temperature, max_tokens, max_retries, retry_delay
+        )
+        return response
+
+    def complete_with_stats(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = API_TEMPERATURE,
+        max_tokens: int = API_MAX_TOKENS,
+        max_retries: int = 5,
+        retry_delay: float = 2.0
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Like complete(), but also return per-call stats.
+
+        Stats hold latency, ttfb (time to first byte of the successful
+        attempt), retries, prompt/completion tokens and estimated cost.
+        Cache hits are reported as {"cached": True, "latency": ...}.
+        """
+        start = time.perf_counter()
+        key, cached = self._cache_lookup(prompt, system_prompt, temperature, max_tokens)
+        if cached is not None:
+            return cached, {"cached": True, "latency": time.perf_counter() - start}
+
+        response, stats = self._request(
+            prompt, system_prompt, temperature, max_tokens, max_retries, retry_delay
+        )
+        if response and key is not None:
+            self.cache.put(key, response)
+        stats["latency"] = time.perf_counter() - start
+        return response, stats
+
+    def _cache_lookup(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Return (cache key, cached response); both None without a cache."""
+        if self.cache is None:
+            return None, None
+        key = self.cache.make_key(
+            self.provider, self.model_id, system_prompt, prompt, temperature, max_tokens
+        )
+        return key, self.cache.get(key)
+
+    def _request(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        max_retries: int,
+        retry_delay: float
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Send the request to the provider API, retrying on errors."""
+        # Rough token estimate (~4 chars/token) for the tokens-per-minute budget
+        estimated_tokens = (len(prompt) + len(system_prompt or "")) // 4 + max_tokens
+
         for attempt in range(max_retries):
             try:
-                if self.provider in ["openai", "openrouter"]:
-                    messages = []
-                    if system_prompt:
-                        messages.append({"role": "system", "content": system_prompt})
-                    messages.append({"role": "user", "content": prompt})
-
-                    response = self.client.chat.completions.create(
-                        model=self.model_id,
-                        messages=messages,
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                        timeout=API_TIMEOUT
-                    )
-                    return response.choices[0].message.content.strip()
-
-                elif self.provider == "anthropic":
-                    response = self.client.messages.create(
-                        model=self.model_id,
-                        max_tokens=max_tokens,
-                        system=system_prompt if system_prompt else "",
-                        messages=[{"role": "user", "content": prompt}]
+                if self.limiter is None:
+                    timing = start_request_timing()
+                    response, usage = self._send(prompt, system_prompt, temperature, max_tokens)
+                else:
+                    with self.limiter.slot(estimated_tokens):
+                        # Timed from inside the slot so limiter waits are not counted
+                        timing = start_request_timing()
+                        response, usage = self._send(
+                            prompt, system_prompt, temperature, max_tokens
+                        )
+                    self.limiter.on_success()
+                return response, self._call_stats(attempt, timing, usage)
+
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    time.sleep(self._retry_delay(e, attempt, retry_delay))
+                else:
+                    raise e
+
+        return "", {"retries": max_retries}
+
+    def _retry_delay(self, error: Exception, attempt: int, retry_delay: float) -> float:
+        """Report a failed attempt to the limiter and return how long to back off."""
+        if self.limiter is not None and is_rate_limit_error(error):
+            self.limiter.on_rate_limit()
+
+        delay = backoff_delay(attempt, base=retry_delay, retry_after=retry_after_seconds(error))
+        print(f"API error (attempt {attempt + 1}, retrying in {delay:.1f}s): {error}")
+        return delay
+
+    def _call_stats(self, attempt: int, timing: Dict, usage: Tuple[int, int, int]) -> Dict[str, Any]:
+        """Stats for a successful call (latency is added by the caller)."""
+        prompt_tokens, completion_tokens, cached_tokens = usage
+        ttfb = None
+        if timing["first_byte"] is not None:
+            ttfb = timing["first_byte"] - timing["start"]
+        return {
+            "retries": attempt,
+            "ttfb": ttfb,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+            "cost": estimate_cost(self.pricing, prompt_tokens, completion_tokens, cached_tokens)
+        }
+
+    def chat_request_body(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float = API_TEMPERATURE,
+        max_tokens: int = API_MAX_TOKENS
+    ) -> Dict[str, Any]:
+        """
+        Build the chat.completions request body for OpenAI-compatible providers.
+
+        The system prompt and the template's static instruction prefix come
+        first. For Anthropic models behind OpenRouter they are sent as
+        separate content parts marked with cache_control; for OpenAI,
+        prompt_cache_key routes requests sharing a prefix to the same cache.
+        The text the model sees is unchanged.
+        """
+        prefix, rest = split_static_prefix(prompt)
+
+        messages = []
+        if self.cache_control:
+            if system_prompt:
+                messages.append({"role": "system", "content": [_text_block(system_prompt, True)]})
+            parts = [_text_block(prefix, True), _text_block(rest)] if prefix else [_text_block(prompt)]
+            messages.append({"role": "user", "content": parts})
+        else:
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+
+        body = {
+            "model": self.model_id,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        if API_PROMPT_CACHING and self.provider == "openai":
+            body["prompt_cache_key"] = self.prefix_cache_key(system_prompt, prefix)
+        return body
+
+    def prefix_cache_key(self, system_prompt: Optional[str], prefix: str) -> str:
+        """Short stable id of a (system prompt, instruction prefix) pair."""
+        payload = f"{self.model_id}\0{system_prompt or ''}\0{prefix}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def messages_request_body(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float = API_TEMPERATURE,
+        max_tokens: int = API_MAX_TOKENS
+    ) -> Dict[str, Any]:
+        """Build the Anthropic messages request body, with cache breakpoints after the static prefix."""
+        if not self.cache_control:
+            return {
+                "model": self.model_id,
+                "max_tokens": max_tokens,
+                "system": system_prompt if system_prompt else "",
+                "messages": [{"role": "user", "content": prompt}]
+            }
+
+        prefix, rest = split_static_prefix(prompt)
+        parts = [_text_block(prefix, True), _text_block(rest)] if prefix else [_text_block(prompt)]
+        return {
+            "model": self.model_id,
+            "max_tokens": max_tokens,
+            "system": [_text_block(system_prompt, True)] if system_prompt else "",
+            "messages": [{"role": "user", "content": parts}]
+        }
+
+    def _request_call(self, prompt, system_prompt, temperature, max_tokens):
+        """Return (SDK method, request body) for the provider."""
+        if self.provider == "anthropic":
+            return self.client.messages.create, self.messages_request_body(
+                prompt, system_prompt, temperature, max_tokens
+            )
+        return self.client.chat.completions.create, self.chat_request_body(
+            prompt, system_prompt, temperature, max_tokens
+        )
+
+    def _parse_response(self, response) -> Tuple[str, Tuple[int, int, int]]:
+        """Extract (text, (prompt_tokens, completion_tokens, cached_tokens)) from an SDK response."""
+        usage = response.usage
+        if self.provider == "anthropic":
+            # input_tokens excludes the prompt tokens read from or written to the cache
+            cache_read = usage.cache_read_input_tokens or 0
+            cache_write = usage.cache_creation_input_tokens or 0
+            prompt_tokens = usage.input_tokens + cache_read + cache_write
+            return response.content[0].text.strip(), (prompt_tokens, usage.output_tokens, cache_read)
+
+        if usage is None:
+            tokens = (0, 0, 0)
+        else:
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached = (getattr(details, "cached_tokens", None) or 0) if details else 0
+            tokens = (usage.prompt_tokens, usage.completion_tokens, cached)
+        return response.choices[0].message.content.strip(), tokens
+
+    def _send(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int
+    ) -> Tuple[str, Tuple[int, int, int]]:
+        """Issue a single API call; returns (text, (prompt, completion, cached prompt tokens))."""
+        create, body = self._request_call(prompt, system_prompt, temperature, max_tokens)
+        return self._parse_response(create(**body))
+
+
+class AsyncLLMClient(LLMClient):
+    """
+    LLMClient built on the SDKs' async clients (AsyncOpenAI / AsyncAnthropic).
+
+    acomplete() and acomplete_with_stats() are coroutines with the same
+    provider dispatch, caching, rate limiting and retries as the synchronous
+    methods; they must run on transport.event_loop(), where the shared async
+    connection pools live. engine.py submits requests there automatically,
+    so this client is a drop-in replacement in the evaluation code. The
+    synchronous complete() still works from any thread by running the
+    coroutine on that loop.
+    """
+
+    asynchronous = True
+
+    async def acomplete(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = API_TEMPERATURE,
+        max_tokens: int = API_MAX_TOKENS,
+        max_retries: int = 5,
+        retry_delay: float = 2.0
+    ) -> str:
+        """Async variant of complete()."""
+        response, _ = await self.acomplete_with_stats(
+            prompt, system_prompt, temperature, max_tokens, max_retries, retry_delay
+        )
+        return response
+
+    async def acomplete_with_stats(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = API_TEMPERATURE,
+        max_tokens: int = API_MAX_TOKENS,
+        max_retries: int = 5,
+        retry_delay: float = 2.0
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Async variant of complete_with_stats().
+
+        Cache reads and writes are SQLite I/O behind a lock, so they run in
+        the loop's default executor instead of blocking the event loop.
+        """
+        start = time.perf_counter()
+        key, cached = None, None
+        if self.cache is not None:
+            key, cached = await asyncio.to_thread(
+                self._cache_lookup, prompt, system_prompt, temperature, max_tokens
+            )
+        if cached is not None:
+            return cached, {"cached": True, "latency": time.perf_counter() - start}
+
+        response, stats = await self._arequest(
+            prompt, system_prompt, temperature, max_tokens, max_retries, retry_delay
+        )
+        if response and key is not None:
+            await asyncio.to_thread(self.cache.put, key, response)
+        stats["latency"] = time.perf_counter() - start
+        return response, stats
+
+    def complete_with_stats(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = API_TEMPERATURE,
+        max_tokens: int = API_MAX_TOKENS,
+        max_retries: int = 5,
+        retry_delay: float = 2.0
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Blocking wrapper that runs acomplete_with_stats() on the shared event loop."""
+        return asyncio.run_coroutine_threadsafe(
+            self.acomplete_with_stats(
+                prompt, system_prompt, temperature, max_tokens, max_retries, retry_delay
+            ),
+            event_loop()
+        ).result()
+
+    async def _arequest(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        max_retries: int,
+        retry_delay: float
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Async variant of _request()."""
+        estimated_tokens = (len(prompt) + len(system_prompt or "")) // 4 + max_tokens
+
+        for attempt in range(max_retries):
+            try:
+                if self.limiter is None:
+                    timing = start_request_timing()
+                    response, usage = await self._asend(
+                        prompt, system_prompt, temperature, max_tokens
                     )
-                    return response.content[0].text.strip()
+                else:
+                    async with self.limiter.aslot(estimated_tokens):
+                        timing = start_request_timing()
+                        response, usage = await self._asend(
+                            prompt, system_prompt, temperature, max_tokens
+                        )
+                    self.limiter.on_success()
+                return response, self._call_stats(attempt, timing, usage)
 
             except Exception as e:
                 if attempt < max_retries - 1:
-                    print(f"API error (attempt {attempt + 1}): {e}")
-                    time.sleep(retry_delay * (attempt + 1))
+                    await asyncio.sleep(self._retry_delay(e, attempt, retry_delay))
                 else:
                     raise e
 
-        return ""
+        return "", {"retries": max_retries}
+
+    async def _asend(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int
+    ) -> Tuple[str, Tuple[int, int, int]]:
+        """Async variant of _send()."""
+        create, body = self._request_call(prompt, system_prompt, temperature, max_tokens)
+        return self._parse_response(await create(**body))
+
+
+def transport_sdk(provider: str) -> str:
+    """The SDK (and so the HTTP transport) used for a provider."""
+    return "anthropic" if provider == "anthropic" else "openai"
+
+
+def reserve_connections(
+    model_name: str,
+    models_config: Dict,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    asynchronous: bool = False
+):
+    """
+    Reserve a model's connections in its endpoint's pool ahead of create_client().
+
+    Call this for every model that will run at the same time before creating
+    any of their clients, so an endpoint shared by several models gets one
+    pool sized for all of them.
+    """
+    config = models_config[model_name]
+    provider = config["provider"]
+    base_url = config.get("base_url") or DEFAULT_BASE_URLS[provider]
+    reserve_http_pool(transport_sdk(provider), base_url, concurrency, asynchronous)
+
 
+def create_client(
+    model_name: str,
+    models_config: Dict,
+    cache=None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    asynchronous: bool = False
+) -> LLMClient:
+    """
+    Create an LLM client from model configuration.
 
-def create_client(model_name: str, models_config: Dict) -> LLMClient:
-    """Create an LLM client from model configuration."""
+    concurrency sizes the endpoint's connection pool if it is created for
+    this client and no connections were reserved (see reserve_connections).
+    With asynchronous=True an AsyncLLMClient is returned. Call close() on
+    the client when done with it.
+    """
     if model_name not in models_config:
         raise ValueError(f"Unknown model: {model_name}")
 
     config = models_config[model_name]
-    return LLMClient(config["provider"], config["model_id"])
+    client_class = AsyncLLMClient if asynchronous else LLMClient
+    return client_class(
+        config["provider"], config["model_id"],
+        cache=cache, rate_limits=config.get("rate_limits"),
+        base_url=config.get("base_url"), pricing=config.get("pricing"),
+        pool_size=concurrency
+    )
 
 
 if __name__ == "__main__":
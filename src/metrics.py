@@ -0,0 +1,291 @@
+"""Vectorized evaluation metrics over many (model, mode, language) cells at once."""
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from config import SEED
+from results_store import UNKNOWN_CODE, encode_labels
+
+# A cell is one (model, mode, language) set of per-sample labels and predictions
+Cell = Tuple[str, str, str]
+
+BOOTSTRAP_RESAMPLES = 2000
+
+# Pairs compared per matrix product, bounding the (resamples x pairs) block in memory
+PAIR_CHUNK = 1024
+
+
+class CellCodes:
+    """
+    Label and prediction codes of many cells, concatenated.
+
+    Cell i owns rows starts[i]:starts[i] + lengths[i]. Codes index a shared
+    label vocabulary of n_classes labels; UNKNOWN_CODE marks a prediction
+    outside it (never correct; counted in the confusion matrix's extra
+    "unknown" column).
+    """
+
+    def __init__(
+        self,
+        keys: List[Cell],
+        labels: np.ndarray,
+        predictions: np.ndarray,
+        lengths: np.ndarray,
+        n_classes: int
+    ):
+        self.keys = keys
+        self.index = {key: i for i, key in enumerate(keys)}
+        self.labels = labels
+        self.predictions = predictions
+        self.lengths = lengths
+        self.starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+        self.n_classes = n_classes
+
+    @classmethod
+    def from_results(
+        cls,
+        results_by_model: Dict[str, Dict],
+        modes: Sequence[str],
+        vocab: List[str]
+    ) -> "CellCodes":
+        """
+        Collect the cells of evaluate.py-style results for the given modes.
+
+        Per-language "labels" and "predictions" may be int8 code arrays (as
+        loaded from results_*.arrow, already in vocab order) or lists of
+        label strings. Languages without predictions are skipped.
+        """
+        keys, labels, predictions = [], [], []
+        for model, data in results_by_model.items():
+            for mode in modes:
+                for lang, lang_results in data.get(mode, {}).items():
+                    if "predictions" not in lang_results:
+                        continue
+                    keys.append((model, mode, lang))
+                    labels.append(_codes(lang_results["labels"], vocab))
+                    predictions.append(_codes(lang_results["predictions"], vocab))
+        return cls.from_arrays(keys, labels, predictions, len(vocab))
+
+    @classmethod
+    def from_arrays(
+        cls,
+        keys: List[Cell],
+        labels: List[np.ndarray],
+        predictions: List[np.ndarray],
+        n_classes: int
+    ) -> "CellCodes":
+        lengths = np.array([len(codes) for codes in labels], dtype=np.int64)
+        empty = np.empty(0, dtype=np.int8)
+        return cls(
+            keys,
+            np.concatenate(labels) if labels else empty,
+            np.concatenate(predictions) if predictions else empty,
+            lengths,
+            n_classes
+        )
+
+    def correct(self, key: Cell) -> np.ndarray:
+        """Per-sample correctness of one cell."""
+        i = self.index[key]
+        rows = slice(self.starts[i], self.starts[i] + self.lengths[i])
+        return (self.labels[rows] == self.predictions[rows]) & (self.labels[rows] != UNKNOWN_CODE)
+
+
+def _codes(values, vocab: List[str]) -> np.ndarray:
+    if isinstance(values, np.ndarray):
+        return values.astype(np.int8, copy=False)
+    return encode_labels(values, vocab)
+
+
+def cell_metrics(cells: CellCodes) -> Dict[str, np.ndarray]:
+    """
+    Accuracy, confusion matrices and macro-F1 of every cell.
+
+    Returns arrays indexed like cells.keys: "n", "correct", "accuracy",
+    "macro_f1" and "confusion" (cells x gold x predicted counts). The
+    confusion matrices have one more column than rows: the last counts
+    predictions outside the vocabulary (UNKNOWN_CODE), so those gold labels
+    still count as missed in macro-F1. Rows with an unknown gold label are
+    left out.
+    """
+    n_cells, k = len(cells.keys), cells.n_classes
+    cell_ids = np.repeat(np.arange(n_cells), cells.lengths)
+
+    hits = (cells.labels == cells.predictions) & (cells.labels != UNKNOWN_CODE)
+    correct = np.bincount(cell_ids, weights=hits, minlength=n_cells).astype(np.int64)
+
+    valid = cells.labels != UNKNOWN_CODE
+    predicted = np.where(cells.predictions == UNKNOWN_CODE, k, cells.predictions).astype(np.int64)
+    flat = (
+        cell_ids[valid] * k * (k + 1)
+        + cells.labels[valid].astype(np.int64) * (k + 1)
+        + predicted[valid]
+    )
+    confusion = np.bincount(flat, minlength=n_cells * k * (k + 1)).reshape(n_cells, k, k + 1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        accuracy = np.where(cells.lengths > 0, correct / cells.lengths, 0.0)
+    return {
+        "n": cells.lengths,
+        "correct": correct,
+        "accuracy": accuracy,
+        "macro_f1": macro_f1(confusion),
+        "confusion": confusion,
+    }
+
+
+def macro_f1(confusion: np.ndarray) -> np.ndarray:
+    """
+    Macro-averaged F1 of each confusion matrix in a (..., k, k + 1) stack.
+
+    The last column counts predictions outside the vocabulary: they are
+    false negatives of their gold class but no class of their own. Classes
+    that occur neither as gold label nor as prediction are left out of the
+    average, as in scikit-learn.
+    """
+    k = confusion.shape[-2]
+    tp = np.diagonal(confusion[..., :k], axis1=-2, axis2=-1).astype(np.float64)
+    gold = confusion.sum(axis=-1)
+    predicted = confusion[..., :k].sum(axis=-2)
+    denominator = gold + predicted
+    with np.errstate(invalid="ignore", divide="ignore"):
+        f1 = np.where(denominator > 0, 2 * tp / denominator, 0.0)
+    present = denominator > 0
+    n_present = present.sum(axis=-1)
+    return np.where(n_present > 0, (f1 * present).sum(axis=-1) / np.maximum(n_present, 1), 0.0)
+
+
+def bootstrap_weights(n: int, n_resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """How often each of n samples is drawn in each resample, as a (resamples, n) matrix."""
+    draws = rng.integers(0, n, size=(n_resamples, n))
+    draws += np.arange(n_resamples)[:, None] * n
+    return np.bincount(draws.ravel(), minlength=n_resamples * n).reshape(n_resamples, n).astype(
+        np.float32
+    )
+
+
+def paired_bootstrap(
+    a: np.ndarray,
+    b: np.ndarray,
+    n_resamples: int = BOOTSTRAP_RESAMPLES,
+    confidence: float = 0.95,
+    seed: int = SEED
+) -> Dict[str, np.ndarray]:
+    """
+    Paired bootstrap of accuracy differences for many pairs of equal length.
+
+    a and b are (pairs, n) per-sample correctness arrays whose rows are
+    paired sample by sample. Every pair is resampled with the same
+    n_resamples index draws, all at once: the per-sample differences are
+    multiplied by a (resamples x n) count matrix. Returns "delta" (observed
+    accuracy of a minus b) and the percentile interval "low"/"high".
+    """
+    a = np.atleast_2d(a)
+    b = np.atleast_2d(b)
+    n_pairs, n = a.shape
+    diffs = a.astype(np.float32) - b.astype(np.float32)
+    delta = diffs.mean(axis=1) if n else np.zeros(n_pairs)
+
+    tail = (1 - confidence) / 2
+    low = np.full(n_pairs, np.nan)
+    high = np.full(n_pairs, np.nan)
+    if n == 0 or n_pairs == 0:
+        return {"delta": delta, "low": low, "high": high}
+
+    weights = bootstrap_weights(n, n_resamples, np.random.default_rng(seed))
+    for start in range(0, n_pairs, PAIR_CHUNK):
+        chunk = diffs[start:start + PAIR_CHUNK]
+        resampled = weights @ chunk.T / n  # (resamples, pairs)
+        low[start:start + len(chunk)], high[start:start + len(chunk)] = np.quantile(
+            resampled, [tail, 1 - tail], axis=0
+        )
+    return {"delta": delta, "low": low, "high": high}
+
+
+def mcnemar(a: np.ndarray, b: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Exact McNemar tests for many pairs of equal length.
+
+    a and b are (pairs, n) per-sample correctness arrays. Returns the
+    discordant counts "a_only" (a right, b wrong) and "b_only", and the
+    two-sided exact binomial p-value "p" (1.0 without discordant samples).
+    """
+    from scipy import stats  # Slow to import; only the analysis needs it
+
+    a = np.atleast_2d(a).astype(bool)
+    b = np.atleast_2d(b).astype(bool)
+    a_only = (a & ~b).sum(axis=1)
+    b_only = (~a & b).sum(axis=1)
+    discordant = a_only + b_only
+    p = np.minimum(1.0, 2 * stats.binom.cdf(np.minimum(a_only, b_only), discordant, 0.5))
+    p = np.where(discordant > 0, p, 1.0)
+    return {"a_only": a_only, "b_only": b_only, "p": p}
+
+
+def compare_cells(
+    cells: CellCodes,
+    pairs: List[Tuple[Cell, Cell]],
+    n_resamples: int = BOOTSTRAP_RESAMPLES,
+    confidence: float = 0.95,
+    seed: int = SEED
+) -> Dict[str, np.ndarray]:
+    """
+    Paired bootstrap CIs and McNemar tests for (a, b) cell pairs.
+
+    Cells are paired row by row, so both must hold the same samples in the
+    same order (as XNLI languages and modes do). Pairs are grouped by
+    length and each group is resampled in one batch; pairs whose cells
+    differ in length are not comparable and get NaN. Returns arrays aligned
+    with pairs: "delta" (accuracy of a minus b), "low", "high", "a_only",
+    "b_only" and "p".
+    """
+    n_pairs = len(pairs)
+    out = {
+        "delta": np.full(n_pairs, np.nan), "low": np.full(n_pairs, np.nan),
+        "high": np.full(n_pairs, np.nan), "p": np.full(n_pairs, np.nan),
+        "a_only": np.zeros(n_pairs, dtype=np.int64), "b_only": np.zeros(n_pairs, dtype=np.int64),
+    }
+
+    groups: Dict[int, List[int]] = {}
+    for i, (key_a, key_b) in enumerate(pairs):
+        n = cells.lengths[cells.index[key_a]]
+        if n == cells.lengths[cells.index[key_b]]:
+            groups.setdefault(int(n), []).append(i)
+
+    for positions in groups.values():
+        a = np.stack([cells.correct(pairs[i][0]) for i in positions])
+        b = np.stack([cells.correct(pairs[i][1]) for i in positions])
+        for name, values in paired_bootstrap(a, b, n_resamples, confidence, seed).items():
+            out[name][positions] = values
+        for name, values in mcnemar(a, b).items():
+            out[name][positions] = values
+    return out
+
+
+def english_gap_pairs(cells: CellCodes, mode: str = "direct") -> List[Tuple[Cell, Cell]]:
+    """(English, X) cell pairs of every model for one mode: deltas are English-vs-X gaps."""
+    return [
+        ((model, mode, "en"), (model, cell_mode, lang))
+        for model, cell_mode, lang in cells.keys
+        if cell_mode == mode and lang != "en" and (model, mode, "en") in cells.index
+    ]
+
+
+def translate_test_pairs(cells: CellCodes) -> List[Tuple[Cell, Cell]]:
+    """(translate-test X, direct X) cell pairs: deltas are translate-test effects."""
+    return [
+        ((model, mode, lang), (model, "direct", lang))
+        for model, mode, lang in cells.keys
+        if mode == "translate_test" and (model, "direct", lang) in cells.index
+    ]
+
+
+def pair_table(
+    pairs: List[Tuple[Cell, Cell]],
+    comparison: Dict[str, np.ndarray]
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Nest compare_cells output as model -> language (of each pair's b cell) -> stats."""
+    table: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for i, (_, (model, _, lang)) in enumerate(pairs):
+        table.setdefault(model, {})[lang] = {
+            name: float(values[i]) for name, values in comparison.items()
+        }
+    return table
@@ -0,0 +1,181 @@
+"""Streaming evaluation pipeline: load -> format -> request -> score."""
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from tqdm import tqdm
+from config import NLI_LABELS
+from engine import Request, complete_stream
+from language_registry import language_name
+from prompts import format_nli_prompt, parse_nli_response, NLI_SYSTEM_PROMPT
+
+# Every response is scored for one or more (mode, lang, index, gold label) targets
+Target = Tuple[str, str, int, str]
+
+MODES = ["direct", "translate_test"]
+
+
+def nli_request_stream(
+    rows: Iterable[Tuple[int, Dict[str, Dict]]],
+    languages: List[str],
+    modes: List[str] = MODES
+) -> Iterator[Tuple[Request, List[Target]]]:
+    """
+    Format stage: turn parallel XNLI rows into requests.
+
+    Direct requests use the native-language prompt for each language. The
+    translate-test request of a row is the same English prompt for every
+    non-English language, so it is emitted once with all of them as targets.
+    """
+    for index, row in rows:
+        if "direct" in modes:
+            for lang in languages:
+                if lang not in row:
+                    continue
+                sample = row[lang]
+                prompt = format_nli_prompt(sample["premise"], sample["hypothesis"], language=lang)
+                yield (
+                    (prompt, NLI_SYSTEM_PROMPT["multilingual"]),
+                    [("direct", lang, index, sample["label_name"])]
+                )
+
+        if "translate_test" in modes and "en" in row:
+            targets = [
+                ("translate_test", lang, index, row[lang]["label_name"])
+                for lang in languages if lang != "en" and lang in row
+            ]
+            if targets:
+                en_sample = row["en"]
+                prompt = format_nli_prompt(
+                    en_sample["premise"], en_sample["hypothesis"], language="en"
+                )
+                yield (prompt, NLI_SYSTEM_PROMPT["en"]), targets
+
+
+class LanguageAccumulator:
+    """Running accuracy and confusion counts for one (mode, language) cell."""
+
+    def __init__(self, labels: List[str] = NLI_LABELS):
+        self.labels = labels
+        self.n_samples = 0
+        self.correct = 0
+        self.confusion = [[0] * len(labels) for _ in labels]
+
+    def update(self, label: str, pred: str):
+        self.n_samples += 1
+        if pred == label:
+            self.correct += 1
+        if label in self.labels and pred in self.labels:
+            self.confusion[self.labels.index(label)][self.labels.index(pred)] += 1
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct / self.n_samples if self.n_samples else 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "accuracy": self.accuracy,
+            "n_samples": self.n_samples,
+            "correct": self.correct,
+            "confusion": self.confusion
+        }
+
+
+class StreamingScorer:
+    """Incremental scoring stage holding one accumulator per (mode, language)."""
+
+    def __init__(self):
+        self.cells: Dict[Tuple[str, str], LanguageAccumulator] = {}
+
+    def update(self, mode: str, lang: str, label: str, pred: str):
+        cell = self.cells.get((mode, lang))
+        if cell is None:
+            cell = self.cells[(mode, lang)] = LanguageAccumulator()
+        cell.update(label, pred)
+
+    def running_accuracy(self, mode: str) -> Optional[float]:
+        """Accuracy so far over all languages of a mode."""
+        cells = [c for (m, _), c in self.cells.items() if m == mode]
+        total = sum(c.n_samples for c in cells)
+        return sum(c.correct for c in cells) / total if total else None
+
+    def results(self, mode: str) -> Dict[str, Dict]:
+        """Per-language results for one mode, in the result-file schema."""
+        results = {}
+        for (m, lang), cell in self.cells.items():
+            if m != mode:
+                continue
+            results[lang] = cell.to_dict()
+            if mode == "translate_test":
+                results[lang]["method"] = "translate_test"
+        return results
+
+
+def run_streaming_nli(
+    client,
+    rows: Iterable[Tuple[int, Dict[str, Dict]]],
+    languages: List[str],
+    concurrency: int = 1,
+    journal=None,
+    telemetry=None
+) -> Dict[str, Dict[str, Dict]]:
+    """
+    Evaluate XNLI end to end as a stream.
+
+    Samples flow from the loader through prompt formatting and a bounded
+    in-flight request stage into per-language accumulators, so memory stays
+    flat in n_samples and running accuracy is visible from the first
+    response. Returns {"direct": {...}, "translate_test": {...}}.
+    """
+    scorer = StreamingScorer()
+
+    def score(targets: List[Target], response: Optional[str]):
+        pred = parse_nli_response(response) if response is not None else "neutral"
+        for mode, lang, _, label in targets:
+            scorer.update(mode, lang, label, pred)
+
+    def pending_requests() -> Iterator[Tuple[Request, Tuple[List[Target], Optional[str]]]]:
+        # Samples already in the journal are scored directly without a request;
+        # the others carry their journal request key along with their targets
+        for request, targets in nli_request_stream(rows, languages):
+            request_key = None
+            if journal is not None:
+                request_key = journal.request_key(request)
+                mode, lang, index, _ = targets[0]
+                response = journal.lookup(mode, lang, index, request_key)
+                if response is not None:
+                    score(targets, response)
+                    for mode, lang, index, _ in targets[1:]:
+                        if journal.lookup(mode, lang, index, request_key) is None:
+                            journal.record(mode, lang, index, request_key, response, 0.0)
+                    continue
+            yield request, (targets, request_key)
+
+    progress = tqdm(desc="  requests", leave=False)
+    for (targets, request_key), response, stats in complete_stream(
+        client, pending_requests(), concurrency=concurrency
+    ):
+        score(targets, response)
+        if telemetry is not None:
+            telemetry.record(targets[0][0], targets[0][1], stats)
+        if journal is not None and response is not None:
+            for mode, lang, index, _ in targets:
+                journal.record(mode, lang, index, request_key, response, stats["latency"])
+
+        running = {}
+        for mode in MODES:
+            accuracy = scorer.running_accuracy(mode)
+            if accuracy is not None:
+                running[mode] = f"{accuracy:.1%}"
+        if telemetry is not None:
+            running.update(telemetry.live_postfix())
+        progress.update(1)
+        progress.set_postfix(running)
+    progress.close()
+
+    results = {}
+    for mode in MODES:
+        results[mode] = scorer.results(mode)
+        print(f"\n--- {mode} ---")
+        for lang, lang_results in results[mode].items():
+            print(f"    {lang} ({language_name(lang)}): {lang_results['accuracy']:.2%} "
+                  f"({lang_results['correct']}/{lang_results['n_samples']})")
+
+    return results
@@ -1,4 +1,8 @@
 """Prompt templates for multilingual LLM evaluation."""
+import json
+import re
+from typing import List, Optional, Tuple
+from label_parser import LabelMatcher
 
 # NLI task prompts - adapted for each language
 NLI_PROMPTS = {
@@ -129,6 +133,23 @@ NLI_SYSTEM_PROMPT = {
     "multilingual": "You are a helpful assistant. Respond only with: entailment, neutral, or contradiction."
 }
 
+# Packed NLI prompt: K numbered pairs per request, answered as JSON lines.
+# Instructions are in English for every language; only the pairs are in the
+# evaluated language.
+NLI_PACKED_PROMPT = """For each numbered pair below, determine the relationship between the premise and the hypothesis.
+
+{pairs}
+
+Answer with one line per pair, in order. Each line must be a JSON object with the pair number and exactly one label out of entailment, neutral, or contradiction, for example:
+{{"id": 1, "label": "neutral"}}
+Answers:"""
+
+NLI_PACKED_PAIR = """[{id}]
+Premise: {premise}
+Hypothesis: {hypothesis}"""
+
+NLI_PACKED_SYSTEM_PROMPT = "You are a helpful assistant that classifies text relationships. Respond only with the requested JSON lines."
+
 # Topic classification prompts for SIB-200
 TOPIC_PROMPTS = {
     "en": """Classify the following text into one of these categories:
@@ -155,12 +176,53 @@ Text: {text}
 English translation:"""
 
 
+def _static_prefix(template: str) -> str:
+    """The part of a template before its first placeholder."""
+    return template.split("{", 1)[0]
+
+
+# Instruction prefixes shared by every prompt built from a template, longest first
+STATIC_PREFIXES = sorted(
+    {
+        _static_prefix(template)
+        for template in [
+            *NLI_PROMPTS.values(), *TOPIC_PROMPTS.values(), NLI_PACKED_PROMPT, TRANSLATION_PROMPT
+        ]
+    } - {""},
+    key=len,
+    reverse=True
+)
+
+
+def split_static_prefix(prompt: str) -> Tuple[str, str]:
+    """
+    Split a formatted prompt into (static instruction prefix, sample-specific rest).
+
+    The prefix is identical across all prompts from the same template, which
+    makes it the cacheable part for provider prompt caching. Prompts not built
+    from a known template return ("", prompt).
+    """
+    for prefix in STATIC_PREFIXES:
+        if prompt.startswith(prefix):
+            return prefix, prompt[len(prefix):]
+    return "", prompt
+
+
 def format_nli_prompt(premise: str, hypothesis: str, language: str = "en") -> str:
     """Format an NLI prompt for the given language."""
     template = NLI_PROMPTS.get(language, NLI_PROMPTS["en"])
     return template.format(premise=premise, hypothesis=hypothesis)
 
 
+def format_packed_nli_prompt(pairs: List[Tuple[str, str]]) -> str:
+    """Format a packed NLI prompt for a list of (premise, hypothesis) pairs, numbered from 1."""
+    blocks = [
+        NLI_PACKED_PAIR.format(id=i, premise=premise, hypothesis=hypothesis)
+        for i, (premise, hypothesis) in enumerate(pairs, start=1)
+    ]
+    return NLI_PACKED_PROMPT.format(pairs="\n\n".join(blocks))
+
+
 def format_topic_prompt(text: str, language: str = "en") -> str:
     """Format a topic classification prompt."""
     template = TOPIC_PROMPTS.get(language, TOPIC_PROMPTS["en"])
@@ -172,54 +234,114 @@ def format_translation_prompt(text: str) -> str:
     return TRANSLATION_PROMPT.format(text=text)
 
 
+# Label words in priority order: English labels, English stems, then the
+# label in each evaluated language for responses that answer in it
+NLI_LABEL_VARIANTS = [
+    ("entailment", "entailment"), ("neutral", "neutral"), ("contradiction", "contradiction"),
+    ("entail", "entailment"), ("neutr", "neutral"), ("contrad", "contradiction"),
+    # entailment
+    ("folgerung", "entailment"), ("implication", "entailment"), ("implicación", "entailment"),
+    ("следств", "entailment"), ("следован", "entailment"), ("συνεπαγωγή", "entailment"),
+    ("استلزام", "entailment"), ("蕴含", "entailment"), ("kéo theo", "entailment"),
+    ("çıkarım", "entailment"),
+    # neutral
+    ("неутрал", "neutral"), ("нейтрал", "neutral"), ("ουδέτερ", "neutral"),
+    ("तटस्थ", "neutral"), ("غیر جانبدار", "neutral"), ("محايد", "neutral"),
+    ("中立", "neutral"), ("trung lập", "neutral"), ("เป็นกลาง", "neutral"), ("nötr", "neutral"),
+    # contradiction
+    ("widerspruch", "contradiction"), ("противореч", "contradiction"),
+    ("αντίφαση", "contradiction"), ("विरोधाभास", "contradiction"), ("تضاد", "contradiction"),
+    ("تناقض", "contradiction"), ("矛盾", "contradiction"), ("mâu thuẫn", "contradiction"),
+    ("ขัดแย้ง", "contradiction"), ("çelişki", "contradiction"),
+]
+
+TOPIC_LABEL_VARIANTS = [
+    ("science/technology", "science/technology"), ("travel", "travel"),
+    ("politics", "politics"), ("sports", "sports"), ("health", "health"),
+    ("entertainment", "entertainment"), ("geography", "geography"),
+    ("science", "science/technology"), ("technology", "science/technology"),
+    ("tech", "science/technology"), ("politic", "politics"), ("sport", "sports"),
+    ("geo", "geography"),
+    # science/technology
+    ("wissenschaft", "science/technology"), ("technologie", "science/technology"),
+    ("ciencia", "science/technology"), ("tecnología", "science/technology"),
+    ("علوم", "science/technology"), ("تكنولوجيا", "science/technology"),
+    ("科学", "science/technology"), ("科技", "science/technology"),
+    ("技术", "science/technology"), ("技術", "science/technology"),
+    ("과학", "science/technology"), ("기술", "science/technology"),
+    # travel
+    ("reise", "travel"), ("voyage", "travel"), ("viaje", "travel"), ("سفر", "travel"),
+    ("旅行", "travel"), ("旅游", "travel"), ("여행", "travel"),
+    # politics
+    ("politik", "politics"), ("politique", "politics"), ("política", "politics"),
+    ("سياسة", "politics"), ("政治", "politics"), ("정치", "politics"),
+    # sports
+    ("deporte", "sports"), ("رياضة", "sports"), ("体育", "sports"), ("スポーツ", "sports"),
+    ("스포츠", "sports"),
+    # health
+    ("gesundheit", "health"), ("santé", "health"), ("salud", "health"), ("صحة", "health"),
+    ("健康", "health"), ("건강", "health"),
+    # entertainment
+    ("unterhaltung", "entertainment"), ("divertissement", "entertainment"),
+    ("entretenimiento", "entertainment"), ("ترفيه", "entertainment"),
+    ("娱乐", "entertainment"), ("娯楽", "entertainment"), ("エンターテインメント", "entertainment"),
+    ("엔터테인먼트", "entertainment"), ("오락", "entertainment"),
+    # geography
+    ("جغرافيا", "geography"), ("地理", "geography"), ("지리", "geography"),
+]
+
+NLI_MATCHER = LabelMatcher(NLI_LABEL_VARIANTS)
+TOPIC_MATCHER = LabelMatcher(TOPIC_LABEL_VARIANTS)
+
+
 def parse_nli_response(response: str) -> str:
     """Parse NLI response to extract label."""
-    response_lower = response.lower().strip()
+    # Default to neutral if unclear; NLI_MATCHER.parse_many flags these instead
+    return _match_nli_label(response) or "neutral"
 
-    # Look for exact matches first
-    for label in ["entailment", "neutral", "contradiction"]:
-        if label in response_lower:
-            return label
 
-    # Check for partial matches
-    if "entail" in response_lower:
-        return "entailment"
-    if "neutr" in response_lower:
-        return "neutral"
-    if "contrad" in response_lower:
-        return "contradiction"
+def _match_nli_label(response: str) -> Optional[str]:
+    """The NLI label mentioned in a response, or None if there is none."""
+    return NLI_MATCHER.match(response)
 
-    # Default to neutral if unclear
-    return "neutral"
 
+# A JSON object on one line, and the "3. neutral" / "[3]: neutral" fallback form
+_PACKED_JSON = re.compile(r"\{[^{}]*\}")
+_PACKED_LINE = re.compile(r"^\W*(\d+)\W+([^\W\d]+)", re.MULTILINE)
 
-def parse_topic_response(response: str) -> str:
-    """Parse topic classification response."""
-    response_lower = response.lower().strip()
 
-    categories = [
-        "science/technology", "travel", "politics", "sports",
-        "health", "entertainment", "geography"
-    ]
+def parse_packed_nli_response(response: str, n_pairs: Optional[int] = None) -> List[Optional[str]]:
+    """
+    Map a packed NLI response back to its pairs.
+
+    Returns one label per pair (n_pairs, or up to the highest id answered),
+    with None for pairs whose answer is missing or unrecognizable, so those
+    samples can be re-requested on their own. JSON-line answers are used
+    when present; otherwise numbered "id. label" lines are accepted. The
+    first answer given for an id wins.
+    """
+    answers = {}
+    for match in _PACKED_JSON.finditer(response):
+        try:
+            obj = json.loads(match.group(0))
+            pair_id = int(obj["id"])
+        except (ValueError, KeyError, TypeError):
+            continue
+        label = _match_nli_label(str(obj.get("label", "")))
+        if label is not None:
+            answers.setdefault(pair_id, label)
+
+    if not answers:
+        for match in _PACKED_LINE.finditer(response):
+            label = _match_nli_label(match.group(2))
+            if label is not None:
+                answers.setdefault(int(match.group(1)), label)
 
-    for cat in categories:
-        if cat in response_lower:
-            return cat
-
-    # Partial matches
-    if "science" in response_lower or "technology" in response_lower or "tech" in response_lower:
-        return "science/technology"
-    if "travel" in response_lower:
-        return "travel"
-    if "politic" in response_lower:
-        return "politics"
-    if "sport" in response_lower:
-        return "sports"
-    if "health" in response_lower:
-        return "health"
-    if "entertainment" in response_lower:
-        return "entertainment"
-    if "geography" in response_lower or "geo" in response_lower:
-        return "geography"
-
-    return response_lower
+    if n_pairs is None:
+        n_pairs = max(answers, default=0)
+    return [answers.get(pair_id) for pair_id in range(1, n_pairs + 1)]
+
+
+def parse_topic_response(response: str) -> str:
+    """Parse topic classification response (the lower-cased response if no category matches)."""
+    return TOPIC_MATCHER.match(response) or response.lower().strip()
@@ -0,0 +1,267 @@
+"""Client-side rate limiting and retry backoff for LLM providers."""
+import asyncio
+import random
+import threading
+import time
+import warnings
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional, Tuple
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, amount: float = 1.0) -> float:
+        """Take `amount` tokens if available and return 0, else return the seconds to wait."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+    def acquire(self, amount: float = 1.0):
+        """Block until `amount` tokens are available, then take them."""
+        while True:
+            wait = self.try_acquire(amount)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self, amount: float = 1.0):
+        """Wait without blocking the event loop until `amount` tokens are available."""
+        while True:
+            wait = self.try_acquire(amount)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit.
+
+    The limit grows by roughly one slot per window of successful requests and
+    is cut by `decrease` on a rate-limit response. Decreases are applied at
+    most once per cooldown so a burst of 429s counts as a single signal.
+
+    Threads wait on a condition variable. Coroutines, which may run on any
+    event loop, wait on a future of their own loop that is resolved
+    thread-safely when a slot frees up or the limit grows.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 64,
+        decrease: float = 0.5,
+        cooldown: float = 5.0
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._async_waiters: deque = deque()
+
+    def acquire(self):
+        """Block until a concurrency slot is free."""
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def try_acquire(self) -> bool:
+        """Take a concurrency slot if one is free."""
+        with self._cond:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    async def aacquire(self):
+        """Wait without blocking the event loop until a concurrency slot is free."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = (loop, loop.create_future())
+                self._async_waiters.append(waiter)
+            try:
+                await waiter[1]
+            except asyncio.CancelledError:
+                with self._cond:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+                    else:
+                        # Already woken: pass the wake-up on so the free slot is not lost
+                        self._wake_async(1)
+                raise
+
+    def _wake_async(self, n: Optional[int] = None):
+        """Wake up to n (default: all) waiting coroutines; the caller holds the lock."""
+        while self._async_waiters and (n is None or n > 0):
+            loop, future = self._async_waiters.popleft()
+            loop.call_soon_threadsafe(_resolve, future)
+            if n is not None:
+                n -= 1
+
+    def release(self):
+        """Free a concurrency slot."""
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+            self._wake_async(1)
+
+    def on_success(self):
+        """Additive increase: +1 slot after `limit` consecutive successes."""
+        with self._cond:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+            self._wake_async()
+
+    def on_rate_limit(self):
+        """Multiplicative decrease on a 429."""
+        with self._cond:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self._last_decrease = now
+
+
+def _resolve(future: asyncio.Future):
+    """Wake a waiting coroutine, unless it was cancelled meanwhile."""
+    if not future.done():
+        future.set_result(None)
+
+
+class RateLimiter:
+    """Request/token budgets plus adaptive concurrency for one provider."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        initial_concurrency: int = 4,
+        max_concurrency: int = 64
+    ):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = AIMDController(initial=initial_concurrency, maximum=max_concurrency)
+
+    @contextmanager
+    def slot(self, estimated_tokens: int = 0):
+        """Wait for request, token and concurrency budget, and hold it for one call."""
+        if self.requests is not None:
+            self.requests.acquire()
+        if self.tokens is not None and estimated_tokens:
+            self.tokens.acquire(estimated_tokens)
+        self.concurrency.acquire()
+        try:
+            yield
+        finally:
+            self.concurrency.release()
+
+    @asynccontextmanager
+    async def aslot(self, estimated_tokens: int = 0):
+        """Async variant of slot(); budgets are shared with synchronous callers."""
+        if self.requests is not None:
+            await self.requests.aacquire()
+        if self.tokens is not None and estimated_tokens:
+            await self.tokens.aacquire(estimated_tokens)
+        await self.concurrency.aacquire()
+        try:
+            yield
+        finally:
+            self.concurrency.release()
+
+    def on_success(self):
+        self.concurrency.on_success()
+
+    def on_rate_limit(self):
+        self.concurrency.on_rate_limit()
+
+
+# Limiters are shared by every client of the same provider endpoint, since quotas
+# are per account; each is stored with the limits it was built from
+_LIMITERS: Dict[Tuple[str, Optional[str]], Tuple[RateLimiter, Dict]] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(provider: str, limits: Dict, base_url: Optional[str] = None) -> RateLimiter:
+    """
+    Return the shared limiter for (provider, base_url), creating it from `limits` on first use.
+
+    Warns if a later caller asks for different limits: the endpoint keeps
+    the limits it was first created with.
+    """
+    key = (provider, base_url)
+    with _LIMITERS_LOCK:
+        if key not in _LIMITERS:
+            _LIMITERS[key] = (RateLimiter(**limits), dict(limits))
+        limiter, created_with = _LIMITERS[key]
+        if dict(limits) != created_with:
+            warnings.warn(
+                f"Rate limits {limits} for {provider} ({base_url}) ignored; the shared "
+                f"limiter was created with {created_with}",
+                stacklevel=2
+            )
+        return limiter
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Whether an SDK exception is an HTTP 429."""
+    return getattr(error, "status_code", None) == 429
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the server's Retry-After hint from an SDK exception, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None  # HTTP-date form; fall back to exponential backoff
+    return None
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = 2.0,
+    cap: float = 60.0,
+    retry_after: Optional[float] = None
+) -> float:
+    """
+    Delay before retry number `attempt` (0-based).
+
+    Honors Retry-After when the server sent one; otherwise uses exponential
+    backoff with full jitter so concurrent workers do not retry in lockstep.
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
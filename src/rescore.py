@@ -0,0 +1,110 @@
+"""Re-score saved evaluation results from their stored raw responses, without API calls."""
+import os
+import sys
+from datetime import datetime
+from typing import Dict, Optional
+
+# Add src to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from evaluate import (
+    NLI_MODES, save_results, score_nli_responses, score_packed_responses,
+    score_topic_responses, unparsed_stats
+)
+from response_store import read_responses
+
+HEADINGS = {
+    "direct": "Direct Evaluation",
+    "translate_test": "Translate-Test Evaluation",
+    "topic": "SIB-200 Topic Classification",
+    "direct_packed": "Direct Evaluation",
+    "translate_test_packed": "Translate-Test Evaluation",
+}
+
+
+def rescore(path: str, verbose: bool = True) -> Dict:
+    """
+    Rebuild a model's results from a .responses.parquet file.
+
+    The current parsers are re-applied to the stored raw responses and every
+    per-language accuracy is recomputed, in evaluate.py's result schema. The
+    other saved fields (model, telemetry, ...) are taken from the file's
+    header; for packed runs the unparsed-answer rates are recomputed too.
+    """
+    header, columns = read_responses(path)
+    results = dict(header)
+    if verbose:
+        print(f"\nRe-scoring {header.get('model', path)} from {path}")
+
+    for mode, columns_by_lang in columns.items():
+        packed = any("pack_slots" in c for c in columns_by_lang.values())
+        if verbose:
+            print(f"\n--- {HEADINGS.get(mode, mode)}{' (packed)' if packed else ''} ---")
+
+        labels_by_lang = {lang: c["labels"] for lang, c in columns_by_lang.items()}
+        responses_by_lang = {lang: c["responses"] for lang, c in columns_by_lang.items()}
+
+        if mode == "topic":
+            results[mode] = score_topic_responses(responses_by_lang, labels_by_lang, verbose)
+        elif packed:
+            results[mode], n_unparsed = score_packed_responses(mode, columns_by_lang, verbose)
+            n_samples = sum(len(labels) for labels in labels_by_lang.values())
+            results.setdefault("packing", {}).setdefault("unparsed", {})[mode] = unparsed_stats(
+                n_samples, n_unparsed
+            )
+        elif mode in NLI_MODES:
+            results[mode] = score_nli_responses(mode, responses_by_lang, labels_by_lang, verbose)
+
+    results["rescored"] = datetime.now().isoformat()
+    return results
+
+
+# Re-scored results go to this subdirectory of the input's directory, so the
+# analysis (which reads results_* files in the results directory) ignores them
+RESCORED_DIR = "rescored"
+
+
+def rescored_path(path: str) -> str:
+    """Default output for a re-scored responses file: rescored/<name>.json next to it."""
+    suffix = ".responses.parquet"
+    directory, filename = os.path.split(path)
+    stem = filename[:-len(suffix)] if filename.endswith(suffix) else os.path.splitext(filename)[0]
+    return os.path.join(directory, RESCORED_DIR, stem + ".json")
+
+
+def main(argv: Optional[list] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Re-score evaluation results from stored raw responses (no API calls)"
+    )
+    parser.add_argument(
+        "paths", nargs="+",
+        help="*.responses.parquet files written next to the results by evaluate.py"
+    )
+    parser.add_argument(
+        "--output", type=str, default=None,
+        help="Output JSON path (single input only; default: rescored/<name>.json "
+             "next to the input)"
+    )
+    parser.add_argument(
+        "--quiet", action="store_true",
+        help="Don't print per-language accuracies"
+    )
+    args = parser.parse_args(argv)
+    if args.output and len(args.paths) > 1:
+        parser.error("--output needs a single input file")
+
+    all_results = {}
+    for path in args.paths:
+        results = rescore(path, verbose=not args.quiet)
+        output = os.path.abspath(args.output or rescored_path(path))
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        save_results(results, output, save_responses=False)
+        all_results[results.get("model", path)] = results
+
+    return all_results
+
+
+if __name__ == "__main__":
+    main()
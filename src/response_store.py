@@ -0,0 +1,91 @@
+"""Columnar storage of raw model responses, for re-scoring without API calls."""
+import json
+import os
+from typing import Dict, List, Tuple
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Result modes whose per-sample responses are stored
+RESPONSE_MODES = ["direct", "translate_test", "topic", "direct_packed", "translate_test_packed"]
+
+# Per-language result lists stored as columns, and dropped from the results JSON
+RESPONSE_FIELDS = ["responses", "pack_slots", "fallback_responses"]
+
+RESPONSE_SCHEMA = pa.schema([
+    pa.field("mode", pa.string()),
+    pa.field("lang", pa.string()),
+    pa.field("label", pa.string()),
+    pa.field("response", pa.string()),
+    # 1-based pair number within a packed response, null for single-sample requests
+    pa.field("pack_slot", pa.int32()),
+    # Single-sample re-request for a packed answer that could not be parsed
+    pa.field("fallback_response", pa.string()),
+])
+
+
+def responses_path(results_path: str) -> str:
+    """Path of the raw-response file stored next to a results JSON file."""
+    return os.path.splitext(results_path)[0] + ".responses.parquet"
+
+
+def write_responses(results: Dict, header: Dict, path: str) -> int:
+    """
+    Write the raw responses of every scored mode to a Parquet file.
+
+    One row per sample, in scoring order within each (mode, lang), with the
+    gold label alongside. header (the saved results, minus the modes whose
+    rows are stored) goes in the schema metadata, so the file alone is
+    enough to rebuild the results. Modes scored without raw responses
+    (e.g. streaming runs) are left in the header. Returns the row count.
+    """
+    data = {field.name: [] for field in RESPONSE_SCHEMA}
+    for mode in RESPONSE_MODES:
+        for lang, lang_results in results.get(mode, {}).items():
+            if "responses" not in lang_results:
+                continue
+            n = len(lang_results["labels"])
+            data["mode"].extend([mode] * n)
+            data["lang"].extend([lang] * n)
+            data["label"].extend(lang_results["labels"])
+            data["response"].extend(lang_results["responses"])
+            data["pack_slot"].extend(lang_results.get("pack_slots", [None] * n))
+            data["fallback_response"].extend(lang_results.get("fallback_responses", [None] * n))
+
+    schema = RESPONSE_SCHEMA.with_metadata({"results": json.dumps(header, ensure_ascii=False)})
+    table = pa.Table.from_pydict(data, schema=schema)
+
+    # Packed responses repeat once per pair; dictionary encoding stores them once
+    tmp_path = path + ".tmp"
+    pq.write_table(table, tmp_path, compression="zstd", use_dictionary=True)
+    os.replace(tmp_path, path)
+    return table.num_rows
+
+
+def read_responses(path: str) -> Tuple[Dict, Dict[str, Dict[str, Dict[str, List]]]]:
+    """
+    Read a raw-response file.
+
+    Returns (header, columns) where columns maps mode -> lang -> {"labels",
+    "responses", and for packed runs "pack_slots", "fallback_responses"},
+    each a list in scoring order.
+    """
+    table = pq.read_table(path)
+    header = json.loads(table.schema.metadata[b"results"])
+
+    columns: Dict[str, Dict[str, Dict[str, List]]] = {}
+    for mode in pc.unique(table["mode"]).to_pylist():
+        mode_table = table.filter(pc.equal(table["mode"], mode))
+        columns[mode] = {}
+        for lang in pc.unique(mode_table["lang"]).to_pylist():
+            rows = mode_table.filter(pc.equal(mode_table["lang"], lang))
+            lang_columns = {
+                "labels": rows["label"].to_pylist(),
+                "responses": rows["response"].to_pylist()
+            }
+            # Single-sample runs have no pack columns
+            if rows["pack_slot"].null_count < rows.num_rows:
+                lang_columns["pack_slots"] = rows["pack_slot"].to_pylist()
+                lang_columns["fallback_responses"] = rows["fallback_response"].to_pylist()
+            columns[mode][lang] = lang_columns
+    return header, columns
@@ -0,0 +1,112 @@
+"""Compact columnar results: per-sample label codes in Arrow IPC with a JSON header."""
+import json
+import os
+from typing import Dict, List
+import numpy as np
+import pyarrow as pa
+
+# Result modes whose per-sample labels and predictions are stored as codes
+CODED_MODES = ["direct", "translate_test", "topic", "direct_packed", "translate_test_packed"]
+
+# Code for a prediction outside the mode's label vocabulary
+UNKNOWN_CODE = -1
+
+RESULTS_SCHEMA = pa.schema([
+    pa.field("label", pa.int8()),
+    pa.field("prediction", pa.int8()),
+])
+
+
+def results_table_path(results_path: str) -> str:
+    """Path of the columnar results file stored next to (or instead of) a results JSON file."""
+    return os.path.splitext(results_path)[0] + ".arrow"
+
+
+def encode_labels(values: List[str], vocab: List[str]) -> np.ndarray:
+    """int8 codes of values in vocab, UNKNOWN_CODE for values outside it."""
+    codes = {label: code for code, label in enumerate(vocab)}
+    return np.fromiter(
+        (codes.get(value, UNKNOWN_CODE) for value in values), dtype=np.int8, count=len(values)
+    )
+
+
+def write_results_table(
+    results: Dict,
+    header: Dict,
+    vocabularies: Dict[str, List[str]],
+    path: str
+) -> int:
+    """
+    Write a model's per-sample labels and predictions as int8 codes.
+
+    Rows are grouped by (mode, language). The header (the results without
+    per-sample lists), each mode's label vocabulary and each language's row
+    range are stored as JSON in the schema metadata, so a reader can slice
+    one language without a scan. Returns the row count.
+    """
+    labels, predictions = [], []
+    ranges: Dict[str, Dict[str, List[int]]] = {}
+    start = 0
+    for mode in CODED_MODES:
+        for lang, lang_results in results.get(mode, {}).items():
+            if "predictions" not in lang_results:
+                continue
+            vocab = vocabularies[mode]
+            labels.append(encode_labels(lang_results["labels"], vocab))
+            predictions.append(encode_labels(lang_results["predictions"], vocab))
+            ranges.setdefault(mode, {})[lang] = [start, start + len(labels[-1])]
+            start += len(labels[-1])
+
+    schema = RESULTS_SCHEMA.with_metadata({
+        "results": json.dumps(header, ensure_ascii=False),
+        "vocabularies": json.dumps({mode: vocabularies[mode] for mode in ranges}),
+        "ranges": json.dumps(ranges),
+    })
+    empty = np.empty(0, dtype=np.int8)
+    batch = pa.record_batch([
+        pa.array(np.concatenate(labels) if labels else empty),
+        pa.array(np.concatenate(predictions) if predictions else empty),
+    ], schema=schema)
+
+    tmp_path = path + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            writer.write_batch(batch)
+    os.replace(tmp_path, path)
+    return start
+
+
+def read_results_table(path: str, decode: bool = False) -> Dict:
+    """
+    Load a columnar results file in the results JSON layout.
+
+    The file is memory-mapped: each language's "labels" and "predictions"
+    are zero-copy int8 views into it, and "label_names" holds the mode's
+    vocabulary to decode them. With decode=True they are converted to the
+    lists of label strings the JSON files hold (None for UNKNOWN_CODE).
+    """
+    reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+    metadata = reader.schema.metadata
+    results = json.loads(metadata[b"results"])
+    vocabularies = json.loads(metadata[b"vocabularies"])
+    ranges = json.loads(metadata[b"ranges"])
+    if not ranges:
+        return results
+
+    batch = reader.get_batch(0)
+    labels = batch.column(0).to_numpy()
+    predictions = batch.column(1).to_numpy()
+
+    for mode, by_lang in ranges.items():
+        vocab = vocabularies[mode]
+        names = np.array(vocab + [None], dtype=object)  # code -1 picks the trailing None
+        for lang, (start, end) in by_lang.items():
+            lang_results = results.setdefault(mode, {}).setdefault(lang, {})
+            if decode:
+                lang_results["labels"] = names[labels[start:end]].tolist()
+                lang_results["predictions"] = names[predictions[start:end]].tolist()
+            else:
+                lang_results["labels"] = labels[start:end]
+                lang_results["predictions"] = predictions[start:end]
+                lang_results["label_names"] = vocab
+    return results
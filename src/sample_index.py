@@ -0,0 +1,220 @@
+"""Prebuilt, memory-mapped index of evaluation samples."""
+import json
+import os
+from collections.abc import Sequence
+from typing import Dict, Iterator, List, Optional
+import pyarrow as pa
+from analysis_cache import file_fingerprint
+from config import INDEX_DIR, SEED
+
+# Sample fields stored per dataset, in column order
+SAMPLE_COLUMNS = {
+    "xnli": {
+        "premise": pa.string(), "hypothesis": pa.string(),
+        "label": pa.int8(), "label_name": pa.string(), "index": pa.int32(),
+    },
+    "sib200": {
+        "text": pa.string(), "category": pa.string(),
+        "index_id": pa.int32(), "index": pa.int32(),
+    },
+}
+
+
+# Rows converted to dicts at a time when iterating over indexed samples
+ITER_BATCH_ROWS = 1024
+
+
+class SampleRows(Sequence):
+    """
+    Read-only list of sample dicts over an Arrow table slice.
+
+    Rows become dicts only when accessed (a batch at a time when iterated),
+    and slicing returns another view, so samples from a memory-mapped index
+    are not copied until they are used.
+    """
+
+    def __init__(self, table: pa.Table):
+        self.table = table
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return [self[j] for j in range(start, stop, step)]
+            return SampleRows(self.table.slice(start, max(stop - start, 0)))
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("sample index out of range")
+        return self.table.slice(i, 1).to_pylist()[0]
+
+    def __iter__(self) -> Iterator[Dict]:
+        for batch in self.table.to_batches(max_chunksize=ITER_BATCH_ROWS):
+            yield from batch.to_pylist()
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, (Sequence, list)) and list(self) == list(other)
+
+
+def source_fingerprint(files: List[str]) -> Dict[str, List[int]]:
+    """Size and mtime of each dataset file an index was built from (see file_fingerprint)."""
+    return {path: file_fingerprint(path) for path in files}
+
+
+def index_path(dataset: str, split: str, seed: int, n_samples: int, stratify: bool = True) -> str:
+    """Path of the prepared index for (dataset, split, seed, n_samples, sampling strategy)."""
+    strategy = "stratified" if stratify else "uniform"
+    return os.path.join(INDEX_DIR, f"{dataset}_{split}_seed{seed}_n{n_samples}_{strategy}.arrow")
+
+
+def write_sample_index(
+    samples_by_lang: Dict[str, List[Dict]],
+    dataset: str,
+    split: str,
+    n_samples: int,
+    source_files: List[str],
+    seed: int = SEED,
+    stratify: bool = True
+) -> str:
+    """
+    Write per-language samples to an Arrow IPC file.
+
+    Rows are grouped by language and each language's row range is stored in
+    the schema metadata, so a reader can slice one language without a scan.
+    The fingerprint of source_files (the dataset files the samples were
+    drawn from) is stored alongside, so a stale index is not read.
+    """
+    columns = SAMPLE_COLUMNS[dataset]
+    data = {name: [] for name in columns}
+    ranges = {}
+
+    for lang, samples in samples_by_lang.items():
+        start = len(data["index"])
+        for sample in samples:
+            for name in columns:
+                data[name].append(sample[name])
+        ranges[lang] = [start, len(data["index"])]
+
+    schema = pa.schema(
+        [pa.field(name, dtype) for name, dtype in columns.items()],
+        metadata={
+            "lang_ranges": json.dumps(ranges),
+            "source_fingerprint": json.dumps(source_fingerprint(source_files)),
+        }
+    )
+    table = pa.Table.from_pydict(data, schema=schema)
+
+    path = index_path(dataset, split, seed, n_samples, stratify)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def read_sample_index(
+    dataset: str,
+    split: str,
+    n_samples: int,
+    languages: List[str],
+    seed: int = SEED,
+    stratify: bool = True
+) -> Optional[Dict[str, SampleRows]]:
+    """
+    Read samples for the requested languages from a prepared index.
+
+    The file is memory-mapped, so the Arrow buffers are shared with any other
+    process reading the same index, and each language's samples are a
+    SampleRows view into them. Returns None if no index was prepared, it
+    does not cover every requested language, or the dataset files it was
+    built from have changed since.
+    """
+    path = index_path(dataset, split, seed, n_samples, stratify)
+    if not os.path.exists(path):
+        return None
+
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    metadata = table.schema.metadata
+    if b"source_fingerprint" not in metadata:
+        return None  # Written before indexes recorded their sources
+    recorded = json.loads(metadata[b"source_fingerprint"])
+    try:
+        if source_fingerprint(list(recorded)) != recorded:
+            return None
+    except OSError:
+        return None  # A source file is gone
+
+    ranges = json.loads(metadata[b"lang_ranges"])
+    if any(lang not in ranges for lang in languages):
+        return None
+
+    samples_by_lang = {}
+    for lang in languages:
+        start, end = ranges[lang]
+        samples_by_lang[lang] = SampleRows(table.slice(start, end - start))
+
+    return samples_by_lang
+
+
+def main():
+    """Prepare sample indexes for the evaluation datasets."""
+    import argparse
+    from config import SAMPLE_SIZE_XNLI, SAMPLE_SIZE_SIB200
+
+    from data_loader import (
+        ALL_LANGUAGES, available_languages, load_xnli_samples, load_sib200_samples
+    )
+    from language_registry import load_registry
+
+    parser = argparse.ArgumentParser(description="Prepare memory-mapped sample indexes")
+    parser.add_argument(
+        "--datasets", type=str, nargs="+", default=["xnli", "sib200"],
+        choices=list(SAMPLE_COLUMNS), help="Datasets to index"
+    )
+    parser.add_argument("--split", type=str, default="test", help="Dataset split")
+    parser.add_argument(
+        "--n-samples", type=int, default=None,
+        help="Samples per language (default: the configured sample size)"
+    )
+    parser.add_argument(
+        "--no-stratify", action="store_true",
+        help="Sample rows uniformly instead of balancing labels/categories"
+    )
+    args = parser.parse_args()
+
+    registry = load_registry()
+    for dataset in args.datasets:
+        if dataset == "xnli":
+            n_samples = args.n_samples or SAMPLE_SIZE_XNLI
+            languages = available_languages("xnli", args.split)
+            samples = load_xnli_samples(
+                languages=languages, n_samples=n_samples,
+                split=args.split, use_index=False, stratify=not args.no_stratify
+            )
+            # Every XNLI language is read from the same data files
+            sources = registry.data_files("xnli", languages[0], args.split) if languages else []
+        else:
+            n_samples = args.n_samples or SAMPLE_SIZE_SIB200
+            samples = load_sib200_samples(
+                languages=[ALL_LANGUAGES], n_samples=n_samples, split=args.split, use_index=False,
+                stratify=not args.no_stratify
+            )
+            sources = [
+                path for lang in samples for path in registry.data_files("sib200", lang, args.split)
+            ]
+
+        path = write_sample_index(
+            samples, dataset, args.split, n_samples, sources, stratify=not args.no_stratify
+        )
+        total = sum(len(s) for s in samples.values())
+        print(f"{dataset}: {total} samples across {len(samples)} languages -> {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Deterministic, label-stratified sampling of evaluation rows."""
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from config import INDEX_DIR, SEED
+
+# Index-set key for datasets whose rows are parallel across languages (XNLI):
+# one set of row indices is drawn and shared by every language
+SHARED = "*"
+
+
+def sample_seed(dataset: str, split: str, lang: Optional[str] = None, seed: int = SEED) -> int:
+    """
+    Seed for one (dataset, split, seed, language) draw.
+
+    Derived from a stable hash rather than a shared random stream, so a
+    language's sample does not depend on which languages were drawn before
+    it, in which order, or in which process.
+    """
+    key = f"{dataset}/{split}/{seed}/{lang or SHARED}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def label_codes(values) -> np.ndarray:
+    """Integer class codes (in sorted label order) for a label column, e.g. an Arrow column."""
+    if hasattr(values, "to_numpy"):
+        values = values.to_numpy(zero_copy_only=False)
+    return np.unique(np.asarray(values), return_inverse=True)[1].ravel()
+
+
+def balanced_quota(counts: np.ndarray, n_samples: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Samples to take from each class: as equal as the class sizes allow.
+
+    Classes too small for an equal share are taken whole and the rest is
+    split among the larger ones; the remainder of an uneven split goes to
+    randomly chosen classes with rows to spare.
+    """
+    quota = np.zeros(len(counts), dtype=np.int64)
+    remaining = min(n_samples, int(counts.sum()))
+    # Smallest classes first, so their shortfall is redistributed to the larger ones
+    order = np.argsort(counts, kind="stable")
+    for position, cls in enumerate(order):
+        quota[cls] = min(counts[cls], remaining // (len(order) - position))
+        remaining -= quota[cls]
+
+    while remaining:
+        spare = np.flatnonzero(quota < counts)
+        extra = rng.permutation(spare)[:remaining]
+        quota[extra] += 1
+        remaining -= len(extra)
+    return quota
+
+
+def draw_indices(
+    n_total: int,
+    n_samples: int,
+    rng: np.random.Generator,
+    labels: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Draw up to n_samples distinct row indices out of n_total, in ascending order.
+
+    With labels (one class code per row, see label_codes), the draw is
+    stratified so that every class is represented as equally as possible.
+    Works on whole columns: rows get a random rank, are ordered by
+    (class, rank), and each class keeps its first quota rows.
+    """
+    if labels is None:
+        labels = np.zeros(n_total, dtype=np.int64)
+    counts = np.bincount(labels)
+    quota = balanced_quota(counts, n_samples, rng)
+
+    order = np.lexsort((rng.permutation(n_total), labels))
+    sorted_labels = labels[order]
+    class_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    rank = np.arange(n_total) - class_starts[sorted_labels]
+    return np.sort(order[rank < quota[sorted_labels]])
+
+
+def index_sets_path(dataset: str, split: str, n_samples: int, stratify: bool, seed: int) -> str:
+    """Path of the cached index sets for one sampling configuration."""
+    strategy = "stratified" if stratify else "uniform"
+    return os.path.join(
+        INDEX_DIR, f"indices_{dataset}_{split}_seed{seed}_n{n_samples}_{strategy}.json"
+    )
+
+
+class IndexSets:
+    """
+    Sampled row indices of one dataset split, per language, cached as JSON.
+
+    Each language's indices depend only on (dataset, split, seed, language,
+    n_samples, stratify) and on its rows, so the cached sets are valid for
+    any caller and are reused as long as the language's row count is
+    unchanged. Safe to use from several threads; concurrent processes
+    writing the same file write the same content.
+    """
+
+    def __init__(
+        self,
+        dataset: str,
+        split: str,
+        n_samples: int,
+        stratify: bool = True,
+        seed: int = SEED,
+        path: Optional[str] = None
+    ):
+        self.dataset = dataset
+        self.split = split
+        self.n_samples = n_samples
+        self.stratify = stratify
+        self.seed = seed
+        self.path = path or index_sets_path(dataset, split, n_samples, stratify, seed)
+        self.sets: Dict[str, Dict] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.sets = json.load(f).get("sets", {})
+            except (OSError, json.JSONDecodeError):
+                self.sets = {}
+
+    def get(
+        self,
+        lang: Optional[str],
+        n_total: int,
+        labels: Callable[[], np.ndarray]
+    ) -> List[int]:
+        """
+        Row indices for lang (None for the set shared by all languages).
+
+        labels() returns the per-row class codes and is only called when
+        the set is not cached and the draw is stratified.
+        """
+        key = lang or SHARED
+        entry = self.sets.get(key)
+        if entry is not None and entry["rows"] == n_total:
+            return entry["indices"]
+
+        rng = np.random.default_rng(sample_seed(self.dataset, self.split, lang, self.seed))
+        indices = draw_indices(
+            n_total, self.n_samples, rng, labels() if self.stratify else None
+        ).tolist()
+        with self._lock:
+            self.sets[key] = {"rows": n_total, "indices": indices}
+            self._dirty = True
+        return indices
+
+    def save(self):
+        """Write the index sets if any were drawn in this run."""
+        with self._lock:
+            if not self._dirty:
+                return
+            state = {
+                "dataset": self.dataset, "split": self.split, "seed": self.seed,
+                "n_samples": self.n_samples, "stratify": self.stratify, "sets": self.sets,
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Per-process temporary name, as workers may save the same sets concurrently
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
@@ -0,0 +1,244 @@
+"""Per-request latency, token and cost instrumentation."""
+import contextvars
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+QUANTILES = [50, 95, 99]
+
+# Holder for the current request's timing; the HTTP response hook fills it in
+_request_timing: contextvars.ContextVar[Optional[Dict]] = contextvars.ContextVar(
+    "request_timing", default=None
+)
+
+
+def start_request_timing() -> Dict:
+    """Begin timing one HTTP attempt in the current context."""
+    timing = {"start": time.perf_counter(), "first_byte": None}
+    _request_timing.set(timing)
+    return timing
+
+
+def mark_first_byte(response=None):
+    """HTTP client response hook: runs once the response headers have arrived."""
+    timing = _request_timing.get()
+    if timing is not None and timing["first_byte"] is None:
+        timing["first_byte"] = time.perf_counter()
+
+
+async def amark_first_byte(response=None):
+    """Async variant of mark_first_byte for async HTTP clients."""
+    mark_first_byte(response)
+
+
+def estimate_cost(
+    pricing: Optional[Dict],
+    prompt_tokens: int,
+    completion_tokens: int,
+    cached_tokens: int = 0
+) -> float:
+    """Estimated USD cost from per-million-token prices; cached prompt tokens use "cached_input"."""
+    if not pricing:
+        return 0.0
+    input_price = pricing.get("input", 0.0)
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * pricing.get("cached_input", input_price)
+        + completion_tokens * pricing.get("output", 0.0)
+    ) / 1_000_000
+
+
+class _Cell:
+    """Accumulated call statistics for one (mode, language) cell."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.ttfbs: List[float] = []
+        self.calls = 0
+        self.cache_hits = 0
+        self.failures = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cost = 0.0
+
+    def add(self, stats: Dict):
+        if stats.get("cached"):
+            self.cache_hits += 1
+            return
+        if stats.get("failed"):
+            self.failures += 1
+            return
+        self.calls += 1
+        self.latencies.append(stats["latency"])
+        if stats.get("ttfb") is not None:
+            self.ttfbs.append(stats["ttfb"])
+        self.retries += stats.get("retries", 0)
+        self.prompt_tokens += stats.get("prompt_tokens", 0)
+        self.completion_tokens += stats.get("completion_tokens", 0)
+        self.cached_tokens += stats.get("cached_tokens", 0)
+        self.cost += stats.get("cost", 0.0)
+
+    def merge(self, other: "_Cell"):
+        self.latencies.extend(other.latencies)
+        self.ttfbs.extend(other.ttfbs)
+        self.calls += other.calls
+        self.cache_hits += other.cache_hits
+        self.failures += other.failures
+        self.retries += other.retries
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.cached_tokens += other.cached_tokens
+        self.cost += other.cost
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "failures": self.failures,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_prompt_tokens": self.cached_tokens,
+            "cost_usd": round(self.cost, 6),
+            "latency": _percentiles(self.latencies),
+            "ttfb": _percentiles(self.ttfbs)
+        }
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    points = np.percentile(values, QUANTILES)
+    summary = {f"p{q}": round(float(v), 4) for q, v in zip(QUANTILES, points)}
+    summary["mean"] = round(float(np.mean(values)), 4)
+    return summary
+
+
+class Telemetry:
+    """
+    Thread-safe collector of per-call stats for one model.
+
+    Stats are grouped per (mode, language). A request shared by several
+    languages (e.g. a deduplicated translate-test prompt) is attributed to
+    the first language that planned it, so totals are not double counted.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.cells: Dict[Tuple[str, str], _Cell] = {}
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, mode: str, lang: str, stats: Dict):
+        with self._lock:
+            cell = self.cells.get((mode, lang))
+            if cell is None:
+                cell = self.cells[(mode, lang)] = _Cell()
+            cell.add(stats)
+
+    def total(self) -> _Cell:
+        total = _Cell()
+        with self._lock:
+            for cell in self.cells.values():
+                total.merge(cell)
+        return total
+
+    def live_postfix(self) -> Dict[str, str]:
+        """Compact running totals for a progress bar (counters only, cheap per update)."""
+        with self._lock:
+            cells = list(self.cells.values())
+        return {
+            "calls": str(sum(c.calls for c in cells)),
+            "tok": str(sum(c.prompt_tokens + c.completion_tokens for c in cells)),
+            "$": f"{sum(c.cost for c in cells):.3f}"
+        }
+
+    def summary(self) -> Dict:
+        """Per-cell and overall stats, in a JSON-serializable layout."""
+        by_mode: Dict[str, Dict[str, Dict]] = {}
+        with self._lock:
+            for (mode, lang), cell in self.cells.items():
+                by_mode.setdefault(mode, {})[lang] = cell.to_dict()
+        total = self.total().to_dict()
+        total["wall_time"] = round(time.perf_counter() - self.started, 2)
+        return {"total": total, "by_mode": by_mode}
+
+    def format_summary(self) -> str:
+        """Human-readable one-paragraph summary of the run."""
+        total = self.total().to_dict()
+        latency = total["latency"]
+        lines = [
+            f"Telemetry ({self.model}): {total['calls']} API calls, "
+            f"{total['cache_hits']} cache hits, {total['failures']} failures, "
+            f"{total['retries']} retries",
+            f"  Tokens: {total['prompt_tokens']} prompt ({total['cached_prompt_tokens']} cached), "
+            f"{total['completion_tokens']} completion; "
+            f"estimated cost ${total['cost_usd']:.4f}"
+        ]
+        if latency:
+            lines.append(
+                f"  Latency: p50={latency['p50']:.2f}s p95={latency['p95']:.2f}s "
+                f"p99={latency['p99']:.2f}s"
+            )
+        return "\n".join(lines)
+
+    def prometheus_lines(self) -> List[str]:
+        """Metric samples in Prometheus text exposition format (without HELP/TYPE)."""
+        lines = []
+        with self._lock:
+            cells = list(self.cells.items())
+        for (mode, lang), cell in cells:
+            labels = f'model="{self.model}",mode="{mode}",lang="{lang}"'
+            for metric, values in [
+                ("llm_request_latency_seconds", cell.latencies),
+                ("llm_request_ttfb_seconds", cell.ttfbs),
+            ]:
+                if values:
+                    for q, v in zip(QUANTILES, np.percentile(values, QUANTILES)):
+                        lines.append(f'{metric}{{{labels},quantile="{q / 100}"}} {v:.6f}')
+                    lines.append(f"{metric}_sum{{{labels}}} {sum(values):.6f}")
+                    lines.append(f"{metric}_count{{{labels}}} {len(values)}")
+            lines.append(f"llm_requests_total{{{labels}}} {cell.calls}")
+            lines.append(f"llm_cache_hits_total{{{labels}}} {cell.cache_hits}")
+            lines.append(f"llm_failures_total{{{labels}}} {cell.failures}")
+            lines.append(f"llm_retries_total{{{labels}}} {cell.retries}")
+            lines.append(f'llm_tokens_total{{{labels},type="prompt"}} {cell.prompt_tokens}')
+            lines.append(f'llm_tokens_total{{{labels},type="completion"}} {cell.completion_tokens}')
+            lines.append(f'llm_tokens_total{{{labels},type="cached_prompt"}} {cell.cached_tokens}')
+            lines.append(f"llm_cost_usd_total{{{labels}}} {cell.cost:.6f}")
+        return lines
+
+
+PROMETHEUS_HEADER = [
+    "# HELP llm_request_latency_seconds Wall-clock latency of API calls.",
+    "# TYPE llm_request_latency_seconds summary",
+    "# HELP llm_request_ttfb_seconds Time to first response byte of API calls.",
+    "# TYPE llm_request_ttfb_seconds summary",
+    "# HELP llm_requests_total Successful API calls (cache hits excluded).",
+    "# TYPE llm_requests_total counter",
+    "# HELP llm_cache_hits_total Requests answered from the response cache.",
+    "# TYPE llm_cache_hits_total counter",
+    "# HELP llm_failures_total Requests that failed after all retries.",
+    "# TYPE llm_failures_total counter",
+    "# HELP llm_retries_total Retried API call attempts.",
+    "# TYPE llm_retries_total counter",
+    "# HELP llm_tokens_total Tokens reported by the provider.",
+    "# TYPE llm_tokens_total counter",
+    "# HELP llm_cost_usd_total Estimated cost in US dollars.",
+    "# TYPE llm_cost_usd_total counter",
+]
+
+
+def write_prometheus(telemetries: List[Telemetry], path: str):
+    """Write all collectors to a Prometheus text-format file (e.g. for node_exporter)."""
+    lines = list(PROMETHEUS_HEADER)
+    for telemetry in telemetries:
+        lines.extend(telemetry.prometheus_lines())
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
@@ -0,0 +1,135 @@
+"""Shared, pooled HTTP transports for the provider SDK clients."""
+import asyncio
+import importlib
+import importlib.util
+import threading
+from typing import Dict, List, Optional, Tuple
+from config import (
+    API_CONNECT_TIMEOUT, API_READ_TIMEOUT, API_HTTP2, API_KEEPALIVE_EXPIRY
+)
+from telemetry import mark_first_byte, amark_first_byte
+
+# HTTP/2 needs the optional h2 package; fall back to keep-alive HTTP/1.1 without it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# One pooled client per (SDK, base_url, async), shared by every model using that
+# endpoint: key -> [client, number of users]
+_transports: Dict[Tuple[str, str, bool], List] = {}
+# Connections reserved for an endpoint before its client is created
+_reserved: Dict[Tuple[str, str, bool], int] = {}
+_lock = threading.Lock()
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def sdk_http_client_class(sdk: str, asynchronous: bool = False):
+    """
+    The httpx client class of a provider SDK ("openai" or "anthropic").
+
+    The SDKs are imported here, on first use, because they take most of a
+    second to import.
+    """
+    module = importlib.import_module(sdk)
+    return module.DefaultAsyncHttpxClient if asynchronous else module.DefaultHttpxClient
+
+
+def sdk_httpx(sdk: str):
+    """
+    The httpx module a provider SDK is built on.
+
+    SDK releases pin their own httpx distribution (which may not be the
+    installed "httpx" package) and reject config objects from any other,
+    so limits and timeouts are built from the module their client class
+    derives from.
+    """
+    client_class = sdk_http_client_class(sdk)
+    base = next(cls for cls in client_class.__mro__[1:] if not cls.__module__.startswith(sdk))
+    return importlib.import_module(base.__module__.split(".")[0])
+
+
+def http_timeout(sdk: str):
+    """Split connect/read timeout for API calls, as the SDK's httpx Timeout."""
+    return sdk_httpx(sdk).Timeout(
+        API_READ_TIMEOUT, connect=API_CONNECT_TIMEOUT, pool=API_READ_TIMEOUT
+    )
+
+
+def event_loop() -> asyncio.AbstractEventLoop:
+    """
+    The process-wide event loop that async clients run on.
+
+    Started on first use in a daemon thread. Async HTTP pools are bound to
+    the loop that uses them, so running every async request here lets them
+    be shared between models like the synchronous pools.
+    """
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-event-loop", daemon=True).start()
+        return _loop
+
+
+def reserve_http_pool(sdk: str, base_url: str, pool_size: int, asynchronous: bool = False):
+    """
+    Reserve pool_size connections for a client of an endpoint that is about to be created.
+
+    httpx pools cannot be resized, so models that share an endpoint reserve
+    their connections up front; the endpoint's client is then created with
+    room for all of them and they do not queue for connections or
+    re-handshake between requests. Reservations for an endpoint whose
+    client already exists have no effect.
+    """
+    key = (sdk, base_url, asynchronous)
+    with _lock:
+        if key not in _transports:
+            _reserved[key] = _reserved.get(key, 0) + max(pool_size, 1)
+
+
+def get_http_client(sdk: str, base_url: str, pool_size: int, asynchronous: bool = False):
+    """
+    Return the shared HTTP client for an endpoint, creating it on first use.
+
+    The client is created with room for the connections reserved with
+    reserve_http_pool(), or for pool_size if none were, and reused by every
+    later caller. Each caller must give it back with release_http_client();
+    the client is closed when its last user releases it. Async clients
+    (asynchronous=True) must only be used on event_loop().
+    """
+    key = (sdk, base_url, asynchronous)
+    with _lock:
+        entry = _transports.get(key)
+        if entry is None:
+            size = _reserved.pop(key, 0) or max(pool_size, 1)
+            client = sdk_http_client_class(sdk, asynchronous)(
+                http2=API_HTTP2 and HTTP2_AVAILABLE,
+                timeout=http_timeout(sdk),
+                limits=sdk_httpx(sdk).Limits(
+                    max_connections=size,
+                    max_keepalive_connections=size,
+                    keepalive_expiry=API_KEEPALIVE_EXPIRY
+                ),
+                event_hooks={"response": [amark_first_byte if asynchronous else mark_first_byte]}
+            )
+            entry = _transports[key] = [client, 0]
+        entry[1] += 1
+        return entry[0]
+
+
+def release_http_client(sdk: str, base_url: str, asynchronous: bool = False):
+    """Give back a client from get_http_client(); the last user's release closes it."""
+    key = (sdk, base_url, asynchronous)
+    with _lock:
+        entry = _transports.get(key)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+        del _transports[key]
+
+    client = entry[0]
+    if asynchronous:
+        asyncio.run_coroutine_threadsafe(client.aclose(), event_loop()).result()
+    else:
+        client.close()
@@ -0,0 +1,5 @@
+"""Shared pytest setup: make the src/ modules importable."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
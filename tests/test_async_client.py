@@ -0,0 +1,159 @@
+"""AsyncLLMClient against a local stand-in for the chat completions endpoint."""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import llm_api
+from cache import ResponseCache
+from engine import complete_many
+from rate_limit import AIMDController
+from transport import event_loop
+
+
+class ChatStub(BaseHTTPRequestHandler):
+    """
+    Answers POST /v1/chat/completions with the last user message reversed.
+
+    The first `rate_limited` requests get a 429 with a Retry-After hint;
+    the server records every request body and the peak number of requests
+    in flight.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload, headers=()):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers["content-length"])))
+        with server.lock:
+            server.requests.append(request)
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+            rate_limited = server.rate_limited > 0
+            server.rate_limited -= rate_limited
+        try:
+            time.sleep(server.delay)
+            if rate_limited:
+                self._reply(429, {"error": {"message": "rate limited"}}, [("retry-after-ms", "10")])
+                return
+            content = request["messages"][-1]["content"]
+            self._reply(200, {
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": 0,
+                "model": request["model"],
+                "choices": [{
+                    "index": 0, "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content[::-1]},
+                }],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12},
+            })
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ChatStub)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.in_flight = server.peak = server.rate_limited = 0
+    server.delay = 0.0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(server, tmp_path, monkeypatch, rate_limits=None):
+    monkeypatch.setattr(llm_api, "OPENAI_API_KEY", "test-key")
+    return llm_api.AsyncLLMClient(
+        "openai", "stub-model", cache=ResponseCache(str(tmp_path / "cache")),
+        rate_limits=rate_limits, base_url=f"http://127.0.0.1:{server.server_port}/v1",
+        pool_size=8
+    )
+
+
+def run(coroutine):
+    return asyncio.run_coroutine_threadsafe(coroutine, event_loop()).result(timeout=30)
+
+
+def test_acomplete_and_cache(server, tmp_path, monkeypatch):
+    client = make_client(server, tmp_path, monkeypatch)
+    try:
+        response, stats = run(client.acomplete_with_stats("hello", system_prompt="sys"))
+        assert response == "olleh"
+        assert stats["retries"] == 0 and stats["prompt_tokens"] == 10
+        assert server.requests[0]["model"] == "stub-model"
+        assert server.requests[0]["messages"][0]["role"] == "system"
+
+        response, stats = run(client.acomplete_with_stats("hello", system_prompt="sys"))
+        assert response == "olleh" and stats["cached"]
+        assert len(server.requests) == 1
+    finally:
+        client.close()
+
+
+def test_retries_rate_limited_requests(server, tmp_path, monkeypatch):
+    server.rate_limited = 1
+    client = make_client(server, tmp_path, monkeypatch)
+    try:
+        response, stats = run(client.acomplete_with_stats("again", retry_delay=0.01))
+        assert response == "niaga"
+        assert stats["retries"] == 1
+        assert len(server.requests) == 2
+    finally:
+        client.close()
+
+
+def test_concurrency_limit_across_coroutines(server, tmp_path, monkeypatch):
+    server.delay = 0.02
+    limits = {"initial_concurrency": 2, "max_concurrency": 2}
+    client = make_client(server, tmp_path, monkeypatch, rate_limits=limits)
+    try:
+        requests = [(f"prompt {i}", None) for i in range(24)]
+        responses = complete_many(client, requests, concurrency=16)
+        assert responses == [f"prompt {i}"[::-1] for i in range(24)]
+        assert server.peak <= 2
+        assert client.limiter.concurrency.in_flight == 0
+    finally:
+        client.close()
+
+
+def test_released_slot_wakes_async_waiter():
+    async def scenario():
+        controller = AIMDController(initial=1, maximum=1)
+        await controller.aacquire()
+        waiter = asyncio.ensure_future(controller.aacquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        controller.release()
+        await asyncio.wait_for(waiter, timeout=1)
+        assert controller.in_flight == 1
+
+        # A cancelled waiter does not hold on to the slot it was woken for
+        cancelled = asyncio.ensure_future(controller.aacquire())
+        queued = asyncio.ensure_future(controller.aacquire())
+        await asyncio.sleep(0.01)
+        controller.release()
+        cancelled.cancel()
+        await asyncio.wait_for(queued, timeout=1)
+        assert controller.in_flight == 1
+
+    asyncio.run(scenario())
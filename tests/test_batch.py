@@ -0,0 +1,109 @@
+"""BatchRunner against recorded batch output/error files, with a stand-in batch API."""
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import llm_api
+from batch import BatchRunner, parse_batch_output
+from cache import ResponseCache
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "batch")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class FakeBatchAPI:
+    """
+    The files/batches endpoints of the OpenAI SDK, serving recorded results.
+
+    Each submitted batch finishes at once with the next recorded
+    (output file, error file) pair; uploaded input files are kept for
+    inspection.
+    """
+
+    def __init__(self, recorded):
+        self.recorded = list(recorded)
+        self.uploads = []
+        self.batches_created = 0
+        self.files = SimpleNamespace(create=self._create_file, content=self._content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve)
+
+    def _create_file(self, file, purpose):
+        assert purpose == "batch"
+        self.uploads.append([json.loads(line) for line in file.read().decode("utf-8").splitlines()])
+        return SimpleNamespace(id=f"file-in-{len(self.uploads) - 1}")
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        self.batches_created += 1
+        return SimpleNamespace(id=f"batch-{self.batches_created - 1}")
+
+    def _retrieve(self, batch_id):
+        output, errors = self.recorded[int(batch_id.split("-")[1])]
+        return SimpleNamespace(
+            status="completed", request_counts=None,
+            output_file_id=output and f"file-{output}", error_file_id=errors and f"file-{errors}"
+        )
+
+    def _content(self, file_id):
+        return SimpleNamespace(text=read_fixture(file_id[len("file-"):]))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_api, "OPENAI_API_KEY", "test-key")
+    return llm_api.LLMClient(
+        "openai", "gpt-4.1", cache=ResponseCache(str(tmp_path / "cache")),
+        base_url="http://127.0.0.1:9/v1"
+    )
+
+
+def test_parse_batch_output():
+    responses, failed = parse_batch_output(read_fixture("output_0.jsonl"))
+    assert responses == {0: "entailment", 2: "contradiction"}
+    assert failed == {3}
+
+    responses, failed = parse_batch_output(read_fixture("errors_0.jsonl"))
+    assert responses == {}
+    assert failed == {1}
+
+
+def test_resubmits_only_failed_rows(client, tmp_path):
+    api = FakeBatchAPI([("output_0.jsonl", "errors_0.jsonl"), ("output_1.jsonl", None)])
+    client.client = api
+    requests = [(f"prompt {i}", "system") for i in range(5)]
+    results = {}
+
+    runner = BatchRunner(client, work_dir=str(tmp_path / "batches"), poll_interval=0, max_resubmits=1)
+    responses = runner.run(
+        requests, on_result=lambda i, response, stats: results.setdefault(i, (response, stats))
+    )
+
+    # Row 1 errored, row 3 got a 500 and row 4 is missing from the first batch
+    assert [[row["custom_id"] for row in upload] for upload in api.uploads] == [
+        ["req-0", "req-1", "req-2", "req-3", "req-4"],
+        ["req-1", "req-3", "req-4"],
+    ]
+    assert api.uploads[1][0]["body"]["messages"][-1]["content"] == "prompt 1"
+    assert responses == ["entailment", "neutral", "contradiction", "entailment", None]
+    assert results[4] == (None, {"failed": True, "latency": 0.0})
+    assert results[1][1]["retries"] == 1
+
+
+def test_cached_rows_are_not_submitted(client, tmp_path):
+    requests = [(f"prompt {i}", "system") for i in range(5)]
+    runner = BatchRunner(client, work_dir=str(tmp_path / "batches"), poll_interval=0, max_resubmits=0)
+
+    client.client = FakeBatchAPI([("output_0.jsonl", "errors_0.jsonl")])
+    runner.run(requests)
+
+    api = FakeBatchAPI([("output_1.jsonl", None)])
+    client.client = api
+    responses = runner.run(requests)
+
+    assert [row["custom_id"] for row in api.uploads[0]] == ["req-1", "req-3", "req-4"]
+    assert responses == ["entailment", "neutral", "contradiction", "entailment", None]
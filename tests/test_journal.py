@@ -0,0 +1,47 @@
+"""ResultJournal replay only reuses records for the exact request they answered."""
+import json
+
+from journal import ResultJournal
+
+PARSERS = {"direct": str.strip}
+
+
+def open_journal(path, resume=True):
+    return ResultJournal(
+        str(path), "gpt-4.1", PARSERS, resume=resume, provider="openai", model_id="gpt-4.1"
+    )
+
+
+def test_replay_matches_request_key(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    request = ("Premise: a\nHypothesis: b", "system", 10)
+    journal = open_journal(path, resume=False)
+    key = journal.request_key(request)
+    journal.record("direct", "de", 3, key, "entailment", 0.5)
+    journal.close()
+
+    journal = open_journal(path)
+    try:
+        assert journal.lookup("direct", "de", 3, key) == "entailment"
+        for changed in [
+            ("Premise: a\nHypothesis: c", "system", 10),
+            ("Premise: a\nHypothesis: b", "other system", 10),
+            ("Premise: a\nHypothesis: b", "system", 20),
+        ]:
+            assert journal.lookup("direct", "de", 3, journal.request_key(changed)) is None
+        assert journal.lookup("direct", "fr", 3, key) is None
+    finally:
+        journal.close()
+
+
+def test_records_without_request_key_are_not_replayed(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    record = {"model": "gpt-4.1", "mode": "direct", "lang": "de", "index": 3,
+              "response": "entailment", "label": "entailment", "latency": 0.5}
+    path.write_text(json.dumps(record) + "\n", encoding="utf-8")
+
+    journal = open_journal(path)
+    try:
+        assert journal.completed == {}
+    finally:
+        journal.close()
@@ -0,0 +1,75 @@
+"""LabelMatcher.parse_many against the single-response parsers it replaces in scoring."""
+import pytest
+
+from prompts import NLI_MATCHER, TOPIC_MATCHER, parse_nli_response, parse_topic_response
+
+# (response, label it names; None if it names none)
+NLI_CASES = [
+    ("entailment", "entailment"),
+    ("Neutral.", "neutral"),
+    ("CONTRADICTION", "contradiction"),
+    ("The hypothesis is Entailed by the premise.", "entailment"),
+    ("Answer: neutral, not a contradiction", "neutral"),
+    ("Widerspruch", "contradiction"),
+    ("Folgerung", "entailment"),
+    ("Implicación", "entailment"),
+    ("Нейтрально", "neutral"),
+    ("ПРОТИВОРЕЧИЕ", "contradiction"),
+    ("Ουδέτερο", "neutral"),
+    ("蕴含", "entailment"),
+    ("答案：矛盾", "contradiction"),
+    ("Trung lập", "neutral"),
+    ("Çelişki", "contradiction"),
+    ("محايد", "neutral"),
+    ("", None),
+    ("I don't know.", None),
+    ("Ja", None),
+    ("42", None),
+]
+
+TOPIC_CASES = [
+    ("sports", "sports"),
+    ("Science/Technology", "science/technology"),
+    ("TRAVEL", "travel"),
+    ("Category: Politics.", "politics"),
+    ("This text is about technology.", "science/technology"),
+    ("Geography", "geography"),
+    ("Reise", "travel"),
+    ("Gesundheit", "health"),
+    ("Política", "politics"),
+    ("Santé", "health"),
+    ("体育", "sports"),
+    ("エンターテインメント", "entertainment"),
+    ("정치", "politics"),
+    ("رياضة", "sports"),
+    ("", None),
+    ("Cooking", None),
+    ("Unknown category", None),
+]
+
+
+@pytest.mark.parametrize("response, expected", NLI_CASES)
+def test_nli_parse_many_matches_parse_nli_response(response, expected):
+    labels, unparseable = NLI_MATCHER.parse_many([response], default="neutral")
+    assert labels == [parse_nli_response(response)]
+    assert labels == [expected or "neutral"]
+    assert unparseable.tolist() == [expected is None]
+
+
+@pytest.mark.parametrize("response, expected", TOPIC_CASES)
+def test_topic_parse_many_matches_parse_topic_response(response, expected):
+    labels, unparseable = TOPIC_MATCHER.parse_many([response], default="other")
+    parsed = parse_topic_response(response)
+    # parse_topic_response returns the response text itself when no category matches
+    assert labels == [parsed if parsed in TOPIC_MATCHER.labels else "other"]
+    assert labels == [expected or "other"]
+    assert unparseable.tolist() == [expected is None]
+
+
+@pytest.mark.parametrize("matcher, cases", [(NLI_MATCHER, NLI_CASES), (TOPIC_MATCHER, TOPIC_CASES)])
+def test_parse_many_batch_matches_match(matcher, cases):
+    # Repeated texts and missing responses in one batch, as in a scored language
+    responses = [response for response, _ in cases] * 2 + [None]
+    labels, unparseable = matcher.parse_many(responses)
+    assert labels == [matcher.match(response) for response in responses]
+    assert unparseable.tolist() == [label is None for label in labels]
@@ -0,0 +1,101 @@
+"""Vectorized metrics against straightforward per-cell reference implementations."""
+import numpy as np
+import pytest
+from scipy import stats
+
+from metrics import (
+    CellCodes, bootstrap_weights, cell_metrics, compare_cells, mcnemar, paired_bootstrap
+)
+from results_store import UNKNOWN_CODE
+
+VOCAB = ["entailment", "neutral", "contradiction"]
+
+
+def reference_macro_f1(labels, predictions, n_classes):
+    """Per-class F1 from counts, averaged over the classes that occur."""
+    f1s = []
+    for cls in range(n_classes):
+        tp = sum(1 for g, p in zip(labels, predictions) if g == cls and p == cls)
+        gold = sum(1 for g in labels if g == cls)
+        predicted = sum(1 for p in predictions if p == cls)
+        if gold + predicted:
+            f1s.append(2 * tp / (gold + predicted))
+    return sum(f1s) / len(f1s) if f1s else 0.0
+
+
+def make_cells(*cells):
+    """CellCodes from (labels, predictions) code lists, one cell per language."""
+    return CellCodes.from_arrays(
+        [("model", "direct", f"l{i}") for i in range(len(cells))],
+        [np.array(labels, dtype=np.int8) for labels, _ in cells],
+        [np.array(predictions, dtype=np.int8) for _, predictions in cells],
+        len(VOCAB)
+    )
+
+
+def test_unparseable_predictions_count_as_missed():
+    # 10 gold "travel"-style rows: 1 correct, 9 unparseable
+    metrics = cell_metrics(make_cells(([0] * 10, [0] + [UNKNOWN_CODE] * 9)))
+    assert metrics["accuracy"][0] == pytest.approx(0.1)
+    assert metrics["macro_f1"][0] == pytest.approx(2 * 1 / (10 + 1))
+    assert metrics["confusion"][0].tolist() == [[1, 0, 0, 9], [0, 0, 0, 0], [0, 0, 0, 0]]
+
+
+@pytest.mark.parametrize("labels, predictions", [
+    ([0, 1, 2, 0, 1, 2], [0, 1, 2, 0, 1, 2]),
+    ([0, 1, 2, 0, 1, 2], [1, 1, 2, UNKNOWN_CODE, 0, UNKNOWN_CODE]),
+    ([0, 0, 0, 1], [UNKNOWN_CODE] * 4),
+    ([2, 2, 1, 1, 0], [2, 0, 1, 2, 0]),
+])
+def test_cell_metrics_match_reference(labels, predictions):
+    metrics = cell_metrics(make_cells((labels, predictions), ([0, 1], [1, 0])))
+    correct = sum(1 for g, p in zip(labels, predictions) if g == p)
+    assert metrics["correct"][0] == correct
+    assert metrics["accuracy"][0] == pytest.approx(correct / len(labels))
+    assert metrics["macro_f1"][0] == pytest.approx(reference_macro_f1(labels, predictions, 3))
+    assert metrics["macro_f1"][1] == pytest.approx(0.0)
+
+
+def test_mcnemar_matches_exact_binomial_test():
+    rng = np.random.default_rng(0)
+    a = rng.random((20, 50)) < 0.7
+    b = rng.random((20, 50)) < 0.6
+    result = mcnemar(a, b)
+    for i in range(len(a)):
+        a_only = int((a[i] & ~b[i]).sum())
+        b_only = int((~a[i] & b[i]).sum())
+        assert (result["a_only"][i], result["b_only"][i]) == (a_only, b_only)
+        expected = stats.binomtest(a_only, a_only + b_only, 0.5).pvalue if a_only + b_only else 1.0
+        assert result["p"][i] == pytest.approx(expected)
+
+
+def test_paired_bootstrap_matches_per_pair_loop():
+    rng = np.random.default_rng(1)
+    a = rng.random((5, 40)) < 0.8
+    b = rng.random((5, 40)) < 0.5
+    result = paired_bootstrap(a, b, n_resamples=500, seed=7)
+
+    weights = bootstrap_weights(40, 500, np.random.default_rng(7))
+    for i in range(len(a)):
+        diffs = a[i].astype(float) - b[i].astype(float)
+        resampled = [(w * diffs).sum() / 40 for w in weights]
+        assert result["delta"][i] == pytest.approx(diffs.mean())
+        assert result["low"][i] == pytest.approx(np.quantile(resampled, 0.025), abs=1e-6)
+        assert result["high"][i] == pytest.approx(np.quantile(resampled, 0.975), abs=1e-6)
+        assert result["low"][i] <= result["delta"][i] <= result["high"][i]
+
+
+def test_identical_cells_have_no_difference():
+    correct = np.array([[1, 0, 1, 1, 0, 1]], dtype=bool)
+    result = paired_bootstrap(correct, correct)
+    assert (result["delta"][0], result["low"][0], result["high"][0]) == (0, 0, 0)
+    assert mcnemar(correct, correct)["p"][0] == 1.0
+
+
+def test_compare_cells_skips_pairs_of_different_length():
+    cells = make_cells(([0, 1, 2, 0], [0, 1, 2, 0]), ([0, 1, 2, 0], [0, 2, 2, 1]), ([0, 1], [0, 1]))
+    keys = cells.keys
+    result = compare_cells(cells, [(keys[0], keys[1]), (keys[0], keys[2])], n_resamples=200)
+    assert result["delta"][0] == pytest.approx(0.5)
+    assert (result["a_only"][0], result["b_only"][0]) == (2, 0)
+    assert np.isnan(result["delta"][1]) and np.isnan(result["p"][1])